@@ -0,0 +1,83 @@
+"""
+POST /tasks microbenchmark: requests per second for a single worker.
+
+Drives the ASGI app in-process through httpx (no network, no Mangum) with
+the SQS provider replaced by a no-op, so the figure reflects routing,
+request parsing, validation, message serialization, response rendering
+and status writes.
+
+Usage:
+    python -m benchmarks.api_throughput --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+from unittest.mock import patch
+
+BODY = (
+    b'{"title": "Benchmark Task", "description": "Measuring the request path",'
+    b' "priority": "medium", "due_date": "2030-01-01T00:00:00Z"}'
+)
+
+
+class NullQueueProvider:
+    """Queue provider that accepts every message without any I/O"""
+
+    def send_message(self, message_body: str, task_id: str, **kwargs) -> Dict[str, Any]:
+        return {"MessageId": task_id}
+
+    def get_provider_name(self) -> str:
+        return "null"
+
+
+async def drive(app: Any, requests: int, warmup: int) -> Tuple[float, List[float]]:
+    import httpx
+
+    headers = {"Content-Type": "application/json"}
+    async with httpx.AsyncClient(app=app, base_url="http://benchmark") as client:
+        for _ in range(warmup):
+            await client.post("/tasks", content=BODY, headers=headers)
+
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.post("/tasks", content=BODY, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 201, response.text
+        return time.perf_counter() - started, latencies
+
+
+def run(requests: int, warmup: int) -> None:
+    from services.api.app import app
+
+    with patch("services.api.routers.tasks.get_queue_provider", NullQueueProvider):
+        elapsed, latencies = asyncio.run(drive(app, requests, warmup))
+
+    latencies.sort()
+    print(f"requests:      {requests}")
+    print(f"req/s/worker:  {requests / elapsed:,.0f}")
+    print(f"p50 latency:   {statistics.median(latencies) * 1000:.3f} ms")
+    print(f"p99 latency:   {latencies[int(len(latencies) * 0.99) - 1] * 1000:.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("QUEUE_URL", "http://benchmark-queue")
+        os.environ.setdefault("TASK_STATUS_DB_PATH", os.path.join(tmp, "status.sqlite3"))
+        os.environ.setdefault("LOG_SAMPLE_RATES", "INFO=0")
+        run(args.requests, args.warmup)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Task archive benchmark: columnar chunks versus gzip-compressed JSON lines.
+
+Generates synthetic processed-task rows and compares storage size, write
+time, a full scan, and a two-column scan (the typical "which tasks
+failed" query) for the columnar format against one JSON object per line.
+
+Usage:
+    python -m benchmarks.archive_scan --rows 1000000
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from services.processor.archive import columnar
+
+# Rows per chunk, matching the writer's default TASK_ARCHIVE_MAX_ROWS
+CHUNK_ROWS = 10_000
+
+
+def make_rows(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = time.time()
+    rows = []
+    for index in range(count):
+        failed = rng.random() < 0.02
+        rows.append(
+            {
+                "task_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "title": f"Task {index}",
+                "description": "Generated by the archive benchmark",
+                "priority": rng.choice(("low", "medium", "high")),
+                "due_date": "2030-01-01T00:00:00Z" if rng.random() < 0.3 else None,
+                "outcome": "failed" if failed else "succeeded",
+                "error_class": rng.choice(("permanent", "transient")) if failed else None,
+                "processed_at": start + index * 0.01,
+                "duration_ms": rng.uniform(0.1, 5.0),
+                "handler_ms": rng.uniform(0.05, 2.0),
+            }
+        )
+    return rows
+
+
+def chunks(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    return [rows[i : i + CHUNK_ROWS] for i in range(0, len(rows), CHUNK_ROWS)]
+
+
+def encode_jsonl(rows: List[Dict[str, Any]]) -> bytes:
+    return gzip.compress(b"".join(json.dumps(row).encode() + b"\n" for row in rows))
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(count: int) -> None:
+    batches = chunks(make_rows(count))
+    formats = {}
+
+    blobs: List[bytes] = []
+    write = timed(lambda: blobs.extend(columnar.encode(batch) for batch in batches))
+    formats["columnar"] = {
+        "write": write,
+        "size": sum(map(len, blobs)),
+        "scan": timed(
+            lambda: [row for blob in blobs for row in columnar.iter_rows(blob)]
+        ),
+        "failed": timed(
+            lambda: [
+                task_id
+                for blob in blobs
+                for task_id, outcome in zip(
+                    *columnar.decode(blob, ["task_id", "outcome"]).values()
+                )
+                if outcome == "failed"
+            ]
+        ),
+    }
+
+    lines: List[bytes] = []
+    write = timed(lambda: lines.extend(encode_jsonl(batch) for batch in batches))
+
+    def scan_jsonl() -> List[Dict[str, Any]]:
+        return [
+            json.loads(line)
+            for blob in lines
+            for line in gzip.decompress(blob).splitlines()
+        ]
+
+    formats["json lines"] = {
+        "write": write,
+        "size": sum(map(len, lines)),
+        "scan": timed(scan_jsonl),
+        "failed": timed(
+            lambda: [row["task_id"] for row in scan_jsonl() if row["outcome"] == "failed"]
+        ),
+    }
+
+    mib = 1024 * 1024
+    print(f"rows: {count:,} in chunks of {CHUNK_ROWS:,}")
+    print(f"{'format':<12}{'size MiB':>10}{'write s':>10}{'scan s':>10}{'failed s':>10}")
+    for name, result in formats.items():
+        print(
+            f"{name:<12}{result['size'] / mib:>10.1f}{result['write']:>10.2f}"
+            f"{result['scan']:>10.2f}{result['failed']:>10.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Adaptive concurrency benchmark: convergence against a synthetic downstream.
+
+Drives the processor's concurrency limiter with a closed loop of workers
+calling a downstream of fixed capacity. Beyond its capacity the
+downstream thrashes: latency grows with the square of the overload, so
+throughput falls as more calls pile on. The downstream's latency and
+capacity change between phases; the limit, latency and throughput are
+printed over time next to static limits for comparison.
+
+Usage:
+    python -m benchmarks.concurrency_convergence --phase-seconds 3
+"""
+
+import argparse
+import threading
+import time
+from typing import List, Tuple
+
+from services.processor.services.concurrency import AdaptiveConcurrencyLimiter
+
+# (capacity, base latency in seconds) per phase
+PHASES: List[Tuple[int, float]] = [(8, 0.005), (8, 0.020), (2, 0.020), (16, 0.005)]
+
+
+class SyntheticDownstream:
+    """Downstream with fixed capacity that thrashes once it is exceeded"""
+
+    def __init__(self, capacity: int, latency: float):
+        self.capacity = capacity
+        self.latency = latency
+        self.calls = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def call(self) -> None:
+        with self._lock:
+            self._active += 1
+            delay = self.latency * max(1.0, self._active / self.capacity) ** 2
+        time.sleep(delay)
+        with self._lock:
+            self._active -= 1
+            self.calls += 1
+
+
+def run(limiter: AdaptiveConcurrencyLimiter, phase_seconds: float, trace: bool) -> int:
+    downstream = SyntheticDownstream(*PHASES[0])
+    stop = threading.Event()
+
+    def worker() -> None:
+        while not stop.is_set():
+            if not limiter.acquire(timeout=0.1):
+                continue
+            start = time.perf_counter()
+            downstream.call()
+            limiter.release(time.perf_counter() - start)
+
+    threads = [
+        threading.Thread(target=worker, daemon=True) for _ in range(limiter.max_limit)
+    ]
+    for thread in threads:
+        thread.start()
+
+    started = time.perf_counter()
+    for capacity, latency in PHASES:
+        downstream.capacity, downstream.latency = capacity, latency
+        if trace:
+            print(f"-- capacity {capacity}, latency {latency * 1000:.0f} ms")
+        phase_end = time.perf_counter() + phase_seconds
+        while time.perf_counter() < phase_end:
+            calls = downstream.calls
+            time.sleep(0.25)
+            if trace:
+                print(
+                    f"t={time.perf_counter() - started:5.2f}s"
+                    f"  limit={limiter.limit:3d}"
+                    f"  latency={(limiter.latency or 0) * 1000:6.1f} ms"
+                    f"  tasks/s={(downstream.calls - calls) / 0.25:6.0f}"
+                )
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return downstream.calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--phase-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    total = args.phase_seconds * len(PHASES)
+    adaptive = run(AdaptiveConcurrencyLimiter(initial_limit=4), args.phase_seconds, True)
+    print(f"\nadaptive:        {adaptive / total:6.0f} tasks/s")
+    for limit in (2, 8, 32):
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=limit, min_limit=limit, max_limit=limit
+        )
+        static = run(limiter, args.phase_seconds, False)
+        print(f"static limit {limit:2d}: {static / total:6.0f} tasks/s")
+
+
+if __name__ == "__main__":
+    main()
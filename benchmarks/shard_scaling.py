@@ -0,0 +1,286 @@
+"""
+Queue sharding benchmark: enqueue throughput versus number of shards.
+
+Each shard is a local FIFO queue stand-in that serves one API call at a
+time at ``--calls-per-second`` (SQS FIFO queues allow 300 calls per second
+per action without high-throughput mode), so a single queue has a fixed
+ceiling. Producer threads enqueue tasks with ordering keys through
+TaskQueueService and ShardedQueueProvider for a fixed time, one message per
+call (POST /tasks) and in batches of the provider's max_batch_size, grouped
+by shard so that every call is full. A third run streams keyed NDJSON bodies
+through StreamIngestor, as POST /tasks/stream does, with ``--streams``
+uploads at once. Reports messages per second, the speed-up over one shard
+and, for batches and streams, the messages each queue call carried, then
+checks that every ordering key's messages are in send order.
+
+Also reports the share of keys that move to another shard when a shard is
+added, for the consistent hash ring and for ``hash(key) % shards``.
+
+Usage:
+    python -m benchmarks.shard_scaling --shards 1 2 4 8 --seconds 3
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from services.api.services.ingest.stream_ingest import StreamIngestor
+from services.api.services.queue.base import QueueProvider
+from services.api.services.queue.queue_service import TaskQueueService
+from services.api.services.queue.sharded_provider import HashRing, ShardedQueueProvider
+
+KEYS_PER_PRODUCER = 50
+
+# NDJSON lines per streamed body chunk
+LINES_PER_CHUNK = 256
+
+
+class LocalFifoQueue(QueueProvider):
+    """In-memory FIFO queue stand-in with a per-queue API call ceiling"""
+
+    def __init__(self, calls_per_second: float):
+        self.service_seconds = 1 / calls_per_second
+        self.messages: List[Tuple[str, str]] = []
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def send_message(self, message_body: str, task_id: str, **kwargs) -> Dict[str, Any]:
+        self._call([(message_body, kwargs.get("ordering_key"))])
+        return {"MessageId": task_id}
+
+    def send_message_batch(
+        self, entries: Sequence[Tuple[str, str]], **kwargs
+    ) -> Dict[str, Any]:
+        keys = kwargs.get("ordering_keys") or [None] * len(entries)
+        self._call([(body, key) for (body, _), key in zip(entries, keys)])
+        return {
+            "Successful": [
+                {"Id": task_id, "MessageId": task_id} for _, task_id in entries
+            ],
+            "Failed": [],
+        }
+
+    def get_provider_name(self) -> str:
+        return "local"
+
+    def _call(self, messages: List[Tuple[str, Any]]) -> None:
+        # One call at a time per queue: the queue's throughput ceiling
+        with self._lock:
+            time.sleep(self.service_seconds)
+            self.messages.extend(messages)
+            self.calls += 1
+
+
+class NullStatusService:
+    """Status service stand-in that records nothing"""
+
+    def mark_queued_many(self, task_ids: List[str]) -> None:
+        pass
+
+
+def produce(
+    service: TaskQueueService,
+    producer: int,
+    batch_size: int,
+    stop: threading.Event,
+    sent: List[int],
+) -> None:
+    seq = 0
+    # Pending tasks per shard, sent once a shard has a full batch
+    buffers: Dict[Any, Tuple[List[Tuple[str, str]], List[str]]] = {}
+    while not stop.is_set():
+        key = f"p{producer}-k{seq % KEYS_PER_PRODUCER}"
+        body, task_id = json.dumps({"title": str(seq)}), str(uuid.uuid4())
+        seq += 1
+        if batch_size == 1:
+            service.enqueue_message(body, task_id, ordering_key=key)
+            sent[producer] += 1
+            continue
+        entries, keys = buffers.setdefault(service.shard_for(task_id, key), ([], []))
+        entries.append((body, task_id))
+        keys.append(key)
+        if len(entries) == batch_size:
+            service.enqueue_messages(entries, ordering_keys=keys)
+            sent[producer] += batch_size
+            entries.clear()
+            keys.clear()
+
+
+def in_key_order(queues: List[LocalFifoQueue]) -> bool:
+    for queue in queues:
+        last: Dict[str, int] = {}
+        for body, key in queue.messages:
+            seq = int(json.loads(body)["title"])
+            if seq <= last.get(key, -1):
+                return False
+            last[key] = seq
+    return True
+
+
+async def stream_body(stream: int, stop_at: float) -> AsyncIterator[bytes]:
+    seq = 0
+    while time.perf_counter() < stop_at:
+        lines = []
+        for _ in range(LINES_PER_CHUNK):
+            task = {
+                "title": str(seq),
+                "description": "Sharded ingest",
+                "priority": "low",
+                "ordering_key": f"s{stream}-k{seq % KEYS_PER_PRODUCER}",
+            }
+            lines.append(json.dumps(task))
+            seq += 1
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def sharded_queues(
+    shards: int, calls_per_second: float
+) -> Tuple[List[LocalFifoQueue], ShardedQueueProvider]:
+    queues = [LocalFifoQueue(calls_per_second) for _ in range(shards)]
+    provider = ShardedQueueProvider(
+        {f"task-queue-{i}.fifo": q for i, q in enumerate(queues)}
+    )
+    return queues, provider
+
+
+def summarize(queues: List[LocalFifoQueue], sent: int, elapsed: float) -> Dict[str, Any]:
+    return {
+        "rate": sent / elapsed,
+        "per_call": sum(len(q.messages) for q in queues) / sum(q.calls for q in queues),
+        "in_order": in_key_order(queues),
+    }
+
+
+def run(
+    shards: int, batched: bool, producers: int, seconds: float, calls_per_second: float
+) -> Dict[str, Any]:
+    queues, provider = sharded_queues(shards, calls_per_second)
+    service = TaskQueueService(provider=provider)
+    batch_size = provider.max_batch_size if batched else 1
+
+    stop = threading.Event()
+    sent = [0] * producers
+    threads = [
+        threading.Thread(target=produce, args=(service, p, batch_size, stop, sent))
+        for p in range(producers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return summarize(queues, sum(sent), time.perf_counter() - started)
+
+
+def run_streams(
+    shards: int, streams: int, seconds: float, calls_per_second: float
+) -> Dict[str, Any]:
+    queues, provider = sharded_queues(shards, calls_per_second)
+    service = TaskQueueService(provider=provider)
+
+    async def ingest_all() -> List[Dict[str, int]]:
+        stop_at = time.perf_counter() + seconds
+        ingestors = [
+            StreamIngestor(
+                queue_service=service,
+                status_service=NullStatusService(),
+                results=io.BytesIO(),
+                batch_size=provider.max_batch_size,
+            )
+            for _ in range(streams)
+        ]
+        return await asyncio.gather(
+            *(
+                ingestor.ingest(stream_body(stream, stop_at))
+                for stream, ingestor in enumerate(ingestors)
+            )
+        )
+
+    started = time.perf_counter()
+    counts = asyncio.run(ingest_all())
+    elapsed = time.perf_counter() - started
+    assert not any(count["rejected"] or count["failed"] for count in counts)
+    return summarize(queues, sum(count["accepted"] for count in counts), elapsed)
+
+
+def moved_share(shards: int, keys: List[str]) -> Tuple[float, float]:
+    names = [f"task-queue-{i}.fifo" for i in range(shards + 1)]
+    before, after = HashRing(names[:-1]), HashRing(names)
+    ring = sum(before.node_for(key) != after.node_for(key) for key in keys)
+
+    def modulo(key: str, count: int) -> int:
+        return (
+            int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest()) % count
+        )
+
+    mod = sum(modulo(key, shards) != modulo(key, shards + 1) for key in keys)
+    return ring / len(keys), mod / len(keys)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--producers", type=int, default=64)
+    parser.add_argument("--streams", type=int, default=16)
+    parser.add_argument("--calls-per-second", type=float, default=300.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_SAMPLE_RATES", "INFO=0")
+    print(
+        f"{args.calls_per_second:.0f} calls/s per queue, {args.producers} producers,"
+        f" {args.streams} streams"
+    )
+    print(
+        f"{'shards':>6}{'single msg/s':>14}{'speed-up':>10}"
+        f"{'batch msg/s':>13}{'speed-up':>10}{'msg/call':>10}"
+        f"{'stream msg/s':>14}{'speed-up':>10}{'msg/call':>10}"
+    )
+    base: Dict[str, float] = {}
+    ordered = True
+    for shards in args.shards:
+        results = {
+            "single": run(
+                shards, False, args.producers, args.seconds, args.calls_per_second
+            ),
+            "batch": run(
+                shards, True, args.producers, args.seconds, args.calls_per_second
+            ),
+            "stream": run_streams(
+                shards, args.streams, args.seconds, args.calls_per_second
+            ),
+        }
+        row = f"{shards:>6}"
+        for mode, result in results.items():
+            ordered = ordered and result["in_order"]
+            rate = result["rate"]
+            base.setdefault(mode, rate / shards)
+            row += (
+                f"{rate:>{13 if mode == 'batch' else 14},.0f}{rate / base[mode]:>9.1f}x"
+            )
+            if mode != "single":
+                row += f"{result['per_call']:>10.1f}"
+        print(row)
+    print(f"per-key order kept: {ordered}")
+
+    keys = [f"customer-{i}" for i in range(100_000)]
+    print(f"\n{'shards':>9}{'moved (ring)':>14}{'moved (mod)':>13}{'ideal':>8}")
+    for shards in range(1, 8):
+        ring, mod = moved_share(shards, keys)
+        print(
+            f"{shards:>4} -> {shards + 1:<2}{ring:>14.1%}{mod:>13.1%}"
+            f"{1 / (shards + 1):>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+POST /tasks/stream benchmark: bulk ingest throughput and peak memory.
+
+Streams a generated NDJSON body (never materialized in memory) through the
+ASGI app in-process with the queue provider replaced by a batch sender that
+takes ``--call-ms`` per call, as SendMessageBatch does, and reads the
+streamed results back. The request runs under the API deadline
+(``--timeout``, the Lambda timeout by default), so an upload that cannot be
+sent in time stops early and reports where. Lines are unkeyed (one message
+group, sent one batch at a time) unless ``--keys`` spreads them over ordering
+keys. Peak RSS is sampled while the upload runs, so a flat figure across
+input sizes shows that memory does not grow with the upload.
+
+Usage:
+    python -m benchmarks.stream_ingest --lines 1000000 --call-ms 0 --timeout 3600
+    python -m benchmarks.stream_ingest --lines 100000 --keys 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+from unittest.mock import patch
+
+from services.api.services.queue.base import QueueProvider
+
+TASK = {
+    "title": "Backfill Task",
+    "description": "Measuring bulk ingest",
+    "priority": "medium",
+    "due_date": "2030-01-01T00:00:00Z",
+}
+
+# Lines per request body chunk, roughly 64 KiB
+LINES_PER_CHUNK = 512
+
+
+class LatencyQueueProvider(QueueProvider):
+    """Queue provider that accepts every batch after a fixed call latency"""
+
+    max_batch_size = 10
+
+    def __init__(self, call_seconds: float):
+        self.call_seconds = call_seconds
+
+    def send_message(self, message_body: str, task_id: str, **kwargs) -> Dict[str, Any]:
+        return {"MessageId": task_id}
+
+    def send_message_batch(
+        self, entries: Sequence[Tuple[str, str]], **kwargs
+    ) -> Dict[str, Any]:
+        if self.call_seconds:
+            time.sleep(self.call_seconds)
+        return {
+            "Successful": [
+                {"Id": task_id, "MessageId": task_id} for _, task_id in entries
+            ],
+            "Failed": [],
+        }
+
+    def get_provider_name(self) -> str:
+        return "latency"
+
+
+def current_rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class RSSSampler(threading.Thread):
+    """Background thread recording the highest resident set size seen"""
+
+    def __init__(self, interval: float = 0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss_bytes()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, current_rss_bytes())
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def task_lines(keys: int) -> List[bytes]:
+    if not keys:
+        return [json.dumps(TASK).encode() + b"\n"]
+    return [
+        json.dumps({**TASK, "ordering_key": f"key-{key}"}).encode() + b"\n"
+        for key in range(keys)
+    ]
+
+
+async def body(lines: int, keys: int) -> AsyncIterator[bytes]:
+    variants = task_lines(keys)
+    for start in range(0, lines, LINES_PER_CHUNK):
+        count = min(LINES_PER_CHUNK, lines - start)
+        yield b"".join(variants[(start + i) % len(variants)] for i in range(count))
+
+
+async def drive(app: Any, lines: int, keys: int) -> Tuple[float, int, Dict[str, int]]:
+    # A minimal ASGI client: httpx's in-process transport buffers the whole
+    # response, which would hide the server's own memory profile
+    chunks = body(lines, keys)
+    body_sent = False
+    finished = asyncio.Event()
+    status = 0
+    result_bytes = 0
+    tail = b""
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal body_sent
+        if body_sent:
+            # Wait like a connected client until the response is complete
+            await finished.wait()
+            return {"type": "http.disconnect"}
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status, result_bytes, tail
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            result_bytes += len(chunk)
+            # The summary is the last line
+            tail = (tail + chunk)[-4096:]
+            if not message.get("more_body", False):
+                finished.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/tasks/stream",
+        "raw_path": b"/tasks/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/x-ndjson")],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    assert status == 200, status
+    summary = json.loads(tail.rstrip(b"\n").rsplit(b"\n", 1)[-1])["summary"]
+    return time.perf_counter() - started, result_bytes, summary
+
+
+def run(lines: int, keys: int, call_seconds: float) -> None:
+    from services.api.app import app
+
+    baseline = current_rss_bytes()
+    sampler = RSSSampler()
+    sampler.start()
+    with patch(
+        "services.api.routers.tasks.get_queue_provider",
+        lambda: LatencyQueueProvider(call_seconds),
+    ):
+        elapsed, result_bytes, summary = asyncio.run(drive(app, lines, keys))
+    sampler.stop()
+
+    mib = 1024 * 1024
+    line_bytes = sum(map(len, task_lines(keys))) / len(task_lines(keys))
+    print(f"lines:            {lines:,} ({keys or 'no'} ordering keys)")
+    print(f"input size:       {lines * line_bytes / mib:,.1f} MiB")
+    print(f"call latency:     {call_seconds * 1000:,.0f} ms")
+    print(f"accepted:         {summary['accepted']:,}")
+    if "stopped_at_line" in summary:
+        print(f"stopped at line:  {summary['stopped_at_line']:,} (request deadline)")
+    print(f"results size:     {result_bytes / mib:,.1f} MiB")
+    print(f"elapsed:          {elapsed:,.1f} s")
+    print(f"accepted lines/s: {summary['accepted'] / elapsed:,.0f}")
+    print(f"RSS before:       {baseline / mib:,.1f} MiB")
+    print(f"peak RSS:         {sampler.peak / mib:,.1f} MiB")
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(f"ru_maxrss:        {max_rss / mib:,.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--keys", type=int, default=0, help="ordering keys; 0: unkeyed")
+    parser.add_argument("--call-ms", type=float, default=20.0)
+    parser.add_argument("--timeout", type=float, default=10.0, help="API timeout (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("QUEUE_URL", "http://benchmark-queue")
+        os.environ.setdefault("TASK_STATUS_DB_PATH", os.path.join(tmp, "status.sqlite3"))
+        os.environ.setdefault("LOG_SAMPLE_RATES", "INFO=0")
+        os.environ["API_TIMEOUT_SECONDS"] = str(args.timeout)
+        run(args.lines, args.keys, args.call_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
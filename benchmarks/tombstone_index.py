@@ -0,0 +1,122 @@
+"""
+Cancellation check benchmark: Bloom-filter index versus tombstone store.
+
+Seeds a SQLite tombstone store with N cancelled task IDs, loads them into
+the processor's CancellationIndex and reports, per tombstone count:
+
+- memory held by the Bloom filter, next to a Python set of the same IDs
+  (measured on a sample and scaled)
+- cold-start load time (full scan of the store into the filter)
+- latency of the check for tasks that were not cancelled (the common case,
+  answered from memory) and for cancelled ones (confirmed against the store),
+  next to querying the store directly
+- how often the filter sent a not-cancelled task to the store
+
+Usage:
+    python -m benchmarks.tombstone_index --tombstones 1000000 5000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Callable, Dict, List
+
+from services.common.tombstones.sqlite_store import SQLiteTombstoneStore
+from services.processor.services.cancellation import CancellationIndex
+
+SET_SAMPLE = 100_000
+SEED_CHUNK = 100_000
+
+
+def set_bytes_per_id() -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ids = {str(uuid.uuid4()) for _ in range(SET_SAMPLE)}
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held / len(ids)
+
+
+def seed(store: SQLiteTombstoneStore, count: int) -> List[str]:
+    # Keep a sample of cancelled IDs to look up later
+    sample: List[str] = []
+    for start in range(0, count, SEED_CHUNK):
+        chunk = [str(uuid.uuid4()) for _ in range(min(SEED_CHUNK, count - start))]
+        store.add_many(chunk)
+        sample.extend(chunk[:100])
+    return sample
+
+
+def latency(ids: List[str], check: Callable[[str], bool]) -> float:
+    started = time.perf_counter()
+    for task_id in ids:
+        check(task_id)
+    return (time.perf_counter() - started) / len(ids)
+
+
+def run(count: int, lookups: int, workdir: str) -> Dict[str, float]:
+    store = SQLiteTombstoneStore(os.path.join(workdir, f"tombstones-{count}.sqlite3"))
+    started = time.perf_counter()
+    cancelled = seed(store, count)
+    seed_seconds = time.perf_counter() - started
+
+    index = CancellationIndex(store, refresh_seconds=3600, capacity=count)
+    started = time.perf_counter()
+    index.refresh()
+    load_seconds = time.perf_counter() - started
+
+    absent = [str(uuid.uuid4()) for _ in range(lookups)]
+    store_queries = 0
+    contains = store.contains
+
+    def counting_contains(task_id: str) -> bool:
+        nonlocal store_queries
+        store_queries += 1
+        return contains(task_id)
+
+    store.contains = counting_contains  # type: ignore[method-assign]
+    absent_latency = latency(absent, index.is_cancelled)
+    false_positives = store_queries
+    store.contains = contains  # type: ignore[method-assign]
+
+    return {
+        "seed_s": seed_seconds,
+        "filter_mib": index._filter.size_bytes / 2**20,
+        "load_s": load_seconds,
+        "absent_us": absent_latency * 1e6,
+        "cancelled_us": latency(cancelled[:lookups], index.is_cancelled) * 1e6,
+        "store_us": latency(absent, store.contains) * 1e6,
+        "false_positive_rate": false_positives / lookups,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--tombstones", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000]
+    )
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_SAMPLE_RATES", "INFO=0")
+    set_bytes = set_bytes_per_id()
+    print(
+        f"{'tombstones':>11}{'filter MiB':>12}{'set MiB':>9}{'load s':>8}"
+        f"{'miss us':>9}{'hit us':>8}{'store us':>10}{'FP rate':>9}"
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in args.tombstones:
+            result = run(count, args.lookups, workdir)
+            print(
+                f"{count:>11,}{result['filter_mib']:>12.1f}"
+                f"{count * set_bytes / 2**20:>9.0f}{result['load_s']:>8.1f}"
+                f"{result['absent_us']:>9.2f}{result['cancelled_us']:>8.2f}"
+                f"{result['store_us']:>10.2f}{result['false_positive_rate']:>9.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Processor fast-path benchmark: signed messages versus full revalidation.
+
+Loads batches of SQS records the way the processor does, once with
+unsigned messages (decode and validate as TaskPayload) and once with
+signed ones (decode, verify the HMAC and load a TaskRecord), then runs
+the same batches through the validation pipeline. Reports CPU time per
+message and the memory held by each loaded task.
+
+Usage:
+    python -m benchmarks.trusted_fast_path --batches 5000 --batch-size 10
+"""
+
+import argparse
+import json
+import os
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict, List
+
+from services.common.signing import MessageSigner, get_message_signer
+
+SIGNING_KEYS = "v1:benchmark-secret"
+
+
+def make_batches(count: int, size: int, signed: bool) -> List[List[Dict[str, Any]]]:
+    signer = MessageSigner({"v1": b"benchmark-secret"})
+    batches = []
+    for _ in range(count):
+        batch = []
+        for index in range(size):
+            body = json.dumps(
+                {
+                    "task_id": str(uuid.uuid4()),
+                    "title": f"Task {index}",
+                    "description": "Measuring the trusted fast path",
+                    "priority": "medium",
+                    "due_date": "2030-01-01T00:00:00Z",
+                },
+                separators=(",", ":"),
+            )
+            record: Dict[str, Any] = {"body": body, "messageId": str(index)}
+            if signed:
+                record["messageAttributes"] = {
+                    "TaskSignature": {
+                        "stringValue": signer.sign(body),
+                        "dataType": "String",
+                    }
+                }
+            batch.append(record)
+        batches.append(batch)
+    return batches
+
+
+def cpu_per_message(batches: List[List[Dict[str, Any]]], fn: Callable) -> float:
+    messages = sum(map(len, batches))
+    started = time.process_time()
+    for batch in batches:
+        fn(batch)
+    return (time.process_time() - started) / messages
+
+
+def bytes_per_task(batches: List[List[Dict[str, Any]]], load: Callable) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [load(record) for batch in batches[:200] for record in batch]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held / len(kept)
+
+
+def run(count: int, size: int) -> None:
+    from services.processor.handler import load_task
+    from services.processor.schemas.task import TaskPayload, TaskRecord
+    from services.processor.services.pipeline.handlers import HandlerRegistry, TaskHandler
+    from services.processor.services.pipeline.middleware import (
+        ErrorClassificationMiddleware,
+        TimingMiddleware,
+        ValidationMiddleware,
+    )
+    from services.processor.services.pipeline.pipeline import TaskPipeline
+
+    class NullHandler(TaskHandler):
+        def handle(self, task, context):
+            pass
+
+    # The default pipeline without the in-process idempotency stage, which
+    # would remember every benchmark task
+    pipeline = TaskPipeline(
+        registry=HandlerRegistry(default=NullHandler()),
+        middleware=[
+            TimingMiddleware(),
+            ErrorClassificationMiddleware(),
+            ValidationMiddleware(),
+        ],
+    )
+
+    def validate(record: Dict[str, Any]) -> Any:
+        return TaskPayload(**load_task(record))
+
+    def trust(record: Dict[str, Any]) -> Any:
+        return TaskRecord.from_message(load_task(record))
+
+    def process(batch: List[Dict[str, Any]]) -> None:
+        pipeline.run_batch([load_task(record) for record in batch])
+
+    results = {}
+    for name, signed, load in (("full", False, validate), ("signed", True, trust)):
+        batches = make_batches(count, size, signed)
+        results[name] = {
+            "load": cpu_per_message(batches, lambda batch: [load(r) for r in batch]),
+            "pipeline": cpu_per_message(batches, process),
+            "memory": bytes_per_task(batches, load),
+        }
+
+    print(f"{count:,} batches of {size} messages")
+    print(f"{'path':<8}{'load us/msg':>13}{'pipeline us/msg':>17}{'bytes/task':>12}")
+    for name, result in results.items():
+        print(
+            f"{name:<8}{result['load'] * 1e6:>13.1f}{result['pipeline'] * 1e6:>17.1f}"
+            f"{result['memory']:>12.0f}"
+        )
+    full, signed = results["full"], results["signed"]
+    print(
+        f"saving  {(1 - signed['load'] / full['load']) * 100:>12.0f}%"
+        f"{(1 - signed['pipeline'] / full['pipeline']) * 100:>16.0f}%"
+        f"{(1 - signed['memory'] / full['memory']) * 100:>11.0f}%"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batches", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ["TASK_SIGNING_KEYS"] = SIGNING_KEYS
+    os.environ.setdefault("LOG_SAMPLE_RATES", "INFO=0")
+    get_message_signer.cache_clear()
+    run(args.batches, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -49,12 +49,14 @@ new ProcessorStack(
   {
     env,
     config,
-    taskQueue: queueStack.taskQueue,
+    taskQueues: queueStack.taskQueues,
+    signingKey: queueStack.signingKey,
   }
 );
 
 new ApiStack(app, `ApiStack-${config.environment}`, {
   env,
   config,
-  taskQueue: queueStack.taskQueue,
+  taskQueues: queueStack.taskQueues,
+  signingKey: queueStack.signingKey,
 });
@@ -12,10 +12,37 @@ export const devConfig: AppConfig = {
     visibilityTimeoutSeconds: 180,
     maxReceiveCount: 5,
     retentionPeriodDays: 14,
+    shardCount: 1,
   },
 
   processor: {
     timeoutSeconds: 30,
     batchSize: 1,
+    concurrency: {
+      initialLimit: 4,
+      minLimit: 1,
+      maxLimit: 10,
+    },
+    cancellation: {
+      refreshSeconds: 5,
+      filterCapacity: 1000000,
+    },
+  },
+
+  logging: {
+    level: "INFO",
+    sampleRates: "INFO=1.0",
+  },
+
+  profiling: {
+    mode: "off",
+    sampleRate: 0.01,
+    allowHeader: true,
+    hotPathTimers: true,
+  },
+  archive: {
+    enabled: false,
+    maxRows: 10000,
+    maxAgeSeconds: 300,
   },
 };
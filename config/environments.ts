@@ -6,16 +6,61 @@ export interface AppConfig {
   readonly api: {
     readonly corsAllowedOrigins: string[];
     readonly timeoutSeconds: number;
+    // Hedged sends to a second queue (QUEUE_PROVIDER=hedged) are not offered
+    // here: they need a status store shared by every consumer of both queues
+    // to be duplicate-safe, and the bundled SQLite store is per instance
   };
 
   readonly queue: {
     readonly visibilityTimeoutSeconds: number;
     readonly maxReceiveCount: number;
     readonly retentionPeriodDays: number;
+    // FIFO queues (each with its own DLQ) tasks are sharded over by ordering
+    // key; keep shards stable, as the queue names place keys on the hash ring
+    readonly shardCount: number;
   };
 
   readonly processor: {
     readonly timeoutSeconds: number;
     readonly batchSize: number;
+    // Adaptive limit on tasks processed concurrently (message groups in a
+    // batch run in parallel); tuned at runtime between min and max. With
+    // batchSize 1 the Lambda never sees more than one group, so it only takes
+    // effect with a larger batchSize or the standalone consumer
+    readonly concurrency: {
+      readonly initialLimit: number;
+      readonly minLimit: number;
+      readonly maxLimit: number;
+    };
+    readonly cancellation: {
+      readonly refreshSeconds: number; // Tombstone filter refresh interval
+      readonly filterCapacity: number; // Tombstones the filter is sized for
+    };
+  };
+
+  readonly logging: {
+    readonly level: string;
+    // Per-level sampling for success-path logs, e.g. "INFO=0.1"
+    readonly sampleRates: string;
+  };
+
+  readonly profiling: {
+    // "off", "cprofile" (deterministic) or "sampling" (statistical)
+    readonly mode: string;
+    // Fraction of invocations profiled when mode is not "off"
+    readonly sampleRate: number;
+    // Let clients request a profile with the X-Profile header
+    readonly allowHeader: boolean;
+    // Log validation/serialization/SQS/processing timings per invocation
+    readonly hotPathTimers: boolean;
+  };
+  readonly archive: {
+    // Append processed tasks to the columnar task archive; chunks go to the
+    // blob store (BLOB_STORE), which is local to the function for now
+    readonly enabled: boolean;
+    // Buffered rows that trigger a chunk write
+    readonly maxRows: number;
+    // Age of the oldest buffered row that triggers a chunk write
+    readonly maxAgeSeconds: number;
   };
 }
@@ -6,6 +6,7 @@ import * as apigwv2 from "aws-cdk-lib/aws-apigatewayv2";
 import * as integrations from "aws-cdk-lib/aws-apigatewayv2-integrations";
 import * as iam from "aws-cdk-lib/aws-iam";
 import * as lambda from "aws-cdk-lib/aws-lambda";
+import * as secretsmanager from "aws-cdk-lib/aws-secretsmanager";
 import * as sqs from "aws-cdk-lib/aws-sqs";
 import { Construct } from "constructs";
 
@@ -13,13 +14,16 @@ import { AppConfig } from "../../config/environments";
 
 interface ApiStackProps extends StackProps {
   readonly config: AppConfig;
-  readonly taskQueue: sqs.Queue;
+  readonly taskQueues: sqs.Queue[];
+  readonly signingKey: secretsmanager.ISecret;
 }
 
 export class ApiStack extends Stack {
   constructor(scope: Construct, id: string, props: ApiStackProps) {
     super(scope, id, props);
 
+    const sharded = props.taskQueues.length > 1;
+
     const apiLambda = new lambda.Function(this, "ApiLambda", {
       runtime: lambda.Runtime.PYTHON_3_11,
       handler: "services.api.app.handler",
@@ -38,8 +42,23 @@ export class ApiStack extends Stack {
       }),
       timeout: Duration.seconds(props.config.api.timeoutSeconds),
       environment: {
-        QUEUE_URL: props.taskQueue.queueUrl,
+        QUEUE_URL: props.taskQueues[0].queueUrl,
         ENVIRONMENT: props.config.environment,
+        API_TIMEOUT_SECONDS: String(props.config.api.timeoutSeconds),
+        // Read once at cold start. To rotate, add "v2" to the secret, let both
+        // functions pick it up, then switch the API's TASK_SIGNING_KEY_VERSION
+        TASK_SIGNING_SECRET_ARN: props.signingKey.secretArn,
+        TASK_SIGNING_KEY_VERSION: "v1",
+        LOG_LEVEL: props.config.logging.level,
+        LOG_SAMPLE_RATES: props.config.logging.sampleRates,
+        PROFILE_MODE: props.config.profiling.mode,
+        PROFILE_SAMPLE_RATE: String(props.config.profiling.sampleRate),
+        HOT_PATH_TIMERS: String(props.config.profiling.hotPathTimers),
+        PROFILE_ALLOW_HEADER: String(props.config.profiling.allowHeader),
+        ...(sharded && {
+          QUEUE_PROVIDER: "sharded",
+          QUEUE_URLS: props.taskQueues.map((queue) => queue.queueUrl).join(","),
+        }),
       },
     });
 
@@ -47,25 +66,53 @@ export class ApiStack extends Stack {
     apiLambda.addToRolePolicy(
       new iam.PolicyStatement({
         actions: ["sqs:SendMessage"],
-        resources: [props.taskQueue.queueArn],
+        resources: props.taskQueues.map((queue) => queue.queueArn),
       })
     );
+    props.signingKey.grantRead(apiLambda);
 
     const httpApi = new apigwv2.HttpApi(this, "TaskApi", {
       corsPreflight: {
-        allowHeaders: ["Content-Type"],
-        allowMethods: [apigwv2.CorsHttpMethod.POST],
+        allowHeaders: ["Content-Type", "If-None-Match", "Idempotency-Key", "X-Profile"],
+        allowMethods: [
+          apigwv2.CorsHttpMethod.GET,
+          apigwv2.CorsHttpMethod.POST,
+          apigwv2.CorsHttpMethod.DELETE,
+        ],
+        exposeHeaders: ["ETag", "Idempotent-Replayed", "Retry-After"],
         allowOrigins: props.config.api.corsAllowedOrigins,
       },
     });
 
+    const apiIntegration = new integrations.HttpLambdaIntegration(
+      "TaskApiIntegration",
+      apiLambda
+    );
+
     httpApi.addRoutes({
       path: "/tasks",
       methods: [apigwv2.HttpMethod.POST],
-      integration: new integrations.HttpLambdaIntegration(
-        "TaskApiIntegration",
-        apiLambda
-      ),
+      integration: apiIntegration,
+    });
+
+    // NDJSON bulk ingest (request bodies are capped at 10 MB by API Gateway)
+    httpApi.addRoutes({
+      path: "/tasks/stream",
+      methods: [apigwv2.HttpMethod.POST],
+      integration: apiIntegration,
+    });
+
+    // Task status: single lookup and batched lookup; DELETE cancels
+    httpApi.addRoutes({
+      path: "/tasks/{task_id}",
+      methods: [apigwv2.HttpMethod.GET, apigwv2.HttpMethod.DELETE],
+      integration: apiIntegration,
+    });
+
+    httpApi.addRoutes({
+      path: "/tasks/status",
+      methods: [apigwv2.HttpMethod.POST],
+      integration: apiIntegration,
     });
 
     new cdk.CfnOutput(this, "ApiUrl", {
@@ -3,6 +3,7 @@ import * as path from "path";
 import { Duration, Stack, StackProps } from "aws-cdk-lib";
 import * as lambda from "aws-cdk-lib/aws-lambda";
 import * as eventSources from "aws-cdk-lib/aws-lambda-event-sources";
+import * as secretsmanager from "aws-cdk-lib/aws-secretsmanager";
 import * as sqs from "aws-cdk-lib/aws-sqs";
 import { Construct } from "constructs";
 
@@ -10,7 +11,8 @@ import { AppConfig } from "../../config/environments";
 
 interface ProcessorStackProps extends StackProps {
   readonly config: AppConfig;
-  readonly taskQueue: sqs.Queue;
+  readonly taskQueues: sqs.Queue[];
+  readonly signingKey: secretsmanager.ISecret;
 }
 
 export class ProcessorStack extends Stack {
@@ -36,17 +38,46 @@ export class ProcessorStack extends Stack {
       timeout: Duration.seconds(props.config.processor.timeoutSeconds),
       environment: {
         ENVIRONMENT: props.config.environment,
+        // Read once at cold start. To rotate, add "v2" to the secret, let both
+        // functions pick it up, then switch the API's TASK_SIGNING_KEY_VERSION
+        TASK_SIGNING_SECRET_ARN: props.signingKey.secretArn,
+        LOG_LEVEL: props.config.logging.level,
+        LOG_SAMPLE_RATES: props.config.logging.sampleRates,
+        PROFILE_MODE: props.config.profiling.mode,
+        PROFILE_SAMPLE_RATE: String(props.config.profiling.sampleRate),
+        HOT_PATH_TIMERS: String(props.config.profiling.hotPathTimers),
+        CONCURRENCY_INITIAL_LIMIT: String(props.config.processor.concurrency.initialLimit),
+        CONCURRENCY_MIN_LIMIT: String(props.config.processor.concurrency.minLimit),
+        CONCURRENCY_MAX_LIMIT: String(props.config.processor.concurrency.maxLimit),
+        TOMBSTONE_REFRESH_SECONDS: String(
+          props.config.processor.cancellation.refreshSeconds
+        ),
+        TOMBSTONE_FILTER_CAPACITY: String(
+          props.config.processor.cancellation.filterCapacity
+        ),
+        TASK_ARCHIVE_ENABLED: String(props.config.archive.enabled),
+        TASK_ARCHIVE_MAX_ROWS: String(props.config.archive.maxRows),
+        TASK_ARCHIVE_MAX_AGE_SECONDS: String(props.config.archive.maxAgeSeconds),
+        // Lets the processor tell a final failed delivery (dead-lettered) apart
+        MAX_RECEIVE_COUNT: String(props.config.queue.maxReceiveCount),
+        // A task still "processing" after the function timeout was abandoned
+        // and may be claimed by its redelivery
+        TASK_CLAIM_LEASE_SECONDS: String(props.config.processor.timeoutSeconds),
       },
     });
+    props.signingKey.grantRead(processorLambda);
 
-    // Allow Lambda to consume messages from the queue
-    props.taskQueue.grantConsumeMessages(processorLambda);
+    // One consumer per queue shard: each shard gets its own event source
+    for (const taskQueue of props.taskQueues) {
+      // Allow Lambda to consume messages from the queue
+      taskQueue.grantConsumeMessages(processorLambda);
 
-    // SQS event source with strict ordering
-    processorLambda.addEventSource(
-      new eventSources.SqsEventSource(props.taskQueue, {
-        batchSize: props.config.processor.batchSize,
-      })
-    );
+      // SQS event source with strict ordering
+      processorLambda.addEventSource(
+        new eventSources.SqsEventSource(taskQueue, {
+          batchSize: props.config.processor.batchSize,
+        })
+      );
+    }
   }
 }
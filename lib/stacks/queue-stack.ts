@@ -1,4 +1,5 @@
 import { Duration, Stack, StackProps } from "aws-cdk-lib";
+import * as secretsmanager from "aws-cdk-lib/aws-secretsmanager";
 import * as sqs from "aws-cdk-lib/aws-sqs";
 import { Construct } from "constructs";
 
@@ -9,26 +10,55 @@ interface QueueStackProps extends StackProps {
 }
 
 export class QueueStack extends Stack {
+  // Shard 0; the only queue unless queue.shardCount > 1
   public readonly taskQueue: sqs.Queue;
   public readonly deadLetterQueue: sqs.Queue;
+  public readonly taskQueues: sqs.Queue[] = [];
+  public readonly deadLetterQueues: sqs.Queue[] = [];
+  public readonly signingKey: secretsmanager.Secret;
 
   constructor(scope: Construct, id: string, props: QueueStackProps) {
     super(scope, id, props);
 
-    this.deadLetterQueue = new sqs.Queue(this, "TaskDeadLetterQueue", {
-      queueName: `task-dlq-${props.config.environment}.fifo`,
-      fifo: true,
-      retentionPeriod: Duration.days(props.config.queue.retentionPeriodDays),
-    });
+    for (let shard = 0; shard < props.config.queue.shardCount; shard++) {
+      // Shard 0 keeps the unsharded IDs and names, so enabling sharding
+      // adds queues without replacing the existing one
+      const suffix = shard === 0 ? "" : `-${shard}`;
+      const idSuffix = shard === 0 ? "" : `Shard${shard}`;
+
+      const deadLetterQueue = new sqs.Queue(this, `TaskDeadLetterQueue${idSuffix}`, {
+        queueName: `task-dlq-${props.config.environment}${suffix}.fifo`,
+        fifo: true,
+        retentionPeriod: Duration.days(props.config.queue.retentionPeriodDays),
+      });
+
+      const taskQueue = new sqs.Queue(this, `TaskQueue${idSuffix}`, {
+        queueName: `task-queue-${props.config.environment}${suffix}.fifo`,
+        fifo: true,
+        contentBasedDeduplication: true,
+        visibilityTimeout: Duration.seconds(props.config.queue.visibilityTimeoutSeconds),
+        deadLetterQueue: {
+          queue: deadLetterQueue,
+          maxReceiveCount: props.config.queue.maxReceiveCount,
+        },
+      });
+
+      this.deadLetterQueues.push(deadLetterQueue);
+      this.taskQueues.push(taskQueue);
+    }
+    this.taskQueue = this.taskQueues[0];
+    this.deadLetterQueue = this.deadLetterQueues[0];
 
-    this.taskQueue = new sqs.Queue(this, "TaskQueue", {
-      queueName: `task-queue-${props.config.environment}.fifo`,
-      fifo: true,
-      contentBasedDeduplication: true,
-      visibilityTimeout: Duration.seconds(props.config.queue.visibilityTimeoutSeconds),
-      deadLetterQueue: {
-        queue: this.deadLetterQueue,
-        maxReceiveCount: props.config.queue.maxReceiveCount,
+    // HMAC key the API signs task messages with, so the processor can trust
+    // them without revalidating
+    this.signingKey = new secretsmanager.Secret(this, "TaskSigningKey", {
+      secretName: `task-signing-key-${props.config.environment}`,
+      // {"<key version>": "<secret>"}; add a version to rotate
+      generateSecretString: {
+        secretStringTemplate: "{}",
+        generateStringKey: "v1",
+        passwordLength: 48,
+        excludePunctuation: true,
       },
     });
   }
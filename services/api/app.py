@@ -1,14 +1,71 @@
-import logging
+import os
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from mangum import Mangum
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from services.api.routers.tasks import router as tasks_router
+from services.api.services.queue.resilience import deadline_scope
+from services.common.profiling import (
+    PROFILE_HEADER,
+    invocation_timings,
+    parse_profile_header,
+    request_profile,
+)
+from services.common.structured_logging import configure_logging, log_invocation
+
+configure_logging()
+
+# Time kept back from the Lambda deadline to build and return the response
+DEADLINE_MARGIN_SECONDS = 0.5
+
+
+class ProfilingMiddleware:
+    """Honour the X-Profile header and collect hot-path timings when enabled"""
+
+    # Plain ASGI rather than @app.middleware: it runs on every request and
+    # BaseHTTPMiddleware adds a task and a memory stream per request
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = parse_profile_header(Headers(scope=scope).get(PROFILE_HEADER))
+        with request_profile(mode), invocation_timings("api"):
+            await self.app(scope, receive, send)
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
 app = FastAPI(title="Task Management API")
+# Added first, so it runs inside the logging and deadline middleware below
+app.add_middleware(ProfilingMiddleware)
+
+
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    """Derive the request deadline from the Lambda's remaining time"""
+    aws_context = request.scope.get("aws.context")
+    if aws_context is not None:
+        budget = aws_context.get_remaining_time_in_millis() / 1000
+    else:
+        budget = float(os.environ.get("API_TIMEOUT_SECONDS", "10"))
+    with deadline_scope(max(budget - DEADLINE_MARGIN_SECONDS, 0.0)):
+        return await call_next(request)
+
+
+@app.middleware("http")
+async def invocation_log_context(request: Request, call_next):
+    """Attach the request ID to every log record and flush logs once per request"""
+    aws_context = request.scope.get("aws.context")
+    request_id = getattr(aws_context, "aws_request_id", None) or request.headers.get(
+        "x-request-id"
+    )
+    with log_invocation(request_id=request_id):
+        return await call_next(request)
+
 
 app.include_router(tasks_router)
 
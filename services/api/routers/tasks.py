@@ -1,37 +1,251 @@
 import logging
+import tempfile
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterator, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from services.api.schemas.task import TaskRequest, TaskResponse
+from services.api.schemas.task import (
+    TaskRequest,
+    TaskResponse,
+    TaskStatusBatchRequest,
+    TaskStatusBatchResponse,
+    TaskStatusResponse,
+)
+from services.api.serialization import ORJSONRoute, task_message_body
+from services.api.services.idempotency.factory import get_idempotency_store
+from services.api.services.idempotency.idempotency_service import (
+    IdempotencyKeyInProgressError,
+    IdempotencyKeyMismatchError,
+    IdempotencyService,
+    idempotency_cache,
+)
+from services.api.services.ingest.stream_ingest import StreamIngestor
+from services.api.services.queue.factory import get_queue_provider
 from services.api.services.queue.queue_service import TaskQueueService
-from services.api.services.queue.sqs_provider import SQSQueueProvider
+from services.api.services.queue.resilience import QueueUnavailableError
+from services.api.services.status.status_service import TaskStatusService, status_cache
+from services.common.profiling import profiled, timer
+from services.common.status.base import TaskStatusRecord
+from services.common.status.factory import get_status_store
+from services.common.structured_logging import bind_log_context
+from services.common.tombstones.factory import get_tombstone_store
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["Tasks"])
+# Bulk ingest results above this size spill from memory to a temporary file
+RESULTS_SPOOL_BYTES = 1024 * 1024
 
+# Endpoints return ORJSONResponse directly: payloads are built from trusted
+# internal data, so FastAPI's response_model re-validation is skipped and
+# response_model only documents the schema
+router = APIRouter(
+    tags=["Tasks"], route_class=ORJSONRoute, default_response_class=ORJSONResponse
+)
 
-@router.post("/tasks", status_code=201, response_model=TaskResponse)
-def create_task(task: TaskRequest) -> TaskResponse:
-    task_id = str(uuid4())
 
-    payload = {
-        "task_id": task_id,
-        "title": task.title,
-        "description": task.description,
-        "priority": task.priority,
-        "due_date": task.due_date.isoformat() if task.due_date else None,
+def get_status_service() -> TaskStatusService:
+    return TaskStatusService(store=get_status_store(), cache=status_cache)
+
+
+def get_idempotency_service() -> IdempotencyService:
+    return IdempotencyService(store=get_idempotency_store(), cache=idempotency_cache)
+
+
+def status_content(record: TaskStatusRecord) -> Dict[str, Any]:
+    return {
+        "task_id": record.task_id,
+        "status": record.status,
+        "updated_at": datetime.fromtimestamp(record.updated_at, timezone.utc),
+        "error": record.error,
     }
 
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+@router.post(
+    "/tasks",
+    status_code=201,
+    response_model=TaskResponse,
+    responses={
+        409: {"description": "A request with this Idempotency-Key is still running"},
+        422: {"description": "Idempotency-Key reused with a different body"},
+    },
+)
+@profiled("api.create_task")
+def create_task(
+    task: TaskRequest,
+    idempotency_key: Optional[str] = Header(default=None, min_length=1, max_length=255),
+) -> ORJSONResponse:
+    if idempotency_key is None:
+        task_id = str(uuid4())
+        enqueue(task_id, task)
+        return ORJSONResponse({"task_id": task_id}, status_code=201)
+
     try:
-        # Initialize queue service with SQS provider
-        queue_provider = SQSQueueProvider()
-        queue_service = TaskQueueService(provider=queue_provider)
+        record, replayed = get_idempotency_service().create_once(
+            idempotency_key,
+            IdempotencyService.fingerprint(task),
+            lambda task_id: enqueue(task_id, task),
+        )
+    except IdempotencyKeyMismatchError as exc:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request body",
+        ) from exc
+    except IdempotencyKeyInProgressError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still in progress",
+        ) from exc
+
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    if replayed:
+        bind_log_context(task_id=record.task_id)
+        logger.info("Replayed idempotent task creation")
+    return ORJSONResponse({"task_id": record.task_id}, status_code=201, headers=headers)
 
-        queue_service.enqueue_task(task_data=payload, task_id=task_id)
+
+def enqueue(task_id: str, task: TaskRequest) -> None:
+    bind_log_context(task_id=task_id)
+
+    with timer("serialization"):
+        message_body = task_message_body(task_id, task)
+
+    try:
+        # Queue provider is shared across requests (see QUEUE_PROVIDER)
+        queue_service = TaskQueueService(provider=get_queue_provider())
+
+        queue_service.enqueue_message(
+            message_body=message_body, task_id=task_id, ordering_key=task.ordering_key
+        )
+    except QueueUnavailableError as exc:
+        logger.warning("Queue unavailable, rejecting task", extra={"reason": str(exc)})
+        raise HTTPException(
+            status_code=503,
+            detail="Task queue temporarily unavailable",
+            headers={"Retry-After": str(max(1, round(exc.retry_after_seconds)))},
+        ) from exc
     except Exception as exc:
         logger.exception("Failed to send message to SQS")
         raise HTTPException(status_code=500, detail="Failed to enqueue task") from exc
 
-    return TaskResponse(task_id=task_id)
+    get_status_service().mark_queued(task_id)
+
+
+@router.post(
+    "/tasks/stream",
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One result line per input line, then a summary line",
+        }
+    },
+)
+async def create_tasks_stream(request: Request) -> StreamingResponse:
+    results = tempfile.SpooledTemporaryFile(max_size=RESULTS_SPOOL_BYTES)
+    provider = get_queue_provider()
+    ingestor = StreamIngestor(
+        queue_service=TaskQueueService(provider=provider),
+        status_service=get_status_service(),
+        results=results,
+        batch_size=provider.max_batch_size,
+    )
+    # The whole body is consumed before responding; the streamed response
+    # then only replays the spooled results
+    try:
+        counts = await ingestor.ingest(request.stream())
+    except BaseException:
+        results.close()
+        raise
+    logger.info("Stream ingest finished", extra=counts)
+
+    results.write(orjson.dumps({"summary": counts}) + b"\n")
+    results.seek(0)
+    return StreamingResponse(iter_file(results), media_type="application/x-ndjson")
+
+
+def iter_file(file: IO[bytes], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    with file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+@router.post("/tasks/status", response_model=TaskStatusBatchResponse)
+def get_task_statuses(request: TaskStatusBatchRequest) -> ORJSONResponse:
+    records = get_status_service().get_many(request.task_ids)
+
+    return ORJSONResponse(
+        {
+            "tasks": [status_content(record) for record in records.values()],
+            "not_found": [
+                task_id
+                for task_id in dict.fromkeys(request.task_ids)
+                if task_id not in records
+            ],
+        }
+    )
+
+
+@router.get(
+    "/tasks/{task_id}",
+    response_model=TaskStatusResponse,
+    responses={304: {"description": "Status unchanged since the given ETag"}},
+)
+def get_task_status(
+    task_id: str,
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    status_service = get_status_service()
+    record = status_service.get(task_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    etag = status_service.etag(record)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return ORJSONResponse(status_content(record), headers=headers)
+
+
+@router.delete(
+    "/tasks/{task_id}",
+    response_model=TaskStatusResponse,
+    responses={
+        404: {"description": "Task not found"},
+        409: {"description": "Task already started or finished"},
+    },
+)
+def cancel_task(task_id: str) -> ORJSONResponse:
+    bind_log_context(task_id=task_id)
+    status_service = get_status_service()
+    record = status_service.cancel(task_id)
+    if record is None:
+        record = status_service.store.get(task_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if record.status != "cancelled":
+            raise HTTPException(
+                status_code=409, detail=f"Task is already {record.status}"
+            )
+        # Repeated cancellation: write the tombstone again in case the first
+        # attempt failed after the status changed
+
+    # The tombstone is what stops the processor; the status only reports it
+    try:
+        get_tombstone_store().add(task_id)
+    except Exception as exc:
+        logger.exception("Failed to write tombstone")
+        raise HTTPException(status_code=500, detail="Failed to cancel task") from exc
+
+    logger.info("Task cancelled")
+    return ORJSONResponse(status_content(record))
@@ -1,14 +1,19 @@
 from datetime import datetime, timezone
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field, validator
 
+from services.common.profiling import timer
+
 
 class TaskRequest(BaseModel):
     title: str = Field(min_length=1, max_length=200)
     description: str = Field(min_length=1)
     priority: Literal["low", "medium", "high"]
     due_date: Optional[datetime] = None
+    # Tasks with the same key are processed in order; used as the SQS message
+    # group ID, hence 1-128 printable ASCII characters
+    ordering_key: Optional[str] = Field(default=None, regex=r"^[!-~]{1,128}$")
 
     @validator("due_date")
     def due_date_must_be_future(cls, v):
@@ -22,6 +27,28 @@ class TaskRequest(BaseModel):
                 raise ValueError("due_date must be in the future")
         return v
 
+    @classmethod
+    def validate(cls, value):
+        # Entry point FastAPI uses to validate request bodies
+        with timer("validation"):
+            return super().validate(value)
+
 
 class TaskResponse(BaseModel):
     task_id: str
+
+
+class TaskStatusResponse(BaseModel):
+    task_id: str
+    status: str
+    updated_at: datetime
+    error: Optional[str] = None
+
+
+class TaskStatusBatchRequest(BaseModel):
+    task_ids: List[str] = Field(min_items=1, max_items=100)
+
+
+class TaskStatusBatchResponse(BaseModel):
+    tasks: List[TaskStatusResponse]
+    not_found: List[str]
@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class IdempotencyRecord(BaseModel):
+    key: str
+    task_id: str
+    fingerprint: str  # Hash of the request body the key was first used with
+    created_at: float  # Unix epoch seconds
+
+
+class IdempotencyStore(ABC):
+    """Base class for all idempotency key stores"""
+
+    # How long a key is remembered, in seconds
+    ttl_seconds: float
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        """
+        Look up the task created for an idempotency key.
+
+        Args:
+            key: Client supplied idempotency key
+
+        Returns:
+            IdempotencyRecord or None if the key is unknown or expired
+        """
+        pass
+
+    @abstractmethod
+    def put_if_absent(self, record: IdempotencyRecord) -> IdempotencyRecord:
+        """
+        Store a record unless a live one already exists for its key.
+
+        Args:
+            record: Record to store
+
+        Returns:
+            IdempotencyRecord: The stored record, which is the existing one if
+            another request claimed the key first
+        """
+        pass
+
+    @abstractmethod
+    def get_store_name(self) -> str:
+        """Return the name of this idempotency store"""
+        pass
@@ -0,0 +1,18 @@
+import os
+from functools import lru_cache
+
+from .base import IdempotencyStore
+from .sqlite_store import SQLiteIdempotencyStore
+
+
+@lru_cache(maxsize=None)
+def get_idempotency_store() -> IdempotencyStore:
+    """
+    Return the process-wide idempotency store selected by ``IDEMPOTENCY_STORE``.
+
+    The store is created once per process and reused across invocations.
+    """
+    store_type = os.environ.get("IDEMPOTENCY_STORE", "sqlite")
+    if store_type == "sqlite":
+        return SQLiteIdempotencyStore()
+    raise RuntimeError(f"Unsupported IDEMPOTENCY_STORE: {store_type}")
@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+import orjson
+from pydantic import BaseModel
+
+from services.api.services.queue.resilience import current_deadline
+from services.common.cache import TTLCache
+
+from .base import IdempotencyRecord, IdempotencyStore
+
+logger = logging.getLogger(__name__)
+
+# Namespace for task IDs derived from idempotency keys
+TASK_ID_NAMESPACE = uuid.UUID("0b7f3c1e-5d6a-4c2e-9a41-6f1d2e8b7c90")
+
+# How long a duplicate request waits for the original when no deadline is set
+DEFAULT_WAIT_SECONDS = 10.0
+
+# Shared by every request served by this process
+idempotency_cache: TTLCache[IdempotencyRecord] = TTLCache(
+    maxsize=int(os.environ.get("IDEMPOTENCY_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.environ.get("IDEMPOTENCY_CACHE_TTL_SECONDS", "300")),
+)
+
+# Requests currently enqueueing in this process, keyed by idempotency key
+_in_flight: Dict[str, threading.Event] = {}
+_in_flight_lock = threading.Lock()
+
+
+class IdempotencyKeyMismatchError(Exception):
+    """Raised when a key is reused with a different request body"""
+
+
+class IdempotencyKeyInProgressError(Exception):
+    """Raised when the original request for a key did not finish in time"""
+
+
+class IdempotencyService:
+    """
+    Service that maps client idempotency keys to the task they created.
+
+    The task ID is derived from the key, and providers use it as the SQS
+    deduplication ID, so even requests racing on different API instances
+    enqueue at most one message within the deduplication window. Within a
+    process, concurrent requests for the same key are coalesced: one request
+    enqueues and the others wait for its result.
+
+    Keys are global: the API has no notion of a client to scope them by, so
+    clients should use random keys (e.g. UUIDs) rather than counters.
+    """
+
+    def __init__(self, store: IdempotencyStore, cache: TTLCache[IdempotencyRecord]):
+        """
+        Initialize the idempotency service.
+
+        Args:
+            store: Idempotency store shared across API instances
+            cache: In-process LRU cache placed in front of the store
+        """
+        self.store = store
+        self.cache = cache
+
+    def task_id_for(self, key: str, now: Optional[float] = None) -> str:
+        """
+        Return the task ID derived from an idempotency key.
+
+        The ID also depends on the TTL-long window ``now`` falls in. A key
+        expires a full TTL after first use, so a key reused after it expired
+        always gets a new task ID instead of the old task's. Requests racing
+        across a window boundary on different API instances could enqueue
+        twice; one such boundary passes per TTL.
+
+        Args:
+            key: Client supplied idempotency key
+            now: Unix time of the request; defaults to the current time
+        """
+        window = int((time.time() if now is None else now) // self.store.ttl_seconds)
+        return str(uuid.uuid5(TASK_ID_NAMESPACE, f"{window}:{key}"))
+
+    @staticmethod
+    def fingerprint(task: BaseModel) -> str:
+        """Return a hash identifying the validated request body"""
+        return hashlib.sha256(orjson.dumps(task.__dict__)).hexdigest()
+
+    def create_once(
+        self, key: str, fingerprint: str, enqueue: Callable[[str], None]
+    ) -> Tuple[IdempotencyRecord, bool]:
+        """
+        Run ``enqueue`` for the first request with this key only.
+
+        Args:
+            key: Client supplied idempotency key
+            fingerprint: Hash of the request body
+            enqueue: Enqueues the task under the given task ID; exceptions
+                propagate and leave the key unused
+
+        Returns:
+            tuple: The key's record and whether it was replayed from an
+            earlier request
+
+        Raises:
+            IdempotencyKeyMismatchError: The key was used with another body
+            IdempotencyKeyInProgressError: The original request is still running
+        """
+        while True:
+            record = self._lookup(key)
+            if record is not None:
+                return self._replay(record, fingerprint), True
+
+            with _in_flight_lock:
+                event = _in_flight.get(key)
+                leader = event is None
+                if leader:
+                    event = _in_flight[key] = threading.Event()
+
+            if not leader:
+                # Wait for the original request, then read its outcome; if it
+                # failed, the loop lets this request try again
+                if not event.wait(self._wait_seconds()):
+                    raise IdempotencyKeyInProgressError(key)
+                continue
+
+            try:
+                return self._create(key, fingerprint, enqueue)
+            finally:
+                with _in_flight_lock:
+                    del _in_flight[key]
+                event.set()
+
+    def _create(
+        self, key: str, fingerprint: str, enqueue: Callable[[str], None]
+    ) -> Tuple[IdempotencyRecord, bool]:
+        # Another request may have finished between the lookup and the claim
+        record = self._lookup(key)
+        if record is not None:
+            return self._replay(record, fingerprint), True
+
+        task_id = self.task_id_for(key)
+        enqueue(task_id)
+
+        record = IdempotencyRecord(
+            key=key, task_id=task_id, fingerprint=fingerprint, created_at=time.time()
+        )
+        try:
+            stored = self.store.put_if_absent(record)
+        except Exception:
+            # The task is already enqueued; the derived task ID still
+            # deduplicates retries inside the SQS window
+            logger.exception(
+                "Failed to record idempotency key", extra={"task_id": task_id}
+            )
+            stored = record
+        self.cache.set(key, stored)
+
+        if stored.task_id != task_id:
+            return self._replay(stored, fingerprint), True
+        return stored, False
+
+    def _lookup(self, key: str) -> Optional[IdempotencyRecord]:
+        record = self.cache.get(key)
+        # The cache can outlive the key; an expired key is unused
+        if (
+            record is not None
+            and record.created_at > time.time() - self.store.ttl_seconds
+        ):
+            return record
+        try:
+            record = self.store.get(key)
+        except Exception:
+            logger.exception("Failed to read idempotency key")
+            return None
+        if record is not None:
+            self.cache.set(key, record)
+        return record
+
+    @staticmethod
+    def _replay(record: IdempotencyRecord, fingerprint: str) -> IdempotencyRecord:
+        if record.fingerprint != fingerprint:
+            raise IdempotencyKeyMismatchError(record.key)
+        return record
+
+    @staticmethod
+    def _wait_seconds() -> float:
+        deadline = current_deadline()
+        return deadline.remaining() if deadline is not None else DEFAULT_WAIT_SECONDS
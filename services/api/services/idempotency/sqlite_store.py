@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from .base import IdempotencyRecord, IdempotencyStore
+
+DEFAULT_DB_PATH = "/tmp/idempotency.sqlite3"
+
+# Keys are remembered for 24 hours, like most public APIs that accept them
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """Local SQLite idempotency key store, a stand-in for a shared database"""
+
+    def __init__(
+        self, db_path: Optional[str] = None, ttl_seconds: Optional[float] = None
+    ):
+        """
+        Open (and create if needed) the idempotency database.
+
+        Args:
+            db_path: Database file; defaults to ``IDEMPOTENCY_DB_PATH`` or /tmp
+            ttl_seconds: Key lifetime; defaults to ``IDEMPOTENCY_TTL_SECONDS`` or 24h
+        """
+        self.db_path = db_path or os.environ.get("IDEMPOTENCY_DB_PATH", DEFAULT_DB_PATH)
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        )
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                key TEXT PRIMARY KEY,
+                task_id TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, task_id, fingerprint, created_at FROM idempotency_keys"
+                " WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return self._to_record(row) if row else None
+
+    def put_if_absent(self, record: IdempotencyRecord) -> IdempotencyRecord:
+        with self._lock:
+            # An expired row is replaced as if it did not exist
+            cursor = self._conn.execute(
+                "INSERT INTO idempotency_keys (key, task_id, fingerprint, created_at)"
+                " VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET"
+                " task_id = excluded.task_id, fingerprint = excluded.fingerprint,"
+                " created_at = excluded.created_at"
+                " WHERE idempotency_keys.created_at <= ?",
+                (
+                    record.key,
+                    record.task_id,
+                    record.fingerprint,
+                    record.created_at,
+                    time.time() - self.ttl_seconds,
+                ),
+            )
+            self._conn.commit()
+
+        if cursor.rowcount == 0:
+            return self.get(record.key) or record
+        return record
+
+    def get_store_name(self) -> str:
+        return "sqlite"
+
+    @staticmethod
+    def _to_record(row: tuple) -> IdempotencyRecord:
+        key, task_id, fingerprint, created_at = row
+        return IdempotencyRecord(
+            key=key, task_id=task_id, fingerprint=fingerprint, created_at=created_at
+        )
@@ -0,0 +1,318 @@
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import IO, Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from uuid import uuid4
+
+import orjson
+from pydantic import ValidationError
+
+from services.api.schemas.task import TaskRequest
+from services.api.serialization import task_message_body
+from services.api.services.queue.queue_service import TaskQueueService
+from services.api.services.queue.resilience import current_deadline
+from services.api.services.status.status_service import TaskStatusService
+
+logger = logging.getLogger(__name__)
+
+# Longest accepted NDJSON line; longer lines are rejected without buffering them
+DEFAULT_MAX_LINE_BYTES = 64 * 1024
+
+# Assumed duration of one batch send until a send has been timed
+DEFAULT_BATCH_SECONDS = 0.1
+
+# Threads running batch sends, shared by concurrent uploads; asyncio's default
+# pool has only os.cpu_count() + 4, fewer than one upload's in-flight batches
+SEND_WORKERS = 32
+
+
+@lru_cache(maxsize=None)
+def _send_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=SEND_WORKERS, thread_name_prefix="stream-send")
+
+
+async def ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int = DEFAULT_MAX_LINE_BYTES
+) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a byte stream into NDJSON lines without holding more than one line.
+
+    Args:
+        chunks: Body chunks as received
+        max_line_bytes: Longest line kept
+
+    Yields:
+        bytes for each line (without the newline), or None for a line that
+        exceeded ``max_line_bytes``
+    """
+    pending = bytearray()
+    oversized = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not oversized:
+                    pending += chunk[start:]
+                    if len(pending) > max_line_bytes:
+                        oversized = True
+                        pending.clear()
+                break
+            if oversized or len(pending) + end - start > max_line_bytes:
+                yield None
+            else:
+                pending += chunk[start:end]
+                yield bytes(pending)
+            pending.clear()
+            oversized = False
+            start = end + 1
+    if oversized:
+        yield None
+    elif pending:
+        yield bytes(pending)
+
+
+class StreamIngestor:
+    """
+    Enqueues tasks from an NDJSON stream in bounded batches.
+
+    Lines are validated as they arrive and valid tasks are sent in batches
+    of ``batch_size``, one buffer per queue shard (``shard_for``), so with a
+    sharded queue every full batch is one whole call to one queue. At most ``max_in_flight_batches`` sends run at once;
+    while that many are pending, reading pauses, which pushes back on the
+    uploader. Per-line results are written to ``results`` as NDJSON, so
+    memory stays flat regardless of the upload size (buffers hold at most
+    ``batch_size`` tasks per shard).
+
+    Tasks keep their order within a message group (ordering key, or the
+    shared group of unkeyed tasks): a batch is only sent once every earlier
+    batch with a task in one of its groups has been sent, so only batches
+    with disjoint groups overlap. Once a task fails, later tasks in its
+    group are not sent and are reported as failed too.
+
+    Under a request deadline, reading stops once the time left cannot cover
+    the next batch and the in-flight ones it may wait for (as long as the
+    slowest send so far each). Lines read but not sent are reported as
+    failed, and the summary's ``stopped_at_line`` is the first line not
+    read, so the client can resume from there.
+    """
+
+    def __init__(
+        self,
+        queue_service: TaskQueueService,
+        status_service: TaskStatusService,
+        results: IO[bytes],
+        batch_size: int = 10,
+        max_in_flight_batches: int = 8,
+        max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        """
+        Initialize the ingestor.
+
+        Args:
+            queue_service: Queue service used for batched sends
+            status_service: Records the accepted tasks as queued
+            results: Binary file receiving one result line per input line
+            batch_size: Messages per send (the provider's ``max_batch_size``)
+            max_in_flight_batches: Concurrent sends before reading pauses
+            max_line_bytes: Longest accepted line
+            executor: Pool running the blocking sends; a pool shared by all
+                uploads by default
+        """
+        self.queue_service = queue_service
+        self.status_service = status_service
+        self.results = results
+        self.batch_size = batch_size
+        self.max_line_bytes = max_line_bytes
+        self.executor = executor or _send_executor()
+        self.counts = {"lines": 0, "accepted": 0, "rejected": 0, "failed": 0}
+        self._slots = asyncio.Semaphore(max_in_flight_batches)
+        self._in_flight: Set[asyncio.Task] = set()
+        # Last submitted send per message group (None: unkeyed tasks)
+        self._tails: Dict[Optional[str], asyncio.Task] = {}
+        self._failed_groups: Set[Optional[str]] = set()
+        # Slowest batch send so far, 0 until one has been timed
+        self._batch_seconds = 0.0
+        self._stopped = False
+
+    async def ingest(self, chunks: AsyncIterator[bytes]) -> Dict[str, int]:
+        """
+        Consume the stream and wait for every batch to be sent.
+
+        Args:
+            chunks: Request body chunks
+
+        Returns:
+            dict: Line counts by outcome, plus ``stopped_at_line`` if the
+            request deadline stopped the upload early
+        """
+        # Tasks not sent yet, per queue shard (None: unsharded queue)
+        buffers: Dict[Optional[str], List[Tuple[int, str, str, Optional[str]]]] = {}
+        async for line in ndjson_lines(chunks, self.max_line_bytes):
+            self.counts["lines"] += 1
+            line_number = self.counts["lines"]
+            if line is None:
+                self._reject(line_number, "Line too long")
+                continue
+            if not line.strip():
+                continue
+
+            task = self._parse(line_number, line)
+            if task is None:
+                continue
+            task_id = str(uuid4())
+            shard = self.queue_service.shard_for(task_id, task.ordering_key)
+            batch = buffers.setdefault(shard, [])
+            batch.append(
+                (
+                    line_number,
+                    task_id,
+                    task_message_body(task_id, task),
+                    task.ordering_key,
+                )
+            )
+            if len(batch) == self.batch_size:
+                del buffers[shard]
+                if not await self._submit(batch):
+                    break
+        # Partial batches, oldest first; reported unsent once stopped
+        for batch in sorted(buffers.values(), key=lambda batch: batch[0][0]):
+            await self._submit(batch)
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+        if self._stopped:
+            self.counts["stopped_at_line"] = self.counts["lines"] + 1
+            logger.warning(
+                "Stream ingest stopped at the request deadline",
+                extra={"stopped_at_line": self.counts["stopped_at_line"]},
+            )
+        return self.counts
+
+    def _parse(self, line_number: int, line: bytes) -> Optional[TaskRequest]:
+        try:
+            return TaskRequest.parse_obj(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            self._reject(line_number, "Invalid JSON")
+        except ValidationError as exc:
+            self._reject(line_number, "Validation failed", exc.errors())
+        return None
+
+    async def _submit(self, batch: List[Tuple[int, str, str, Optional[str]]]) -> bool:
+        if not self._stopped:
+            # Blocks while the in-flight limit is reached: backpressure
+            await self._slots.acquire()
+            if self._out_of_time(batches_ahead=len(self._in_flight)):
+                self._slots.release()
+                self._stopped = True
+        if self._stopped:
+            self._not_sent(batch, "Not sent: request deadline reached")
+            return False
+        groups = {ordering_key for *_, ordering_key in batch}
+        after = {self._tails[group] for group in groups if group in self._tails}
+        task = asyncio.create_task(self._send(batch, after))
+        for group in groups:
+            self._tails[group] = task
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+        return True
+
+    async def _send(
+        self,
+        batch: List[Tuple[int, str, str, Optional[str]]],
+        after: Set[asyncio.Task],
+    ) -> None:
+        groups = {ordering_key for *_, ordering_key in batch}
+        try:
+            # Earlier sends to the same message groups must reach the queue first
+            if after:
+                await asyncio.wait(after)
+            # The time left only shrinks and the estimate only grows, so later
+            # batches of the same groups are not sent either
+            if self._out_of_time(batches_ahead=0):
+                self._stopped = True
+                unsent, batch = batch, []
+            else:
+                unsent = []
+            blocked = [entry for entry in batch if entry[3] in self._failed_groups]
+            batch = [entry for entry in batch if entry[3] not in self._failed_groups]
+            failed = await self._send_entries(batch) if batch else set()
+        finally:
+            self._slots.release()
+            current = asyncio.current_task()
+            for group in groups:
+                if self._tails.get(group) is current:
+                    del self._tails[group]
+
+        self._failed_groups.update(
+            group for _, task_id, _, group in batch if task_id in failed
+        )
+        for line_number, task_id, *_ in batch:
+            if task_id in failed:
+                self.counts["failed"] += 1
+                self._write({"line": line_number, "error": "Failed to enqueue task"})
+            else:
+                self.counts["accepted"] += 1
+                self._write({"line": line_number, "task_id": task_id})
+        self._not_sent(blocked, "Not sent: an earlier task in its ordering group failed")
+        self._not_sent(unsent, "Not sent: request deadline reached")
+
+    def _out_of_time(self, batches_ahead: int) -> bool:
+        deadline = current_deadline()
+        if deadline is None:
+            return False
+        batch_seconds = self._batch_seconds or DEFAULT_BATCH_SECONDS
+        return deadline.remaining() < (batches_ahead + 1) * batch_seconds
+
+    def _not_sent(
+        self, batch: List[Tuple[int, str, str, Optional[str]]], error: str
+    ) -> None:
+        for line_number, *_ in batch:
+            self.counts["failed"] += 1
+            self._write({"line": line_number, "error": error})
+
+    async def _send_entries(
+        self, batch: List[Tuple[int, str, str, Optional[str]]]
+    ) -> Set[str]:
+        entries = [(message_body, task_id) for _, task_id, message_body, _ in batch]
+        ordering_keys = [ordering_key for *_, ordering_key in batch]
+        started = time.monotonic()
+        try:
+            # Carry the request deadline and log context into the worker
+            response = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                contextvars.copy_context().run,
+                self._enqueue,
+                entries,
+                ordering_keys,
+            )
+        except Exception:
+            logger.exception("Failed to enqueue task batch")
+            return {task_id for _, task_id in entries}
+        finally:
+            self._batch_seconds = max(self._batch_seconds, time.monotonic() - started)
+        return {entry["Id"] for entry in response["Failed"]}
+
+    def _enqueue(
+        self, entries: List[Tuple[str, str]], ordering_keys: List[Optional[str]]
+    ) -> Dict[str, Any]:
+        response = self.queue_service.enqueue_messages(entries, ordering_keys)
+        failed = {entry["Id"] for entry in response["Failed"]}
+        self.status_service.mark_queued_many(
+            [task_id for _, task_id in entries if task_id not in failed]
+        )
+        return response
+
+    def _reject(self, line_number: int, error: str, details: Any = None) -> None:
+        self.counts["rejected"] += 1
+        result: Dict[str, Any] = {"line": line_number, "error": error}
+        if details is not None:
+            result["details"] = details
+        self._write(result)
+
+    def _write(self, result: Dict[str, Any]) -> None:
+        self.results.write(orjson.dumps(result, default=str) + b"\n")
@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 
 class QueueProvider(ABC):
     """Base class for all queue providers"""
 
+    # Most entries one send_message_batch call accepts
+    max_batch_size = 10
+
     @abstractmethod
     def send_message(self, message_body: str, task_id: str, **kwargs) -> Dict[str, Any]:
         """
@@ -13,13 +16,62 @@ class QueueProvider(ABC):
         Args:
             message_body: The message payload as JSON string
             task_id: Unique task identifier for deduplication
-            **kwargs: Additional provider-specific parameters
+            **kwargs: Additional provider-specific parameters;
+                ``message_attributes`` maps attribute names to string values,
+                ``ordering_key`` orders the message after earlier ones with
+                the same key
 
         Returns:
             dict: Response from the queue provider
         """
         pass
 
+    def send_message_batch(
+        self, entries: Sequence[Tuple[str, str]], **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Send several messages, reporting the outcome of each.
+
+        The default sends them one by one; providers with a native batch
+        API should override this.
+
+        Args:
+            entries: ``(message_body, task_id)`` pairs
+            **kwargs: Additional provider-specific parameters;
+                ``message_attributes`` is a list of attribute dicts and
+                ``ordering_keys`` a list of ordering keys, one per entry
+
+        Returns:
+            dict: ``Successful`` and ``Failed`` lists of entries keyed by
+            ``Id`` (the task ID), in the shape of SQS SendMessageBatch
+        """
+        attributes = kwargs.pop("message_attributes", None)
+        ordering_keys = kwargs.pop("ordering_keys", None)
+        successful, failed = [], []
+        for index, (message_body, task_id) in enumerate(entries):
+            if attributes is not None:
+                kwargs["message_attributes"] = attributes[index]
+            if ordering_keys is not None:
+                kwargs["ordering_key"] = ordering_keys[index]
+            try:
+                response = self.send_message(message_body, task_id, **kwargs)
+            except Exception as exc:
+                failed.append({"Id": task_id, "Message": str(exc)})
+            else:
+                successful.append({"Id": task_id, "MessageId": response.get("MessageId")})
+        return {"Successful": successful, "Failed": failed}
+
+    def shard_for(
+        self, task_id: str, ordering_key: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Return the name of the queue a task is sent to.
+
+        Batches holding tasks of one shard only fill whole calls; the default
+        is None, as a single-queue provider has no shards.
+        """
+        return None
+
     @abstractmethod
     def get_provider_name(self) -> str:
         """Return the name of this queue provider"""
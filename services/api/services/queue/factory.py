@@ -0,0 +1,50 @@
+import os
+from functools import lru_cache
+
+from .base import QueueProvider
+from .hedged_provider import HedgedQueueProvider
+from .sharded_provider import ShardedQueueProvider
+from .sqs_provider import SQSQueueProvider
+
+
+@lru_cache(maxsize=None)
+def get_queue_provider() -> QueueProvider:
+    """
+    Return the process-wide queue provider selected by ``QUEUE_PROVIDER``.
+
+    The provider (and its SQS clients) is created once per process and reused
+    across requests, which also lets composite providers keep latency and
+    health history between requests.
+
+    - ``sqs`` (default): single SQS queue at ``QUEUE_URL``
+    - ``hedged``: ``QUEUE_URL`` as primary, ``SECONDARY_QUEUE_URL`` as secondary;
+      refused while ``TASK_STATUS_STORE`` is the instance-local ``sqlite`` store
+    - ``sharded``: tasks spread by ordering key over the comma-separated ``QUEUE_URLS``
+    """
+    provider_type = os.environ.get("QUEUE_PROVIDER", "sqs")
+    if provider_type == "sqs":
+        return SQSQueueProvider()
+    if provider_type == "hedged":
+        if os.environ.get("TASK_STATUS_STORE", "sqlite") == "sqlite":
+            # Hedged copies are only deduplicated by a status store shared by
+            # every consumer; the SQLite store is local to each instance
+            raise RuntimeError(
+                "QUEUE_PROVIDER=hedged requires a shared TASK_STATUS_STORE, not sqlite"
+            )
+        secondary_url = os.environ.get("SECONDARY_QUEUE_URL")
+        if not secondary_url:
+            raise RuntimeError("SECONDARY_QUEUE_URL environment variable is not set")
+        return HedgedQueueProvider(
+            primary=SQSQueueProvider(),
+            secondary=SQSQueueProvider(queue_url=secondary_url),
+            hedge_percentile=float(os.environ.get("HEDGE_PERCENTILE", "0.95")),
+        )
+    if provider_type == "sharded":
+        queue_urls = [url.strip() for url in os.environ.get("QUEUE_URLS", "").split(",")]
+        queue_urls = [url for url in queue_urls if url]
+        if not queue_urls:
+            raise RuntimeError("QUEUE_URLS environment variable is not set")
+        return ShardedQueueProvider(
+            {url: SQSQueueProvider(queue_url=url) for url in queue_urls}
+        )
+    raise RuntimeError(f"Unsupported QUEUE_PROVIDER: {provider_type}")
@@ -0,0 +1,240 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .base import QueueProvider
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "primary"
+SECONDARY = "secondary"
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies"""
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Number of most recent samples kept
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Return the given percentile of the window.
+
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.95
+
+        Returns:
+            float or None if no samples have been recorded yet
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(int(fraction * len(samples)), len(samples) - 1)
+        return samples[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgedQueueProvider(QueueProvider):
+    """
+    Composite provider that hedges slow sends and fails over on errors.
+
+    Every send goes to the primary first. If it has not answered after the
+    configured latency percentile of its recent sends, the same message is
+    also sent to the secondary and the first success wins. Primary errors
+    fail over to the secondary immediately, and after repeated primary
+    failures the secondary is used first until a cooldown has passed.
+
+    A hedged message ends up in both queues: deduplication IDs do not span
+    queues. Consumers run a task only after claiming it atomically in the
+    status store, so copies are processed once only if every consumer shares
+    that store. The bundled SQLite store is local to each function instance,
+    so ``get_queue_provider()`` refuses to build this provider with it.
+    """
+
+    def __init__(
+        self,
+        primary: QueueProvider,
+        secondary: QueueProvider,
+        hedge_percentile: float = 0.95,
+        min_hedge_delay_seconds: float = 0.05,
+        initial_hedge_delay_seconds: float = 0.5,
+        min_samples: int = 20,
+        failover_threshold: int = 3,
+        failover_cooldown_seconds: float = 30.0,
+        executor: Optional[ThreadPoolExecutor] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the composite provider.
+
+        Args:
+            primary: Preferred provider
+            secondary: Provider used for hedged requests and failover
+            hedge_percentile: Primary latency percentile after which to hedge
+            min_hedge_delay_seconds: Lower bound on the hedge delay
+            initial_hedge_delay_seconds: Hedge delay until enough samples exist
+            min_samples: Primary samples needed before the percentile is used
+            failover_threshold: Consecutive primary failures before failing over
+            failover_cooldown_seconds: Time before the primary is tried first again
+            executor: Pool running the sends; a small private pool by default
+            clock: Monotonic time source
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay_seconds = min_hedge_delay_seconds
+        self.initial_hedge_delay_seconds = initial_hedge_delay_seconds
+        self.min_samples = min_samples
+        self.failover_threshold = failover_threshold
+        self.failover_cooldown_seconds = failover_cooldown_seconds
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix="hedged-send"
+        )
+        self.clock = clock
+
+        self.primary_latency = LatencyTracker()
+        self.wins: Counter = Counter()
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._failover_until = 0.0
+
+    def hedge_delay(self) -> float:
+        """Return how long to wait for the primary before hedging"""
+        if len(self.primary_latency) < self.min_samples:
+            return self.initial_hedge_delay_seconds
+        delay = self.primary_latency.percentile(self.hedge_percentile)
+        return max(delay or 0.0, self.min_hedge_delay_seconds)
+
+    def send_message(self, message_body: str, task_id: str, **kwargs) -> Dict[str, Any]:
+        """
+        Send a message through the primary, hedging or failing over as needed.
+
+        Returns:
+            dict: Response of the winning provider, with ``Provider`` set to
+            ``"primary"`` or ``"secondary"``
+        """
+        if self._failed_over():
+            return self._send_with_fallback(
+                SECONDARY, PRIMARY, message_body, task_id, kwargs
+            )
+
+        primary = self._submit(PRIMARY, message_body, task_id, kwargs)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done:
+            try:
+                return self._won(PRIMARY, primary.result())
+            except Exception:
+                logger.warning(
+                    "Primary queue send failed, failing over",
+                    extra={"task_id": task_id},
+                    exc_info=True,
+                )
+                return self._won(
+                    SECONDARY, self._call(SECONDARY, message_body, task_id, kwargs)
+                )
+
+        logger.info("Hedging slow primary queue send", extra={"task_id": task_id})
+        secondary = self._submit(SECONDARY, message_body, task_id, kwargs)
+        names = {primary: PRIMARY, secondary: SECONDARY}
+        pending = set(names)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return self._won(names[future], future.result())
+                except Exception as exc:
+                    error = exc
+        assert error is not None
+        raise error
+
+    def get_provider_name(self) -> str:
+        return "hedged"
+
+    def _send_with_fallback(
+        self,
+        first_name: str,
+        second_name: str,
+        message_body: str,
+        task_id: str,
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        try:
+            return self._won(
+                first_name, self._call(first_name, message_body, task_id, kwargs)
+            )
+        except Exception:
+            logger.warning(
+                "Queue send failed, trying other provider",
+                extra={"task_id": task_id, "provider": first_name},
+                exc_info=True,
+            )
+            return self._won(
+                second_name, self._call(second_name, message_body, task_id, kwargs)
+            )
+
+    def _submit(
+        self, name: str, message_body: str, task_id: str, kwargs: Dict[str, Any]
+    ) -> Future:
+        # Carry log context (request and task IDs) into the worker thread
+        context = contextvars.copy_context()
+        return self.executor.submit(
+            context.run, self._call, name, message_body, task_id, kwargs
+        )
+
+    def _call(
+        self, name: str, message_body: str, task_id: str, kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        provider = self.primary if name == PRIMARY else self.secondary
+        start = self.clock()
+        try:
+            response = provider.send_message(
+                message_body=message_body, task_id=task_id, **kwargs
+            )
+        except Exception:
+            if name == PRIMARY:
+                self._primary_failed()
+            raise
+        if name == PRIMARY:
+            self.primary_latency.record(self.clock() - start)
+            self._primary_succeeded()
+        return response
+
+    def _won(self, name: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.wins[name] += 1
+        logger.debug("Queue send won", extra={"provider": name})
+        return {**response, "Provider": name}
+
+    def _failed_over(self) -> bool:
+        with self._lock:
+            return self.clock() < self._failover_until
+
+    def _primary_failed(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failover_threshold:
+                self._failover_until = self.clock() + self.failover_cooldown_seconds
+
+    def _primary_succeeded(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._failover_until = 0.0
@@ -1,6 +1,10 @@
-import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import orjson
+
+from services.common.profiling import timer
+from services.common.signing import SIGNATURE_ATTRIBUTE, MessageSigner, get_message_signer
 
 from .base import QueueProvider
 
@@ -10,14 +14,18 @@ logger = logging.getLogger(__name__)
 class TaskQueueService:
     """Service for managing task queue operations"""
 
-    def __init__(self, provider: QueueProvider):
+    def __init__(self, provider: QueueProvider, signer: Optional[MessageSigner] = None):
         """
         Initialize the queue service with a specific provider.
 
         Args:
             provider: Queue provider implementation
+            signer: Signs message bodies so the processor can trust them
+                without revalidating; defaults to the process-wide signer
+                (none unless signing is configured)
         """
         self.provider = provider
+        self.signer = signer or get_message_signer()
 
     def enqueue_task(self, task_data: Dict[str, Any], task_id: str) -> Dict[str, Any]:
         """
@@ -30,9 +38,84 @@ class TaskQueueService:
         Returns:
             dict: Response from the queue provider
         """
-        message_body = json.dumps(task_data)
+        message_body = orjson.dumps(task_data).decode()
+
+        return self.enqueue_message(message_body=message_body, task_id=task_id)
+
+    def enqueue_message(
+        self, message_body: str, task_id: str, ordering_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Enqueue an already serialized task.
+
+        Args:
+            message_body: Task payload as a JSON string
+            task_id: Unique task identifier
+            ordering_key: Tasks with the same key are delivered in order
+
+        Returns:
+            dict: Response from the queue provider
+        """
+        kwargs: Dict[str, Any] = {}
+        if ordering_key is not None:
+            kwargs["ordering_key"] = ordering_key
+        if self.signer is not None:
+            kwargs["message_attributes"] = self._attributes(message_body)
 
-        response = self.provider.send_message(message_body=message_body, task_id=task_id)
+        with timer("sqs_send"):
+            response = self.provider.send_message(
+                message_body=message_body, task_id=task_id, **kwargs
+            )
 
-        logger.info("Task enqueued", extra={"task_id": task_id})
+        logger.info(
+            "Task enqueued",
+            extra={
+                "task_id": task_id,
+                "provider": response.get("Provider") or self.provider.get_provider_name(),
+            },
+        )
         return response
+
+    def shard_for(
+        self, task_id: str, ordering_key: Optional[str] = None
+    ) -> Optional[str]:
+        """Return the queue shard a task goes to, or None for unsharded providers"""
+        return self.provider.shard_for(task_id, ordering_key)
+
+    def enqueue_messages(
+        self,
+        entries: Sequence[Tuple[str, str]],
+        ordering_keys: Optional[Sequence[Optional[str]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Enqueue several already serialized tasks in one provider call.
+
+        Args:
+            entries: ``(message_body, task_id)`` pairs
+            ordering_keys: Ordering key per entry, None for unkeyed entries
+
+        Returns:
+            dict: ``Successful`` and ``Failed`` entries keyed by task ID
+        """
+        kwargs: Dict[str, Any] = {}
+        if ordering_keys is not None and any(ordering_keys):
+            kwargs["ordering_keys"] = list(ordering_keys)
+        if self.signer is not None:
+            kwargs["message_attributes"] = [self._attributes(body) for body, _ in entries]
+
+        with timer("sqs_send"):
+            response = self.provider.send_message_batch(entries, **kwargs)
+
+        logger.info(
+            "Task batch enqueued",
+            extra={
+                "task_ids": [task_id for _, task_id in entries],
+                "failed": len(response["Failed"]),
+                "provider": self.provider.get_provider_name(),
+            },
+        )
+        return response
+
+    def _attributes(self, message_body: str) -> Dict[str, str]:
+        assert self.signer is not None
+        return {SIGNATURE_ATTRIBUTE: self.signer.sign(message_body)}
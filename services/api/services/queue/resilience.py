@@ -0,0 +1,221 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from services.common.metrics import put_metric
+
+logger = logging.getLogger(__name__)
+
+
+class QueueUnavailableError(Exception):
+    """Raised when the queue cannot be used right now; the client should retry later"""
+
+    def __init__(self, message: str, retry_after_seconds: float = 1.0):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class DeadlineExceededError(QueueUnavailableError):
+    """Raised when the request deadline leaves no time for another attempt"""
+
+
+class Deadline:
+    """Point in time by which the current request must have completed"""
+
+    def __init__(
+        self, timeout_seconds: float, clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the deadline.
+
+        Args:
+            timeout_seconds: Time from now until the deadline
+            clock: Monotonic time source
+        """
+        self.clock = clock
+        self.expires_at = clock() + timeout_seconds
+
+    def remaining(self) -> float:
+        """Return the seconds left, never negative"""
+        return max(self.expires_at - self.clock(), 0.0)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the request being served, if any"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(timeout_seconds: float) -> Iterator[Deadline]:
+    """
+    Set the request deadline for the duration of the block.
+
+    Args:
+        timeout_seconds: Time budget for the request
+    """
+    deadline = Deadline(timeout_seconds)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of request volume.
+
+    Every first attempt deposits ``ratio`` tokens and every retry withdraws
+    one, so during an outage retries add at most ``ratio`` extra load
+    instead of multiplying it. A small time-based allowance keeps retries
+    possible at low traffic.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_retries_per_second: float = 1.0,
+        max_tokens: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Retries allowed per request
+            min_retries_per_second: Allowance accrued regardless of traffic
+            max_tokens: Upper bound on saved-up retries
+            clock: Monotonic time source
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+        self.clock = clock
+        self._tokens = max_tokens
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """Deposit the allowance earned by a first attempt"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def try_acquire(self) -> bool:
+        """Withdraw one retry; return False if the budget is exhausted"""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed, self._updated_at = now - self._updated_at, now
+        self._tokens = min(
+            self._tokens + elapsed * self.min_retries_per_second, self.max_tokens
+        )
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a dependency is unhealthy.
+
+    Opens after ``failure_threshold`` consecutive failures, rejects calls for
+    ``reset_timeout_seconds``, then lets a single trial call through
+    (half-open); its outcome closes or re-opens the breaker. State changes
+    are logged and emitted as the ``CircuitBreakerState`` metric
+    (0 = closed, 1 = half-open, 2 = open).
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the breaker in the closed state.
+
+        Args:
+            name: Dependency name used in logs and metric dimensions
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout_seconds: Time spent open before a trial call
+            clock: Monotonic time source
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout_seconds:
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def retry_after(self) -> float:
+        """Return the seconds until the breaker will allow a trial call"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(self.reset_timeout_seconds - (self.clock() - self._opened_at), 0.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = self.clock()
+                self._transition(self.OPEN)
+
+    def _transition(self, state: str) -> None:
+        previous, self.state = self.state, state
+        logger.warning(
+            "Circuit breaker state changed",
+            extra={"breaker": self.name, "from_state": previous, "to_state": state},
+        )
+        put_metric(
+            "CircuitBreakerState",
+            self._STATE_VALUES[state],
+            unit="None",
+            dimensions={"Dependency": self.name},
+        )
@@ -0,0 +1,193 @@
+import bisect
+import contextvars
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .base import QueueProvider
+
+logger = logging.getLogger(__name__)
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to named nodes.
+
+    Every node owns ``replicas`` points on the ring, placed by hashing its
+    name, and a key belongs to the node owning the next point. Adding a node
+    moves only the keys it takes over (about 1/N of them) and removing one
+    moves only its own keys; the order in which nodes are listed does not
+    matter.
+    """
+
+    def __init__(self, nodes: Sequence[str], replicas: int = 256):
+        """
+        Build the ring.
+
+        Args:
+            nodes: Unique node names
+            replicas: Points per node; more points spread keys more evenly
+        """
+        if not nodes:
+            raise ValueError("At least one node is required")
+        points = sorted(
+            (self._hash(f"{node}#{replica}"), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        self.nodes = list(nodes)
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        """Return the node owning ``key``"""
+        index = bisect.bisect(self._points, self._hash(key))
+        return self._owners[index % len(self._owners)]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(
+            hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+        )
+
+
+class ShardedQueueProvider(QueueProvider):
+    """
+    Composite provider spreading tasks over several queues.
+
+    A FIFO queue has a per-queue throughput ceiling; sharding raises it
+    with the number of queues. Each task goes to the shard its ordering key
+    hashes to on a consistent hash ring, so tasks with the same key stay in
+    one queue and one message group, in order. Tasks without a key are
+    spread by task ID and keep no order relative to each other.
+    """
+
+    def __init__(
+        self,
+        shards: Mapping[str, QueueProvider],
+        replicas: int = 256,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        """
+        Initialize the composite provider.
+
+        Args:
+            shards: Provider per shard name; names place the shards on the
+                ring, so they must stay the same across deployments
+            replicas: Ring points per shard
+            executor: Pool sending the per-shard parts of batches; by default
+                room for every shard of a few concurrent batches
+        """
+        self.shards = dict(shards)
+        self.ring = HashRing(list(self.shards), replicas=replicas)
+        # One call's worth: callers fill whole calls by batching per shard
+        # (see shard_for); a mixed batch is split into smaller calls
+        self.max_batch_size = min(shard.max_batch_size for shard in self.shards.values())
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=8 * len(self.shards), thread_name_prefix="sharded-send"
+        )
+
+    def shard_for(self, task_id: str, ordering_key: Optional[str] = None) -> str:
+        """Return the name of the shard a task is sent to"""
+        return self.ring.node_for(ordering_key or task_id)
+
+    def send_message(self, message_body: str, task_id: str, **kwargs) -> Dict[str, Any]:
+        """
+        Send a message to the shard owning its ordering key.
+
+        Returns:
+            dict: Response of the shard's provider, with ``Shard`` set to its name
+        """
+        shard = self.shard_for(task_id, kwargs.get("ordering_key"))
+        response = self.shards[shard].send_message(
+            message_body=message_body, task_id=task_id, **kwargs
+        )
+        return {**response, "Shard": shard}
+
+    def send_message_batch(
+        self, entries: Sequence[Tuple[str, str]], **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Split a batch by shard and send the parts concurrently.
+
+        Queue limits are per call, so callers should group entries by
+        ``shard_for`` and send ``max_batch_size`` of one shard at a time;
+        entries of several shards are split into one part per shard. Each
+        part is sent in batches its provider accepts, in order.
+        After a failed batch the rest of that shard's part is not sent and
+        is reported failed; a shard that cannot be reached fails only its
+        own entries.
+        """
+        attributes = kwargs.get("message_attributes")
+        ordering_keys = kwargs.get("ordering_keys")
+        parts: Dict[str, List[int]] = {}
+        for index, (_, task_id) in enumerate(entries):
+            key = ordering_keys[index] if ordering_keys else None
+            parts.setdefault(self.shard_for(task_id, key), []).append(index)
+
+        futures = [
+            self.executor.submit(
+                # Carry the request deadline and log context into the worker
+                contextvars.copy_context().run,
+                self._send_part,
+                shard,
+                [entries[index] for index in indices],
+                [attributes[index] for index in indices] if attributes else None,
+                [ordering_keys[index] for index in indices] if ordering_keys else None,
+            )
+            for shard, indices in parts.items()
+        ]
+
+        successful: List[Dict[str, Any]] = []
+        failed: List[Dict[str, Any]] = []
+        for future in futures:
+            response = future.result()
+            successful.extend(response["Successful"])
+            failed.extend(response["Failed"])
+        return {"Successful": successful, "Failed": failed}
+
+    def get_provider_name(self) -> str:
+        return "sharded"
+
+    def _send_part(
+        self,
+        shard: str,
+        entries: List[Tuple[str, str]],
+        attributes: Optional[List[Any]],
+        ordering_keys: Optional[List[Optional[str]]],
+    ) -> Dict[str, Any]:
+        provider = self.shards[shard]
+        successful: List[Dict[str, Any]] = []
+        failed: List[Dict[str, Any]] = []
+        for start in range(0, len(entries), provider.max_batch_size):
+            end = start + provider.max_batch_size
+            kwargs: Dict[str, Any] = {}
+            if attributes is not None:
+                kwargs["message_attributes"] = attributes[start:end]
+            if ordering_keys is not None:
+                kwargs["ordering_keys"] = ordering_keys[start:end]
+            try:
+                response = provider.send_message_batch(entries[start:end], **kwargs)
+            except Exception as exc:
+                logger.warning(
+                    "Queue shard send failed", extra={"shard": shard}, exc_info=True
+                )
+                response = {
+                    "Successful": [],
+                    "Failed": [
+                        {"Id": task_id, "Message": str(exc)}
+                        for _, task_id in entries[start:end]
+                    ],
+                }
+            successful.extend(response["Successful"])
+            failed.extend(response["Failed"])
+            if response["Failed"]:
+                # Sending the rest could put later messages of a key ahead of
+                # the ones that failed
+                failed.extend(
+                    {"Id": task_id, "Message": "Not sent: an earlier message failed"}
+                    for _, task_id in entries[end:]
+                )
+                break
+        return {"Successful": successful, "Failed": failed}
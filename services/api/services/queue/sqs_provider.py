@@ -1,29 +1,134 @@
+import logging
 import os
-from typing import Any, Dict
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
 
 import boto3
 from botocore.config import Config
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+from services.common.metrics import put_metric
 
 from .base import QueueProvider
+from .resilience import (
+    CircuitBreaker,
+    DeadlineExceededError,
+    QueueUnavailableError,
+    RetryBudget,
+    current_deadline,
+)
+
+logger = logging.getLogger(__name__)
+
+# SendMessageBatch limit
+SQS_MAX_BATCH_SIZE = 10
+
+# Message group of tasks without an ordering key: one global order
+DEFAULT_MESSAGE_GROUP = "tasks"
+
+RETRYABLE_ERROR_CODES = frozenset(
+    {
+        "InternalError",
+        "InternalFailure",
+        "RequestThrottled",
+        "ServiceUnavailable",
+        "Throttling",
+        "ThrottlingException",
+    }
+)
+
+RETRYABLE_EXCEPTIONS = (
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+
+def sqs_message_attributes(attributes: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """Convert string attributes to the SQS MessageAttributes shape"""
+    return {
+        name: {"DataType": "String", "StringValue": value}
+        for name, value in (attributes or {}).items()
+    }
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True for throttling, server-side and connection failures"""
+    if isinstance(exc, ClientError):
+        code = exc.response.get("Error", {}).get("Code", "")
+        status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in RETRYABLE_ERROR_CODES or status >= 500
+    return isinstance(exc, RETRYABLE_EXCEPTIONS)
 
 
 class SQSQueueProvider(QueueProvider):
     """AWS SQS queue provider"""
 
-    def __init__(self):
-        """Initialize SQS client with retry configuration"""
-        self.queue_url = os.environ.get("QUEUE_URL")
+    max_batch_size = SQS_MAX_BATCH_SIZE
+
+    def __init__(
+        self,
+        queue_url: Optional[str] = None,
+        max_attempts: int = 5,
+        base_backoff_seconds: float = 0.05,
+        max_backoff_seconds: float = 1.0,
+        connect_timeout_seconds: float = 1.0,
+        read_timeout_seconds: float = 3.0,
+        retry_budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize SQS client with deadline-aware retries.
+
+        Retries are handled here rather than by botocore so they can stop
+        once the request deadline is too close, draw on a shared retry
+        budget, and feed a circuit breaker.
+
+        Args:
+            queue_url: Target queue; defaults to the QUEUE_URL environment variable
+            max_attempts: Total attempts (1 initial + retries)
+            base_backoff_seconds: First backoff; doubles per retry, with full jitter
+            max_backoff_seconds: Upper bound on a single backoff
+            connect_timeout_seconds: Longest wait for a connection per attempt
+            read_timeout_seconds: Longest wait for a response per attempt; no
+                retry starts unless the deadline leaves room for both timeouts
+            retry_budget: Shared cap on retries as a fraction of traffic
+            circuit_breaker: Breaker guarding this queue
+            sleep: Sleep function, injectable for tests
+        """
+        self.queue_url = queue_url or os.environ.get("QUEUE_URL")
         if not self.queue_url:
             raise RuntimeError("QUEUE_URL environment variable is not set")
 
-        # Configure boto3 with automatic retries for transient failures
-        retry_config = Config(
-            retries={
-                "max_attempts": 5,  # Total attempts (1 initial + 4 retries)
-                "mode": "standard",  # Exponential backoff with jitter
-            }
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        # Longest an attempt can take: a retry that could outlive the request
+        # deadline (and the Lambda timeout) is not started
+        self.max_attempt_seconds = connect_timeout_seconds + read_timeout_seconds
+        self.retry_budget = retry_budget or RetryBudget()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            name=f"sqs:{self.queue_url.rsplit('/', 1)[-1]}"
+        )
+        self.sleep = sleep
+
+        # botocore retries are disabled; timeouts keep one attempt well inside
+        # the API's own timeout
+        client_config = Config(
+            retries={"max_attempts": 1, "mode": "standard"},
+            connect_timeout=connect_timeout_seconds,
+            read_timeout=read_timeout_seconds,
         )
-        self.client = boto3.client("sqs", config=retry_config)
+        self.client = boto3.client("sqs", config=client_config)
 
     def send_message(self, message_body: str, task_id: str, **kwargs) -> Dict[str, Any]:
         """
@@ -32,20 +137,135 @@ class SQSQueueProvider(QueueProvider):
         Args:
             message_body: JSON string payload
             task_id: Task ID for deduplication
-            **kwargs: Additional SQS parameters
+            **kwargs: ``message_attributes``, string attributes to attach;
+                ``ordering_key``, the message group (default ``"tasks"``)
 
         Returns:
             dict: SQS response
+
+        Raises:
+            QueueUnavailableError: The breaker is open or the deadline is exhausted
         """
         # TODO: For complete durability, store in DB before sending
         # (protects against API crash before SQS ack)
-        response = self.client.send_message(
-            QueueUrl=self.queue_url,
-            MessageBody=message_body,
-            MessageGroupId="tasks",  # global ordering
-            MessageDeduplicationId=task_id,
+        attributes = sqs_message_attributes(kwargs.get("message_attributes"))
+        return self._with_retries(
+            lambda: self.client.send_message(
+                QueueUrl=self.queue_url,
+                MessageBody=message_body,
+                MessageGroupId=kwargs.get("ordering_key") or DEFAULT_MESSAGE_GROUP,
+                MessageDeduplicationId=task_id,
+                **({"MessageAttributes": attributes} if attributes else {}),
+            ),
+            task_id,
+        )
+
+    def send_message_batch(
+        self, entries: Sequence[Tuple[str, str]], **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Send up to 10 messages in one SendMessageBatch call.
+
+        The call as a whole is retried like ``send_message``; entries SQS
+        rejects individually are reported in ``Failed``. ``message_attributes``
+        and ``ordering_keys`` may give one attribute dict and ordering key
+        per entry.
+
+        Raises:
+            QueueUnavailableError: The breaker is open or the deadline is exhausted
+        """
+        if len(entries) > SQS_MAX_BATCH_SIZE:
+            raise ValueError(f"At most {SQS_MAX_BATCH_SIZE} messages per batch")
+
+        # Batch entry IDs only allow a restricted alphabet, so use positions
+        task_ids = [task_id for _, task_id in entries]
+        attributes = kwargs.get("message_attributes") or [None] * len(entries)
+        ordering_keys = kwargs.get("ordering_keys") or [None] * len(entries)
+        response = self._with_retries(
+            lambda: self.client.send_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {
+                        "Id": str(index),
+                        "MessageBody": message_body,
+                        "MessageGroupId": ordering_keys[index] or DEFAULT_MESSAGE_GROUP,
+                        "MessageDeduplicationId": task_id,
+                        **(
+                            {
+                                "MessageAttributes": sqs_message_attributes(
+                                    attributes[index]
+                                )
+                            }
+                            if attributes[index]
+                            else {}
+                        ),
+                    }
+                    for index, (message_body, task_id) in enumerate(entries)
+                ],
+            ),
+            task_ids[0],
         )
-        return response
+        return {
+            "Successful": [
+                {**entry, "Id": task_ids[int(entry["Id"])]}
+                for entry in response.get("Successful", [])
+            ],
+            "Failed": [
+                {**entry, "Id": task_ids[int(entry["Id"])]}
+                for entry in response.get("Failed", [])
+            ],
+        }
 
     def get_provider_name(self) -> str:
         return "sqs"
+
+    def _with_retries(
+        self, call: Callable[[], Dict[str, Any]], task_id: str
+    ) -> Dict[str, Any]:
+        self.retry_budget.record_request()
+        deadline = current_deadline()
+        attempt = 1
+
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise QueueUnavailableError(
+                    "SQS circuit breaker is open",
+                    retry_after_seconds=self.circuit_breaker.retry_after(),
+                )
+
+            try:
+                response = call()
+            except Exception as exc:
+                if not is_retryable(exc):
+                    # Request-level problem, not a sign of an unhealthy queue
+                    self.circuit_breaker.record_success()
+                    raise
+                self.circuit_breaker.record_failure()
+
+                backoff = self._backoff(attempt)
+                if attempt >= self.max_attempts:
+                    raise
+                if deadline is not None and (
+                    deadline.remaining() < backoff + self.max_attempt_seconds
+                ):
+                    raise DeadlineExceededError("No time left to retry SQS send") from exc
+                if not self.retry_budget.try_acquire():
+                    put_metric("QueueRetryBudgetExhausted", 1)
+                    raise
+
+                logger.warning(
+                    "Retrying SQS send",
+                    extra={"task_id": task_id, "attempt": attempt, "backoff": backoff},
+                )
+                self.sleep(backoff)
+                attempt += 1
+                continue
+
+            self.circuit_breaker.record_success()
+            return response
+
+    def _backoff(self, attempt: int) -> float:
+        cap = min(
+            self.base_backoff_seconds * 2 ** (attempt - 1), self.max_backoff_seconds
+        )
+        return random.uniform(0, cap)
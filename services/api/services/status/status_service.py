@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+from services.common.cache import TTLCache
+from services.common.status.base import TaskStatusRecord, TaskStatusStore
+
+logger = logging.getLogger(__name__)
+
+# Shared by every request served by this process
+status_cache: TTLCache[TaskStatusRecord] = TTLCache(
+    maxsize=int(os.environ.get("STATUS_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.environ.get("STATUS_CACHE_TTL_SECONDS", "2")),
+)
+
+
+class TaskStatusService:
+    """Service for recording and reading task status through a read-through cache"""
+
+    def __init__(self, store: TaskStatusStore, cache: TTLCache[TaskStatusRecord]):
+        """
+        Initialize the status service.
+
+        Args:
+            store: Status store implementation
+            cache: In-process cache placed in front of the store
+        """
+        self.store = store
+        self.cache = cache
+
+    def mark_queued(self, task_id: str) -> None:
+        """
+        Record that a task was accepted by the queue.
+
+        The task is already enqueued at this point, so a failing status write
+        is logged rather than surfaced to the client.
+
+        Args:
+            task_id: Task identifier
+        """
+        try:
+            record = self.store.set_status(task_id, "queued")
+        except Exception:
+            logger.exception("Failed to record task status", extra={"task_id": task_id})
+            return
+        self.cache.set(task_id, record)
+
+    def mark_queued_many(self, task_ids: List[str]) -> None:
+        """
+        Record that several tasks were accepted by the queue, in one store call.
+
+        Bulk-ingested records are not cached; they are rarely read right away.
+
+        Args:
+            task_ids: Task identifiers
+        """
+        try:
+            self.store.set_status_many(task_ids, "queued")
+        except Exception:
+            logger.exception("Failed to record task status", extra={"task_ids": task_ids})
+
+    def cancel(self, task_id: str) -> Optional[TaskStatusRecord]:
+        """
+        Mark a task cancelled if it has not started yet.
+
+        Args:
+            task_id: Task identifier
+
+        Returns:
+            TaskStatusRecord or None if the task is unknown or no longer queued
+        """
+        record = self.store.compare_and_set_status(task_id, ("queued",), "cancelled")
+        if record is not None:
+            self.cache.set(task_id, record)
+        return record
+
+    def get(self, task_id: str) -> Optional[TaskStatusRecord]:
+        """
+        Look up a task's status, serving from the cache when possible.
+
+        Args:
+            task_id: Task identifier
+
+        Returns:
+            TaskStatusRecord or None if the task is unknown
+        """
+        record = self.cache.get(task_id)
+        if record is None:
+            record = self.store.get(task_id)
+            if record is not None:
+                self.cache.set(task_id, record)
+        return record
+
+    def get_many(self, task_ids: Iterable[str]) -> Dict[str, TaskStatusRecord]:
+        """
+        Look up several tasks, fetching all cache misses in one store call.
+
+        Args:
+            task_ids: Task identifiers
+
+        Returns:
+            dict: Records keyed by task ID; unknown tasks are omitted
+        """
+        found: Dict[str, TaskStatusRecord] = {}
+        misses = []
+        for task_id in dict.fromkeys(task_ids):
+            record = self.cache.get(task_id)
+            if record is None:
+                misses.append(task_id)
+            else:
+                found[task_id] = record
+
+        if misses:
+            for task_id, record in self.store.get_many(misses).items():
+                self.cache.set(task_id, record)
+                found[task_id] = record
+        return found
+
+    @staticmethod
+    def etag(record: TaskStatusRecord) -> str:
+        """Return a strong ETag identifying this version of the record"""
+        version = f"{record.task_id}:{record.status}:{record.updated_at!r}"
+        return '"' + hashlib.sha1(version.encode()).hexdigest()[:20] + '"'
@@ -6,18 +6,58 @@ from fastapi.testclient import TestClient
 
 
 @pytest.fixture
-def mock_env():
+def mock_env(tmp_path):
     """Mock environment variables"""
-    with patch.dict(os.environ, {"QUEUE_URL": "http://test-queue-url"}):
+    env = {
+        "QUEUE_URL": "http://test-queue-url",
+        "TASK_STATUS_DB_PATH": str(tmp_path / "task-status.sqlite3"),
+        "IDEMPOTENCY_DB_PATH": str(tmp_path / "idempotency.sqlite3"),
+        "TOMBSTONE_DB_PATH": str(tmp_path / "tombstones.sqlite3"),
+    }
+    with patch.dict(os.environ, env):
         yield
 
 
+@pytest.fixture(autouse=True)
+def reset_process_state():
+    """Drop process-wide stores and caches so each test starts clean"""
+    from services.api.services.idempotency.factory import get_idempotency_store
+    from services.api.services.idempotency.idempotency_service import idempotency_cache
+    from services.api.services.queue.factory import get_queue_provider
+    from services.api.services.status.status_service import status_cache
+    from services.common.signing import get_message_signer
+    from services.common.status.factory import get_status_store
+    from services.common.tombstones.factory import get_tombstone_store
+
+    get_queue_provider.cache_clear()
+    get_message_signer.cache_clear()
+    get_status_store.cache_clear()
+    get_idempotency_store.cache_clear()
+    get_tombstone_store.cache_clear()
+    status_cache.clear()
+    idempotency_cache.clear()
+    yield
+    get_queue_provider.cache_clear()
+    get_message_signer.cache_clear()
+    get_status_store.cache_clear()
+    get_idempotency_store.cache_clear()
+    get_tombstone_store.cache_clear()
+    status_cache.clear()
+    idempotency_cache.clear()
+
+
 @pytest.fixture
 def mock_sqs():
     """Mock SQS client"""
     with patch("services.api.services.queue.sqs_provider.boto3.client") as mock:
         sqs_mock = MagicMock()
         sqs_mock.send_message.return_value = {"MessageId": "test-message-id"}
+        sqs_mock.send_message_batch.side_effect = lambda **kwargs: {
+            "Successful": [
+                {"Id": entry["Id"], "MessageId": f"test-message-{entry['Id']}"}
+                for entry in kwargs["Entries"]
+            ]
+        }
         mock.return_value = sqs_mock
         yield sqs_mock
 
@@ -0,0 +1,63 @@
+"""DELETE /tasks/{task_id} Endpoint Tests"""
+
+from unittest.mock import patch
+
+from services.common.status.factory import get_status_store
+from services.common.tombstones.factory import get_tombstone_store
+
+
+def test_cancel_queued_task(client, valid_payload):
+    """Cancelling a queued task should tombstone it and report it cancelled"""
+    task_id = client.post("/tasks", json=valid_payload).json()["task_id"]
+
+    response = client.delete(f"/tasks/{task_id}")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert client.get(f"/tasks/{task_id}").json()["status"] == "cancelled"
+    assert get_tombstone_store().contains(task_id)
+
+
+def test_cancel_is_idempotent(client, valid_payload):
+    """Cancelling a cancelled task again should succeed"""
+    task_id = client.post("/tasks", json=valid_payload).json()["task_id"]
+    client.delete(f"/tasks/{task_id}")
+
+    response = client.delete(f"/tasks/{task_id}")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+
+
+def test_cancel_unknown_task_returns_404(client):
+    """Unknown task IDs should return 404"""
+    response = client.delete("/tasks/does-not-exist")
+
+    assert response.status_code == 404
+
+
+def test_cancel_started_task_returns_409(client, valid_payload):
+    """A task the processor has picked up can no longer be cancelled"""
+    task_id = client.post("/tasks", json=valid_payload).json()["task_id"]
+    get_status_store().set_status(task_id, "processing")
+
+    response = client.delete(f"/tasks/{task_id}")
+
+    assert response.status_code == 409
+    assert not get_tombstone_store().contains(task_id)
+
+
+def test_cancel_fails_when_tombstone_cannot_be_written(client, valid_payload):
+    """If the tombstone is not written the processor would still run the task"""
+    task_id = client.post("/tasks", json=valid_payload).json()["task_id"]
+
+    with patch(
+        "services.common.tombstones.sqlite_store.SQLiteTombstoneStore.add",
+        side_effect=Exception("store down"),
+    ):
+        response = client.delete(f"/tasks/{task_id}")
+
+    assert response.status_code == 500
+    # A retry completes the cancellation
+    assert client.delete(f"/tasks/{task_id}").status_code == 200
+    assert get_tombstone_store().contains(task_id)
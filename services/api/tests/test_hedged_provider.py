@@ -0,0 +1,170 @@
+"""Hedged / Failover Queue Provider Tests"""
+
+import logging
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from services.api.services.queue.base import QueueProvider
+from services.api.services.queue.factory import get_queue_provider
+from services.api.services.queue.hedged_provider import (
+    HedgedQueueProvider,
+    LatencyTracker,
+)
+from services.api.services.queue.queue_service import TaskQueueService
+
+
+class FakeProvider(QueueProvider):
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def send_message(self, message_body, task_id, **kwargs):
+        with self.lock:
+            self.calls.append((message_body, task_id))
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"MessageId": f"{self.name}-{task_id}"}
+
+    def get_provider_name(self):
+        return self.name
+
+
+def make_hedged(primary, secondary, **kwargs):
+    kwargs.setdefault("initial_hedge_delay_seconds", 0.05)
+    return HedgedQueueProvider(primary=primary, secondary=secondary, **kwargs)
+
+
+def test_fast_primary_wins_without_hedging():
+    """A primary answering within the hedge delay should be the only send"""
+    primary, secondary = FakeProvider("a"), FakeProvider("b")
+    provider = make_hedged(primary, secondary)
+
+    response = provider.send_message("{}", "task-1")
+
+    assert response["Provider"] == "primary"
+    assert response["MessageId"] == "a-task-1"
+    assert secondary.calls == []
+    assert provider.wins["primary"] == 1
+
+
+def test_slow_primary_is_hedged_with_same_task_id():
+    """A slow primary should trigger a hedged send carrying the same dedup ID"""
+    primary, secondary = FakeProvider("a", delay=0.5), FakeProvider("b")
+    provider = make_hedged(primary, secondary)
+
+    start = time.monotonic()
+    response = provider.send_message('{"x": 1}', "task-1")
+
+    assert time.monotonic() - start < 0.4
+    assert response["Provider"] == "secondary"
+    assert secondary.calls == [('{"x": 1}', "task-1")]
+    assert primary.calls == [('{"x": 1}', "task-1")]
+
+
+def test_primary_error_fails_over():
+    """A failing primary should fall back to the secondary"""
+    primary = FakeProvider("a", error=RuntimeError("SQS down"))
+    secondary = FakeProvider("b")
+    provider = make_hedged(primary, secondary)
+
+    response = provider.send_message("{}", "task-1")
+
+    assert response["Provider"] == "secondary"
+
+
+def test_both_failing_raises():
+    """If no provider succeeds the error should propagate"""
+    provider = make_hedged(
+        FakeProvider("a", error=RuntimeError("primary down")),
+        FakeProvider("b", error=RuntimeError("secondary down")),
+    )
+
+    with pytest.raises(RuntimeError, match="secondary down"):
+        provider.send_message("{}", "task-1")
+
+
+def test_repeated_primary_failures_route_to_secondary_first():
+    """After the failure threshold the primary should be skipped until cooldown"""
+    now = [0.0]
+    primary = FakeProvider("a", error=RuntimeError("SQS down"))
+    secondary = FakeProvider("b")
+    provider = make_hedged(
+        primary,
+        secondary,
+        failover_threshold=2,
+        failover_cooldown_seconds=30,
+        clock=lambda: now[0],
+    )
+
+    provider.send_message("{}", "task-1")
+    provider.send_message("{}", "task-2")
+    provider.send_message("{}", "task-3")
+    assert len(primary.calls) == 2
+
+    now[0] = 31.0
+    primary.error = None
+    response = provider.send_message("{}", "task-4")
+    assert response["Provider"] == "primary"
+
+
+def test_hedge_delay_follows_primary_latency_percentile():
+    """Once warmed up, the hedge delay should be the configured percentile"""
+    provider = make_hedged(
+        FakeProvider("a"),
+        FakeProvider("b"),
+        hedge_percentile=0.9,
+        min_samples=10,
+        min_hedge_delay_seconds=0.001,
+    )
+    assert provider.hedge_delay() == 0.05
+
+    for ms in range(1, 11):
+        provider.primary_latency.record(ms / 1000)
+
+    assert provider.hedge_delay() == pytest.approx(0.010)
+
+
+def test_latency_tracker_keeps_sliding_window():
+    """Old samples should fall out of the window"""
+    tracker = LatencyTracker(window=3)
+    for seconds in (10.0, 1.0, 2.0, 3.0):
+        tracker.record(seconds)
+
+    assert tracker.percentile(0.99) == 3.0
+    assert LatencyTracker().percentile(0.5) is None
+
+
+def test_enqueue_log_names_the_provider(caplog):
+    """The enqueue log should name the winning provider, or the plain provider"""
+    hedged = TaskQueueService(make_hedged(FakeProvider("primary"), FakeProvider("b")))
+    plain = TaskQueueService(FakeProvider("sqs"))
+
+    with caplog.at_level(logging.INFO):
+        hedged.enqueue_message('{"n": 1}', "task-1")
+        plain.enqueue_message('{"n": 2}', "task-2")
+
+    enqueued = [r for r in caplog.records if r.getMessage() == "Task enqueued"]
+    assert [record.provider for record in enqueued] == ["primary", "sqs"]
+
+
+def test_factory_refuses_hedging_with_local_status_store(mock_env, mock_sqs):
+    """Hedged copies are only deduplicated by a status store every consumer shares"""
+    env = {"QUEUE_PROVIDER": "hedged", "SECONDARY_QUEUE_URL": "http://secondary"}
+    with patch.dict(os.environ, env):
+        os.environ.pop("TASK_STATUS_STORE", None)
+        with pytest.raises(RuntimeError, match="TASK_STATUS_STORE"):
+            get_queue_provider()
+
+    with patch.dict(os.environ, {**env, "TASK_STATUS_STORE": "shared"}):
+        provider = get_queue_provider()
+
+    assert isinstance(provider, HedgedQueueProvider)
+    assert provider.secondary.queue_url == "http://secondary"
@@ -0,0 +1,127 @@
+"""POST /tasks Idempotency-Key Tests"""
+
+import threading
+import time
+
+from services.api.services.idempotency.factory import get_idempotency_store
+from services.api.services.idempotency.idempotency_service import (
+    IdempotencyService,
+    idempotency_cache,
+)
+
+
+def test_same_key_returns_same_task(mock_sqs, client, valid_payload):
+    """A retried request should get the original task_id without a second enqueue"""
+    headers = {"Idempotency-Key": "key-1"}
+
+    first = client.post("/tasks", json=valid_payload, headers=headers)
+    retry = client.post("/tasks", json=valid_payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert mock_sqs.send_message.call_count == 1
+
+
+def test_task_id_and_dedup_id_derive_from_key(mock_sqs, client, valid_payload):
+    """The SQS deduplication ID should be derived from the key"""
+    response = client.post("/tasks", json=valid_payload, headers={"Idempotency-Key": "k"})
+
+    task_id = response.json()["task_id"]
+    service = IdempotencyService(store=get_idempotency_store(), cache=idempotency_cache)
+    assert task_id == service.task_id_for("k")
+    assert mock_sqs.send_message.call_args.kwargs["MessageDeduplicationId"] == task_id
+
+
+def test_key_is_found_in_shared_store(mock_sqs, client, valid_payload):
+    """Another process (empty in-process cache) should replay from the store"""
+    headers = {"Idempotency-Key": "key-1"}
+    first = client.post("/tasks", json=valid_payload, headers=headers)
+
+    idempotency_cache.clear()
+    retry = client.post("/tasks", json=valid_payload, headers=headers)
+
+    assert retry.json() == first.json()
+    assert get_idempotency_store().get("key-1").task_id == first.json()["task_id"]
+    assert mock_sqs.send_message.call_count == 1
+
+
+def test_key_reused_with_different_body_returns_422(client, valid_payload):
+    """Reusing a key for a different task should be rejected"""
+    headers = {"Idempotency-Key": "key-1"}
+    client.post("/tasks", json=valid_payload, headers=headers)
+
+    response = client.post(
+        "/tasks", json={**valid_payload, "title": "Other"}, headers=headers
+    )
+
+    assert response.status_code == 422
+
+
+def test_expired_key_creates_a_new_task(mock_sqs, client, valid_payload):
+    """A key reused after its TTL should create a new task with a new ID"""
+    get_idempotency_store().ttl_seconds = 0.2
+    headers = {"Idempotency-Key": "key-1"}
+    first = client.post("/tasks", json=valid_payload, headers=headers)
+
+    time.sleep(0.25)
+    reused = client.post(
+        "/tasks", json={**valid_payload, "title": "Other"}, headers=headers
+    )
+
+    assert reused.status_code == 201
+    assert "Idempotent-Replayed" not in reused.headers
+    assert reused.json()["task_id"] != first.json()["task_id"]
+    assert mock_sqs.send_message.call_count == 2
+
+
+def test_failed_enqueue_leaves_key_unused(mock_sqs, client, valid_payload):
+    """A retry after a failed enqueue should enqueue again"""
+    headers = {"Idempotency-Key": "key-1"}
+    mock_sqs.send_message.side_effect = [Exception("SQS down"), {"MessageId": "m"}]
+
+    assert client.post("/tasks", json=valid_payload, headers=headers).status_code == 500
+    retry = client.post("/tasks", json=valid_payload, headers=headers)
+
+    assert retry.status_code == 201
+    assert "Idempotent-Replayed" not in retry.headers
+    assert mock_sqs.send_message.call_count == 2
+
+
+def test_concurrent_requests_are_coalesced(mock_sqs, client, valid_payload):
+    """Concurrent requests with one key should enqueue exactly once"""
+    enqueued = threading.Event()
+
+    def slow_send(**kwargs):
+        enqueued.set()
+        time.sleep(0.1)
+        return {"MessageId": "m"}
+
+    mock_sqs.send_message.side_effect = slow_send
+    responses = []
+
+    def post():
+        responses.append(
+            client.post("/tasks", json=valid_payload, headers={"Idempotency-Key": "k"})
+        )
+
+    threads = [threading.Thread(target=post) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert mock_sqs.send_message.call_count == 1
+    assert {r.status_code for r in responses} == {201}
+    assert len({r.json()["task_id"] for r in responses}) == 1
+    assert sum("Idempotent-Replayed" in r.headers for r in responses) == 4
+
+
+def test_requests_without_key_are_not_deduplicated(mock_sqs, client, valid_payload):
+    """Without the header every request creates a new task"""
+    first = client.post("/tasks", json=valid_payload)
+    second = client.post("/tasks", json=valid_payload)
+
+    assert first.json()["task_id"] != second.json()["task_id"]
+    assert mock_sqs.send_message.call_count == 2
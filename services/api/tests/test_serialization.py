@@ -0,0 +1,54 @@
+"""Request/Response Serialization Tests"""
+
+import json
+from datetime import datetime, timezone
+
+from services.api.schemas.task import TaskRequest
+from services.api.serialization import task_message_body
+
+
+def test_message_body_matches_task_fields():
+    """Message body should contain task_id followed by every request field"""
+    task = TaskRequest(
+        title="Test Task",
+        description="Test Description",
+        priority="high",
+        due_date=datetime(2030, 1, 1, 12, 30, 0, 250, tzinfo=timezone.utc),
+    )
+
+    body = json.loads(task_message_body("task-1", task))
+
+    assert body == {
+        "task_id": "task-1",
+        "title": "Test Task",
+        "description": "Test Description",
+        "priority": "high",
+        "due_date": task.due_date.isoformat(),
+        "ordering_key": None,
+    }
+
+
+def test_message_body_without_due_date():
+    """A missing due_date should be serialized as null"""
+    task = TaskRequest(title="Test", description="Test", priority="low")
+
+    body = json.loads(task_message_body("task-1", task))
+
+    assert body["due_date"] is None
+
+
+def test_malformed_json_body_returns_422(client):
+    """Malformed JSON should still be rejected with 422"""
+    response = client.post(
+        "/tasks", content=b'{"title": ', headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 422
+
+
+def test_create_task_response_body(client, valid_payload):
+    """Response should be exactly the documented TaskResponse shape"""
+    response = client.post("/tasks", json=valid_payload)
+
+    assert response.headers["content-type"] == "application/json"
+    assert list(response.json()) == ["task_id"]
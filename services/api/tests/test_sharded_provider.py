@@ -0,0 +1,176 @@
+"""Sharded Queue Provider Tests"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from services.api.services.queue.base import QueueProvider
+from services.api.services.queue.factory import get_queue_provider
+from services.api.services.queue.sharded_provider import HashRing, ShardedQueueProvider
+
+
+class FakeProvider(QueueProvider):
+    def __init__(self, name, error=None, fail_ids=()):
+        self.name = name
+        self.error = error
+        self.fail_ids = set(fail_ids)
+        self.sent = []
+        self.batch_sizes = []
+
+    def send_message(self, message_body, task_id, **kwargs):
+        if self.error:
+            raise self.error
+        if task_id in self.fail_ids:
+            raise RuntimeError("rejected")
+        self.sent.append((task_id, kwargs.get("ordering_key")))
+        return {"MessageId": f"{self.name}-{task_id}"}
+
+    def send_message_batch(self, entries, **kwargs):
+        self.batch_sizes.append(len(entries))
+        return super().send_message_batch(entries, **kwargs)
+
+    def get_provider_name(self):
+        return self.name
+
+
+def make_sharded(count, **errors):
+    shards = {f"q{i}": FakeProvider(f"q{i}", errors.get(f"q{i}")) for i in range(count)}
+    return ShardedQueueProvider(shards), shards
+
+
+# ===== HASH RING =====
+
+
+def test_ring_spreads_keys_evenly():
+    """Every node should own a similar share of the keys"""
+    ring = HashRing([f"q{i}" for i in range(4)])
+
+    counts = {}
+    for i in range(20_000):
+        node = ring.node_for(f"key-{i}")
+        counts[node] = counts.get(node, 0) + 1
+
+    assert len(counts) == 4
+    assert max(counts.values()) < 1.25 * 5_000
+
+
+def test_adding_a_node_moves_only_keys_it_takes_over():
+    """Growing from 3 to 4 nodes should remap about a quarter of the keys"""
+    before = HashRing(["q0", "q1", "q2"])
+    after = HashRing(["q3", "q0", "q1", "q2"])
+
+    keys = [f"key-{i}" for i in range(20_000)]
+    moved = [key for key in keys if before.node_for(key) != after.node_for(key)]
+
+    assert 0.15 < len(moved) / len(keys) < 0.35
+    assert {after.node_for(key) for key in moved} == {"q3"}
+
+
+# ===== PROVIDER =====
+
+
+def test_same_ordering_key_goes_to_one_shard_in_order():
+    """Tasks sharing an ordering key should land on one shard in send order"""
+    provider, shards = make_sharded(4)
+
+    for i in range(10):
+        provider.send_message("{}", f"task-{i}", ordering_key="customer-1")
+
+    used = [shard for shard in shards.values() if shard.sent]
+    assert len(used) == 1
+    assert used[0].sent == [(f"task-{i}", "customer-1") for i in range(10)]
+
+
+def test_unkeyed_tasks_are_spread_by_task_id():
+    """Tasks without an ordering key should use every shard"""
+    provider, shards = make_sharded(4)
+
+    responses = [provider.send_message("{}", f"task-{i}") for i in range(200)]
+
+    assert all(shard.sent for shard in shards.values())
+    assert responses[0]["Shard"] == provider.shard_for("task-0")
+
+
+def test_batch_failure_of_one_shard_fails_only_its_entries():
+    """An unreachable shard should not fail entries bound for other shards"""
+    provider, shards = make_sharded(2, q1=RuntimeError("down"))
+    entries = [("{}", f"task-{i}") for i in range(20)]
+
+    response = provider.send_message_batch(
+        entries, message_attributes=[{"a": str(i)} for i in range(20)]
+    )
+
+    failed = {entry["Id"] for entry in response["Failed"]}
+    assert failed == {
+        task_id for _, task_id in entries if provider.shard_for(task_id) == "q1"
+    }
+    assert len(response["Successful"]) == 20 - len(failed)
+    assert [task_id for task_id, _ in shards["q0"].sent] == [
+        task_id for _, task_id in entries if task_id not in failed
+    ]
+
+
+def test_shard_stops_sending_after_a_failed_batch():
+    """Batches after a failed one should not be sent, keeping each key in order"""
+    shard = FakeProvider("q0", fail_ids={"task-9"})
+    provider = ShardedQueueProvider({"q0": shard})
+    entries = [("{}", f"task-{i}") for i in range(25)]
+
+    response = provider.send_message_batch(entries, ordering_keys=["key"] * 25)
+
+    assert shard.batch_sizes == [10]
+    assert [entry["Id"] for entry in response["Successful"]] == [
+        f"task-{i}" for i in range(9)
+    ]
+    failed = {entry["Id"]: entry["Message"] for entry in response["Failed"]}
+    assert set(failed) == {f"task-{i}" for i in range(9, 25)}
+    assert failed["task-9"] == "rejected"
+    assert failed["task-10"] == "Not sent: an earlier message failed"
+
+
+def test_mixed_batches_are_split_to_fit_each_shard():
+    """A batch of several shards' tasks should become one call per shard"""
+    provider, shards = make_sharded(3)
+    entries = [("{}", f"task-{i}") for i in range(30)]
+
+    response = provider.send_message_batch(entries)
+
+    assert provider.max_batch_size == 10
+    assert len(response["Successful"]) == 30
+    assert all(size <= 10 for shard in shards.values() for size in shard.batch_sizes)
+    assert sum(sum(shard.batch_sizes) for shard in shards.values()) == 30
+
+
+def test_tasks_of_one_shard_fill_one_call():
+    """Entries grouped by shard_for should be sent as a single full call"""
+    provider, shards = make_sharded(3)
+    task_ids = (f"task-{i}" for i in range(1000))
+    entries = [
+        ("{}", task_id) for task_id in task_ids if provider.shard_for(task_id) == "q1"
+    ][: provider.max_batch_size]
+
+    provider.send_message_batch(entries)
+
+    assert shards["q1"].batch_sizes == [10]
+    assert not shards["q0"].batch_sizes and not shards["q2"].batch_sizes
+
+
+def test_factory_builds_sharded_provider(mock_env, mock_sqs):
+    """QUEUE_PROVIDER=sharded should create one SQS provider per QUEUE_URLS entry"""
+    env = {"QUEUE_PROVIDER": "sharded", "QUEUE_URLS": "http://q0, http://q1"}
+    with patch.dict(os.environ, env):
+        provider = get_queue_provider()
+
+    assert provider.get_provider_name() == "sharded"
+    assert [shard.queue_url for shard in provider.shards.values()] == [
+        "http://q0",
+        "http://q1",
+    ]
+
+
+def test_factory_requires_queue_urls(mock_env):
+    """Sharding without QUEUE_URLS is a configuration error"""
+    with patch.dict(os.environ, {"QUEUE_PROVIDER": "sharded", "QUEUE_URLS": ""}):
+        with pytest.raises(RuntimeError, match="QUEUE_URLS"):
+            get_queue_provider()
@@ -0,0 +1,168 @@
+"""SQS Provider Retry, Deadline and Circuit Breaker Tests"""
+
+import logging
+import os
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from services.api.services.queue.resilience import (
+    CircuitBreaker,
+    DeadlineExceededError,
+    QueueUnavailableError,
+    RetryBudget,
+    deadline_scope,
+)
+from services.api.services.queue.sqs_provider import SQSQueueProvider
+
+
+def service_unavailable():
+    return ClientError(
+        {
+            "Error": {"Code": "ServiceUnavailable", "Message": "unavailable"},
+            "ResponseMetadata": {"HTTPStatusCode": 503},
+        },
+        "SendMessage",
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def make_provider(mock_sqs):
+    def factory(**kwargs):
+        kwargs.setdefault("sleep", lambda seconds: None)
+        return SQSQueueProvider(queue_url="http://test-queue-url", **kwargs)
+
+    return factory
+
+
+def test_retryable_error_is_retried(make_provider, mock_sqs):
+    """Throttling and 5xx errors should be retried until success"""
+    mock_sqs.send_message.side_effect = [service_unavailable(), {"MessageId": "m-1"}]
+
+    response = make_provider().send_message("{}", "task-1")
+
+    assert response == {"MessageId": "m-1"}
+    assert mock_sqs.send_message.call_count == 2
+
+
+def test_non_retryable_error_is_not_retried(make_provider, mock_sqs):
+    """Client errors should surface immediately"""
+    mock_sqs.send_message.side_effect = ClientError(
+        {"Error": {"Code": "InvalidParameterValue"}, "ResponseMetadata": {}},
+        "SendMessage",
+    )
+
+    with pytest.raises(ClientError):
+        make_provider().send_message("{}", "task-1")
+
+    assert mock_sqs.send_message.call_count == 1
+
+
+def test_retries_stop_when_deadline_is_too_close(make_provider, mock_sqs):
+    """No retry should start if the remaining budget cannot fit another attempt"""
+    mock_sqs.send_message.side_effect = service_unavailable()
+    provider = make_provider()
+
+    with deadline_scope(0.1):
+        with pytest.raises(DeadlineExceededError):
+            provider.send_message("{}", "task-1")
+
+    assert mock_sqs.send_message.call_count == 1
+
+
+def test_retry_must_fit_a_whole_attempt_before_the_deadline(make_provider, mock_sqs):
+    """A retry should only start if its connect and read timeouts fit the deadline"""
+    mock_sqs.send_message.side_effect = [service_unavailable(), {"MessageId": "m-1"}]
+    provider = make_provider(connect_timeout_seconds=0.5, read_timeout_seconds=1.5)
+
+    with deadline_scope(1.5):
+        with pytest.raises(DeadlineExceededError):
+            provider.send_message("{}", "task-1")
+    assert mock_sqs.send_message.call_count == 1
+
+    with deadline_scope(5.0):
+        assert provider.send_message("{}", "task-2") == {"MessageId": "m-1"}
+
+
+def test_retry_budget_caps_retries(make_provider, mock_sqs):
+    """An exhausted retry budget should stop retries"""
+    mock_sqs.send_message.side_effect = service_unavailable()
+    budget = RetryBudget(ratio=0.1, min_retries_per_second=0, max_tokens=1)
+    provider = make_provider(retry_budget=budget)
+
+    with pytest.raises(ClientError):
+        provider.send_message("{}", "task-1")
+    assert mock_sqs.send_message.call_count == 2
+
+    mock_sqs.send_message.reset_mock()
+    with pytest.raises(ClientError):
+        provider.send_message("{}", "task-2")
+    assert mock_sqs.send_message.call_count == 1
+
+
+def test_open_breaker_fails_fast(make_provider, mock_sqs):
+    """Once open, the breaker should reject sends without calling SQS"""
+    mock_sqs.send_message.side_effect = service_unavailable()
+    breaker = CircuitBreaker("sqs:test", failure_threshold=2, reset_timeout_seconds=30)
+    provider = make_provider(max_attempts=2, circuit_breaker=breaker)
+
+    with pytest.raises(ClientError):
+        provider.send_message("{}", "task-1")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    mock_sqs.send_message.reset_mock()
+    with pytest.raises(QueueUnavailableError):
+        provider.send_message("{}", "task-2")
+    mock_sqs.send_message.assert_not_called()
+
+
+def test_breaker_recovers_through_half_open():
+    """After the reset timeout one trial call decides whether the breaker closes"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "sqs:test", failure_threshold=1, reset_timeout_seconds=10, clock=clock
+    )
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    clock.now = 10.0
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # only one trial at a time
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_breaker_state_changes_emit_metric(caplog):
+    """Breaker transitions should be emitted as CloudWatch EMF metrics"""
+    breaker = CircuitBreaker("sqs:test", failure_threshold=1)
+
+    with caplog.at_level(logging.INFO, logger="metrics"):
+        breaker.record_failure()
+
+    metrics = [record for record in caplog.records if hasattr(record, "_aws")]
+    assert len(metrics) == 1
+    assert metrics[0].CircuitBreakerState == 2
+    assert metrics[0].Dependency == "sqs:test"
+
+
+def test_api_returns_503_when_deadline_exhausted(mock_sqs, client, valid_payload):
+    """The request deadline should reach the provider and stop retries"""
+    mock_sqs.send_message.side_effect = service_unavailable()
+
+    with patch.dict(os.environ, {"API_TIMEOUT_SECONDS": "0.6"}):
+        response = client.post("/tasks", json=valid_payload)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+    assert mock_sqs.send_message.call_count == 1
@@ -0,0 +1,353 @@
+"""POST /tasks/stream Bulk Ingest Tests"""
+
+import asyncio
+import io
+import json
+import os
+import threading
+import time
+from unittest.mock import patch
+
+from services.api.services.ingest.stream_ingest import StreamIngestor, ndjson_lines
+from services.api.services.queue.base import QueueProvider
+from services.api.services.queue.queue_service import TaskQueueService
+from services.api.services.queue.resilience import deadline_scope
+from services.api.services.queue.sharded_provider import ShardedQueueProvider
+from services.common.status.factory import get_status_store
+
+
+def ndjson(*objects):
+    return b"".join(json.dumps(obj).encode() + b"\n" for obj in objects)
+
+
+def read_results(response):
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return lines[:-1], lines[-1]["summary"]
+
+
+async def collect(chunks, max_line_bytes=64):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return [line async for line in ndjson_lines(stream(), max_line_bytes)]
+
+
+# ==============================================================================
+# LINE SPLITTING TESTS
+# ==============================================================================
+
+
+def test_lines_split_across_chunks():
+    """Lines spanning chunk boundaries should be reassembled"""
+    lines = asyncio.run(collect([b'{"a"', b": 1}\n{", b'"b": 2}\n', b"last"]))
+
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b"last"]
+
+
+def test_oversized_line_is_reported_without_buffering():
+    """A line over the limit should yield None and not affect later lines"""
+    lines = asyncio.run(collect([b"x" * 50, b"x" * 50, b"\nok\n"], max_line_bytes=64))
+
+    assert lines == [None, b"ok"]
+
+
+# ==============================================================================
+# ENDPOINT TESTS
+# ==============================================================================
+
+
+def test_valid_lines_are_enqueued_in_batches(mock_sqs, client, valid_payload):
+    """25 valid lines should be sent as 3 SQS batches of at most 10"""
+    response = client.post("/tasks/stream", content=ndjson(*[valid_payload] * 25))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results, summary = read_results(response)
+    assert summary == {"lines": 25, "accepted": 25, "rejected": 0, "failed": 0}
+    assert sorted(result["line"] for result in results) == list(range(1, 26))
+
+    batch_sizes = [
+        len(c.kwargs["Entries"]) for c in mock_sqs.send_message_batch.call_args_list
+    ]
+    assert sorted(batch_sizes) == [5, 10, 10]
+    mock_sqs.send_message.assert_not_called()
+
+
+def test_batched_messages_are_signed_per_entry(mock_sqs, client, valid_payload):
+    """Every batch entry should carry the signature of its own body"""
+    from services.common.signing import MessageSigner
+
+    with patch.dict(os.environ, {"TASK_SIGNING_KEYS": "v1:secret"}):
+        client.post("/tasks/stream", content=ndjson(*[valid_payload] * 3))
+
+    signer = MessageSigner({"v1": b"secret"})
+    [entries] = [c.kwargs["Entries"] for c in mock_sqs.send_message_batch.call_args_list]
+    assert len(entries) == 3
+    for entry in entries:
+        signature = entry["MessageAttributes"]["TaskSignature"]["StringValue"]
+        assert signer.verify(entry["MessageBody"], signature)
+
+
+def test_batched_messages_use_their_ordering_keys(mock_sqs, client, valid_payload):
+    """Each batch entry should be sent in its own task's message group"""
+    lines = [{**valid_payload, "ordering_key": "a"}, valid_payload]
+
+    client.post("/tasks/stream", content=ndjson(*lines))
+
+    [entries] = [c.kwargs["Entries"] for c in mock_sqs.send_message_batch.call_args_list]
+    assert [entry["MessageGroupId"] for entry in entries] == ["a", "tasks"]
+
+
+def test_invalid_lines_are_reported_per_line(client, valid_payload):
+    """Malformed and invalid lines should be rejected without failing the upload"""
+    body = (
+        ndjson(valid_payload)
+        + b"not json\n"
+        + ndjson({**valid_payload, "priority": "urgent"})
+        + b"\n"
+    )
+
+    results, summary = read_results(client.post("/tasks/stream", content=body))
+
+    by_line = {result["line"]: result for result in results}
+    assert "task_id" in by_line[1]
+    assert by_line[2]["error"] == "Invalid JSON"
+    assert by_line[3]["error"] == "Validation failed"
+    assert by_line[3]["details"][0]["loc"] == ["priority"]
+    assert summary == {"lines": 4, "accepted": 1, "rejected": 2, "failed": 0}
+
+
+def test_entries_rejected_by_sqs_are_reported(mock_sqs, client, valid_payload):
+    """Per-entry SQS failures should show up as failed lines"""
+    mock_sqs.send_message_batch.side_effect = lambda **kwargs: {
+        "Successful": [{"Id": "0", "MessageId": "m"}],
+        "Failed": [{"Id": "1", "Code": "InternalError", "SenderFault": False}],
+    }
+
+    results, summary = read_results(
+        client.post("/tasks/stream", content=ndjson(valid_payload, valid_payload))
+    )
+
+    assert summary["accepted"] == 1
+    assert summary["failed"] == 1
+    assert {"line": 2, "error": "Failed to enqueue task"} in results
+
+
+def test_accepted_tasks_are_queued(client, valid_payload):
+    """Accepted tasks should be recorded as queued"""
+    results, _ = read_results(
+        client.post("/tasks/stream", content=ndjson(valid_payload, valid_payload))
+    )
+
+    task_ids = [result["task_id"] for result in results]
+    records = get_status_store().get_many(task_ids)
+    assert {record.status for record in records.values()} == {"queued"}
+    assert len(records) == 2
+
+
+# ==============================================================================
+# BACKPRESSURE TESTS
+# ==============================================================================
+
+
+class SlowQueueService:
+    """Queue service that records concurrent sends and the order messages arrive in"""
+
+    def __init__(self, delays=None, fail_lines=()):
+        self.active = 0
+        self.max_active = 0
+        self.sent = []
+        self.delays = delays or (lambda entries: 0.01)
+        self.fail_lines = set(fail_lines)
+        self._lock = threading.Lock()
+
+    def shard_for(self, task_id, ordering_key=None):
+        return None
+
+    def enqueue_messages(self, entries, ordering_keys=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delays(entries))
+        failed = [
+            task_id
+            for body, task_id in entries
+            if json.loads(body)["title"] in self.fail_lines
+        ]
+        with self._lock:
+            self.active -= 1
+            self.sent.extend(
+                json.loads(body)["title"]
+                for body, task_id in entries
+                if task_id not in failed
+            )
+        return {
+            "Successful": [
+                {"Id": task_id} for _, task_id in entries if task_id not in failed
+            ],
+            "Failed": [{"Id": task_id} for task_id in failed],
+        }
+
+
+class NullStatusService:
+    def mark_queued_many(self, task_ids):
+        pass
+
+
+def test_in_flight_batches_are_bounded(valid_payload):
+    """No more than max_in_flight_batches sends should run at once"""
+    queue_service = SlowQueueService()
+    ingestor = StreamIngestor(
+        queue_service=queue_service,
+        status_service=NullStatusService(),
+        results=io.BytesIO(),
+        batch_size=2,
+        max_in_flight_batches=3,
+    )
+
+    async def body():
+        # Distinct ordering keys: batches do not have to wait for each other
+        for i in range(40):
+            yield ndjson({**valid_payload, "ordering_key": f"key-{i}"})
+
+    counts = asyncio.run(ingestor.ingest(body()))
+
+    assert counts["accepted"] == 40
+    assert 1 < queue_service.max_active <= 3
+
+
+def make_ingestor(queue_service, results=None):
+    return StreamIngestor(
+        queue_service=queue_service,
+        status_service=NullStatusService(),
+        results=results or io.BytesIO(),
+        batch_size=2,
+        max_in_flight_batches=4,
+    )
+
+
+async def numbered_lines(payload, count, ordering_key=None):
+    for i in range(count):
+        task = {**payload, "title": str(i)}
+        if ordering_key is not None:
+            task["ordering_key"] = ordering_key
+        yield ndjson(task)
+
+
+def test_batches_of_one_group_are_sent_in_order(valid_payload):
+    """Slow early batches must not be overtaken by later ones in the same group"""
+    # Earlier batches are slower, so concurrent sends would arrive reversed
+    queue_service = SlowQueueService(
+        delays=lambda entries: 0.05 - 0.002 * int(json.loads(entries[0][0])["title"])
+    )
+
+    counts = asyncio.run(
+        make_ingestor(queue_service).ingest(numbered_lines(valid_payload, 20))
+    )
+
+    assert counts["accepted"] == 20
+    assert queue_service.sent == [str(i) for i in range(20)]
+    assert queue_service.max_active == 1
+
+
+def test_tasks_after_a_failure_in_their_group_are_not_sent(valid_payload):
+    """Once a task fails, later tasks of its group should fail without being sent"""
+    queue_service = SlowQueueService(fail_lines={"3"})
+    results = io.BytesIO()
+
+    counts = asyncio.run(
+        make_ingestor(queue_service, results).ingest(
+            numbered_lines(valid_payload, 8, ordering_key="a")
+        )
+    )
+
+    assert queue_service.sent == ["0", "1", "2"]
+    assert counts == {"lines": 8, "accepted": 3, "rejected": 0, "failed": 5}
+    errors = {
+        result["line"]: result["error"]
+        for result in map(json.loads, results.getvalue().splitlines())
+        if "error" in result
+    }
+    assert errors[4] == "Failed to enqueue task"
+    assert set(errors) == {4, 5, 6, 7, 8}
+
+
+def test_ingest_stops_at_the_request_deadline(valid_payload):
+    """Reading should stop once the deadline cannot cover another batch"""
+    queue_service = SlowQueueService(delays=lambda entries: 0.05)
+    results = io.BytesIO()
+    ingestor = StreamIngestor(
+        queue_service=queue_service,
+        status_service=NullStatusService(),
+        results=results,
+        batch_size=10,
+    )
+
+    started = time.monotonic()
+    with deadline_scope(0.3):
+        counts = asyncio.run(ingestor.ingest(numbered_lines(valid_payload, 400)))
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.3
+    stopped_at = counts["stopped_at_line"]
+    assert stopped_at < 400
+    assert counts["accepted"] == len(queue_service.sent) > 0
+    # Every line before stopped_at_line has a result: sent, or reported unsent
+    by_line = {
+        result["line"]: result
+        for result in map(json.loads, results.getvalue().splitlines())
+    }
+    assert set(by_line) == set(range(1, stopped_at))
+    sent = {str(line - 1) for line, result in by_line.items() if "task_id" in result}
+    assert sent == set(queue_service.sent)
+    assert all(
+        result["error"] == "Not sent: request deadline reached"
+        for result in by_line.values()
+        if "error" in result
+    )
+
+
+class RecordingShard(QueueProvider):
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def send_message(self, message_body, task_id, **kwargs):
+        return {"MessageId": task_id}
+
+    def send_message_batch(self, entries, **kwargs):
+        with self._lock:
+            self.calls.append(list(zip(entries, kwargs["ordering_keys"])))
+        return super().send_message_batch(entries, **kwargs)
+
+    def get_provider_name(self):
+        return "recording"
+
+
+def test_sharded_batches_fill_whole_calls(valid_payload):
+    """Tasks should be batched per shard, so each queue call is full"""
+    shards = {f"q{i}": RecordingShard() for i in range(3)}
+    provider = ShardedQueueProvider(shards)
+    ingestor = StreamIngestor(
+        queue_service=TaskQueueService(provider=provider),
+        status_service=NullStatusService(),
+        results=io.BytesIO(),
+        batch_size=provider.max_batch_size,
+    )
+
+    async def body():
+        for i in range(300):
+            yield ndjson({**valid_payload, "title": str(i), "ordering_key": f"k{i % 40}"})
+
+    counts = asyncio.run(ingestor.ingest(body()))
+
+    assert counts["accepted"] == 300
+    for shard in shards.values():
+        sizes = [len(call) for call in shard.calls]
+        # Only the last call of each shard may be partial
+        assert all(size == 10 for size in sizes[:-1])
+        titles = {}
+        for (body, _), key in (entry for call in shard.calls for entry in call):
+            titles.setdefault(key, []).append(int(json.loads(body)["title"]))
+        assert all(seq == sorted(seq) for seq in titles.values())
@@ -0,0 +1,93 @@
+"""GET /tasks/{task_id} and POST /tasks/status Endpoint Tests"""
+
+from unittest.mock import patch
+
+from services.api.services.status.status_service import status_cache
+from services.common.status.factory import get_status_store
+
+
+def test_created_task_is_queued(client, valid_payload):
+    """A newly created task should be reported as queued"""
+    task_id = client.post("/tasks", json=valid_payload).json()["task_id"]
+
+    response = client.get(f"/tasks/{task_id}")
+
+    assert response.status_code == 200
+    assert response.json()["task_id"] == task_id
+    assert response.json()["status"] == "queued"
+    assert response.headers["ETag"]
+
+
+def test_unknown_task_returns_404(client):
+    """Unknown task IDs should return 404"""
+    response = client.get("/tasks/does-not-exist")
+
+    assert response.status_code == 404
+
+
+def test_failed_enqueue_records_no_status(mock_sqs, client, valid_payload):
+    """A task that never reached the queue should not get a status"""
+    mock_sqs.send_message.side_effect = Exception("SQS down")
+
+    client.post("/tasks", json=valid_payload)
+
+    assert len(status_cache) == 0
+
+
+def test_matching_etag_returns_304(client, valid_payload):
+    """If-None-Match with the current ETag should return 304 without a body"""
+    task_id = client.post("/tasks", json=valid_payload).json()["task_id"]
+    etag = client.get(f"/tasks/{task_id}").headers["ETag"]
+
+    response = client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_status_change_changes_etag(client, valid_payload):
+    """A status transition should invalidate previously issued ETags"""
+    task_id = client.post("/tasks", json=valid_payload).json()["task_id"]
+    etag = client.get(f"/tasks/{task_id}").headers["ETag"]
+
+    get_status_store().set_status(task_id, "succeeded")
+    status_cache.clear()
+    response = client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+    assert response.headers["ETag"] != etag
+
+
+def test_repeated_reads_are_served_from_cache(client, valid_payload):
+    """Reads within the cache TTL should not hit the status store"""
+    task_id = client.post("/tasks", json=valid_payload).json()["task_id"]
+
+    with patch.object(get_status_store(), "get") as store_get:
+        for _ in range(3):
+            assert client.get(f"/tasks/{task_id}").status_code == 200
+
+    store_get.assert_not_called()
+
+
+def test_batch_status_lookup(client, valid_payload):
+    """Batch lookup should return known tasks and list unknown IDs"""
+    task_ids = [
+        client.post("/tasks", json=valid_payload).json()["task_id"] for _ in range(2)
+    ]
+    status_cache.clear()
+
+    response = client.post("/tasks/status", json={"task_ids": [*task_ids, "missing"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(task["task_id"] for task in body["tasks"]) == sorted(task_ids)
+    assert body["not_found"] == ["missing"]
+
+
+def test_batch_status_lookup_rejects_empty_list(client):
+    """Batch lookup needs at least one task ID"""
+    response = client.post("/tasks/status", json={"task_ids": []})
+
+    assert response.status_code == 422
@@ -1,7 +1,9 @@
 """POST /tasks Endpoint Tests"""
 
 import json
+import os
 import uuid
+from unittest.mock import patch
 
 # ==============================================================================
 # INPUT VALIDATION TESTS
@@ -124,6 +126,43 @@ def test_sqs_enqueue_behavior(mock_sqs, client, valid_payload):
     assert message_body["priority"] == valid_payload["priority"]
 
 
+def test_ordering_key_is_message_group(mock_sqs, client, valid_payload):
+    """A task's ordering key should become its SQS message group"""
+    client.post("/tasks", json={**valid_payload, "ordering_key": "customer-42"})
+
+    assert mock_sqs.send_message.call_args.kwargs["MessageGroupId"] == "customer-42"
+
+
+def test_invalid_ordering_key_returns_422(client, valid_payload):
+    """Ordering keys must be valid SQS message group IDs"""
+    response = client.post("/tasks", json={**valid_payload, "ordering_key": "a b"})
+
+    assert response.status_code == 422
+
+
+def test_signed_messages_carry_signature_attribute(mock_sqs, client, valid_payload):
+    """With signing keys configured, the body's signature should be attached"""
+    from services.common.signing import MessageSigner
+
+    with patch.dict(os.environ, {"TASK_SIGNING_KEYS": "v1:secret"}):
+        response = client.post("/tasks", json=valid_payload)
+
+    assert response.status_code == 201
+    call_args = mock_sqs.send_message.call_args
+    attribute = call_args.kwargs["MessageAttributes"]["TaskSignature"]
+    assert attribute["DataType"] == "String"
+    assert MessageSigner({"v1": b"secret"}).verify(
+        call_args.kwargs["MessageBody"], attribute["StringValue"]
+    )
+
+
+def test_unsigned_messages_have_no_attributes(mock_sqs, client, valid_payload):
+    """Without signing keys, messages should be sent as before"""
+    client.post("/tasks", json=valid_payload)
+
+    assert "MessageAttributes" not in mock_sqs.send_message.call_args.kwargs
+
+
 def test_sqs_failure_returns_500(mock_sqs, client, valid_payload):
     """
     Test SQS failure handling.
@@ -139,3 +178,36 @@ def test_sqs_failure_returns_500(mock_sqs, client, valid_payload):
 
     assert response.status_code == 500
     assert "Failed to enqueue task" in response.json()["detail"]
+
+
+# ==============================================================================
+# PROFILING TESTS
+# ==============================================================================
+
+
+def test_profile_header_writes_artifact(client, valid_payload, tmp_path):
+    """X-Profile should profile the request when allowed"""
+    from services.common.blobstore import get_blob_store
+
+    env = {"PROFILE_ALLOW_HEADER": "true", "BLOB_STORE_ROOT": str(tmp_path / "blobs")}
+    get_blob_store.cache_clear()
+    with patch.dict(os.environ, env):
+        response = client.post("/tasks", json=valid_payload, headers={"X-Profile": "1"})
+        keys = list(get_blob_store().list("profiles/api.create_task/"))
+    get_blob_store.cache_clear()
+
+    assert response.status_code == 201
+    assert len(keys) == 1
+
+
+def test_profile_header_ignored_by_default(client, valid_payload, tmp_path):
+    """Clients should not be able to trigger profiling unless it is allowed"""
+    from services.common.blobstore import get_blob_store
+
+    get_blob_store.cache_clear()
+    with patch.dict(os.environ, {"BLOB_STORE_ROOT": str(tmp_path / "blobs")}):
+        client.post("/tasks", json=valid_payload, headers={"X-Profile": "1"})
+        keys = list(get_blob_store().list("profiles/"))
+    get_blob_store.cache_clear()
+
+    assert keys == []
@@ -0,0 +1,131 @@
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Iterator, Optional
+
+DEFAULT_ROOT = "/tmp/blobs"
+
+
+class BlobStore(ABC):
+    """Base class for all blob stores"""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> str:
+        """
+        Store an object, replacing any existing object with the same key.
+
+        Args:
+            key: Slash-separated object key
+            data: Object contents
+
+        Returns:
+            str: Location of the stored object, for logs
+        """
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """
+        Read an object.
+
+        Args:
+            key: Object key
+
+        Returns:
+            bytes: Object contents
+
+        Raises:
+            KeyError: No object has this key
+        """
+        pass
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> Iterator[str]:
+        """
+        List object keys starting with a prefix, in lexicographic order.
+
+        Args:
+            prefix: Key prefix
+
+        Yields:
+            str: Matching keys
+        """
+        pass
+
+    @abstractmethod
+    def get_store_name(self) -> str:
+        """Return the name of this blob store"""
+        pass
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store on the local filesystem, a stand-in for an object store"""
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            root: Base directory; defaults to ``BLOB_STORE_ROOT`` or /tmp/blobs
+        """
+        self.root = os.path.abspath(
+            root or os.environ.get("BLOB_STORE_ROOT", DEFAULT_ROOT)
+        )
+
+    def put(self, key: str, data: bytes) -> str:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial object
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def list(self, prefix: str = "") -> Iterator[str]:
+        # Only walk the directory the prefix points into
+        start = os.path.join(self.root, prefix.rpartition("/")[0])
+        keys = []
+        for directory, _, files in os.walk(start):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                key = os.path.relpath(os.path.join(directory, name), self.root)
+                key = key.replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+        return iter(sorted(keys))
+
+    def get_store_name(self) -> str:
+        return "local"
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return path
+
+
+@lru_cache(maxsize=None)
+def get_blob_store() -> BlobStore:
+    """
+    Return the process-wide blob store selected by ``BLOB_STORE``.
+
+    The store is created once per process and reused across invocations.
+    """
+    store_type = os.environ.get("BLOB_STORE", "local")
+    if store_type == "local":
+        return LocalBlobStore()
+    raise RuntimeError(f"Unsupported BLOB_STORE: {store_type}")
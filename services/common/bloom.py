@@ -0,0 +1,79 @@
+import hashlib
+import math
+from typing import Iterable, Tuple
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership filter over strings.
+
+    ``in`` never returns False for an added item, and returns True for an
+    item that was not added with probability about ``error_rate`` while no
+    more than ``capacity`` items have been added. Items cannot be removed.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Size the filter.
+
+        Args:
+            capacity: Items the filter is sized for
+            error_rate: False positive rate at capacity
+        """
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = math.ceil(
+            -self.capacity * math.log(error_rate) / math.log(2) ** 2
+        )
+        self.num_hashes = max(round(self.num_bits / self.capacity * math.log(2)), 1)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def add(self, item: str) -> None:
+        self.update((item,))
+
+    def update(self, items: Iterable[str]) -> None:
+        # Locals and no per-item call: bulk loads are the filter's cold-start cost
+        bits, num_bits, num_hashes, hashes = (
+            self._bits,
+            self.num_bits,
+            self.num_hashes,
+            self._hashes,
+        )
+        count = 0
+        for item in items:
+            position, step = hashes(item)
+            for _ in range(num_hashes):
+                index = position % num_bits
+                bits[index >> 3] |= 1 << (index & 7)
+                position += step
+            count += 1
+        self._count += count
+
+    def __contains__(self, item: str) -> bool:
+        # Most absent items fail on the first or second bit
+        bits, num_bits = self._bits, self.num_bits
+        position, step = self._hashes(item)
+        for _ in range(self.num_hashes):
+            index = position % num_bits
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+            position += step
+        return True
+
+    def __len__(self) -> int:
+        """Number of items added"""
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+    @staticmethod
+    def _hashes(item: str) -> Tuple[int, int]:
+        # Double hashing: the i-th bit is at (h1 + i * h2) mod num_bits, both
+        # taken from one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return h1, h2
@@ -0,0 +1,51 @@
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger("metrics")
+
+
+def put_metric(
+    name: str,
+    value: float,
+    unit: str = "Count",
+    dimensions: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Emit a CloudWatch metric using the Embedded Metric Format.
+
+    The record goes through the structured logging handler, which writes
+    extra fields at the top level of the JSON line, so CloudWatch Logs
+    extracts it as a metric without any API call. Metric records are never
+    sampled.
+
+    Args:
+        name: Metric name
+        value: Metric value
+        unit: CloudWatch unit, e.g. ``Count`` or ``Milliseconds``
+        dimensions: Dimension names and values
+    """
+    dimensions = dimensions or {}
+    logger.info(
+        "metric %s=%s",
+        name,
+        value,
+        extra={
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": os.environ.get(
+                            "METRICS_NAMESPACE", "QueueProcessingApp"
+                        ),
+                        "Dimensions": [list(dimensions)],
+                        "Metrics": [{"Name": name, "Unit": unit}],
+                    }
+                ],
+            },
+            name: value,
+            **dimensions,
+            "sample": False,
+        },
+    )
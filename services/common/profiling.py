@@ -0,0 +1,358 @@
+import cProfile
+import functools
+import gzip
+import logging
+import marshal
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+from services.common.blobstore import get_blob_store
+
+logger = logging.getLogger(__name__)
+
+CPROFILE = "cprofile"
+SAMPLING = "sampling"
+MODES = (CPROFILE, SAMPLING)
+
+# Request header asking for a profile of that request (if PROFILE_ALLOW_HEADER)
+PROFILE_HEADER = "X-Profile"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Timings of the current invocation; None while hot-path timers are disabled
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "hot_path_timings", default=None
+)
+# Profiler mode requested for the current invocation, e.g. through the header
+_requested_mode: ContextVar[Optional[str]] = ContextVar(
+    "requested_profile_mode", default=None
+)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings: Dict[str, float], name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        self.timings[self.name] = self.timings.get(self.name, 0.0) + elapsed
+
+
+def timer(name: str) -> Any:
+    """
+    Time a hot-path section, accumulating into the current invocation.
+
+    While timers are disabled this returns a shared no-op context manager,
+    so an instrumented section costs one context variable lookup.
+
+    Args:
+        name: Section name, e.g. ``serialization``
+    """
+    timings = _timings.get()
+    if timings is None:
+        return _NULL_TIMER
+    return _Timer(timings, name)
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Add an externally measured duration to the current invocation's timings"""
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def timers_enabled() -> bool:
+    """Return True if hot-path timers are switched on by ``HOT_PATH_TIMERS``"""
+    return os.environ.get("HOT_PATH_TIMERS", "").lower() in ("1", "true")
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """
+    Enable hot-path timers for the block.
+
+    Yields:
+        dict: Accumulated seconds per section, filled in as the block runs
+    """
+    timings: Dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def parse_profile_header(value: Optional[str]) -> Optional[str]:
+    """
+    Map an ``X-Profile`` header value to a profiler mode.
+
+    The header is ignored unless ``PROFILE_ALLOW_HEADER`` is set, since
+    profiling slows the request down.
+
+    Args:
+        value: Header value: ``1``/``true`` or a mode name
+
+    Returns:
+        str or None: Requested mode
+    """
+    if not value or os.environ.get("PROFILE_ALLOW_HEADER", "").lower() not in (
+        "1",
+        "true",
+    ):
+        return None
+    value = value.strip().lower()
+    if value in MODES:
+        return value
+    if value in ("1", "true"):
+        return _env_mode() or CPROFILE
+    return None
+
+
+@contextmanager
+def request_profile(mode: Optional[str]) -> Iterator[None]:
+    """Ask for the next profiled section in this context to be profiled"""
+    token = _requested_mode.set(mode)
+    try:
+        yield
+    finally:
+        _requested_mode.reset(token)
+
+
+def select_mode(rng: Callable[[], float] = random.random) -> Optional[str]:
+    """
+    Decide whether the current invocation is profiled, and how.
+
+    An explicit request wins; otherwise ``PROFILE_MODE`` (``cprofile`` or
+    ``sampling``) applies to a ``PROFILE_SAMPLE_RATE`` fraction of
+    invocations.
+
+    Returns:
+        str or None: Profiler mode, or None to run unprofiled
+    """
+    requested = _requested_mode.get()
+    if requested is not None:
+        return requested
+    mode = _env_mode()
+    if mode is None:
+        return None
+    rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0.01"))
+    return mode if rng() < rate else None
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler sampling one thread's stack at a fixed interval.
+
+    A background thread reads the target thread's current frame, so the
+    profiled code runs at full speed apart from the sampling itself.
+    Results are folded stacks (``outer;inner count``), the input format of
+    common flame graph tools.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval_seconds: Time between samples
+        """
+        self.interval_seconds = interval_seconds
+        self.samples: Counter = Counter()
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling the calling thread"""
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> bytes:
+        """Return the samples as folded stacks, most frequent first"""
+        return "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common()
+        ).encode()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                    f"{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+
+@contextmanager
+def profiling_scope(name: str, mode: Optional[str] = None) -> Iterator[None]:
+    """
+    Profile the block if this invocation is selected for profiling.
+
+    The artifact is written, gzip-compressed, to the blob store under
+    ``profiles/<name>/<date>/``: a pstats dump for ``cprofile`` (load with
+    ``pstats.Stats``) or folded stacks for ``sampling``. Hot-path timers are
+    enabled while profiling and logged with the artifact key.
+
+    Args:
+        name: Profiled entrypoint, e.g. ``api.create_task``
+        mode: Profiler mode; chosen by ``select_mode`` if omitted
+    """
+    mode = mode or select_mode()
+    if mode is None:
+        yield
+        return
+
+    profiler: Any = cProfile.Profile() if mode == CPROFILE else SamplingProfiler()
+    with _timings_enabled() as timings:
+        started = time.perf_counter()
+        if mode == CPROFILE:
+            profiler.enable()
+        else:
+            profiler.start()
+        try:
+            yield
+        finally:
+            if mode == CPROFILE:
+                profiler.disable()
+            else:
+                profiler.stop()
+            elapsed = time.perf_counter() - started
+            _write_profile(name, mode, profiler, elapsed, timings)
+
+
+@contextmanager
+def invocation_timings(name: str) -> Iterator[None]:
+    """
+    Collect and log hot-path timings for one invocation if ``HOT_PATH_TIMERS`` is set.
+
+    Args:
+        name: Invocation name used in the log record, e.g. ``api``
+    """
+    if not timers_enabled():
+        yield
+        return
+    with _timings_enabled() as timings:
+        yield
+        logger.info(
+            "Hot path timings",
+            extra={
+                "invocation_name": name,
+                "timings_ms": {k: round(v * 1000, 3) for k, v in timings.items()},
+            },
+        )
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """
+    Decorate an entrypoint so selected invocations are profiled.
+
+    Args:
+        name: Profiled entrypoint, e.g. ``processor.handle``
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            mode = select_mode()
+            if mode is None:
+                return func(*args, **kwargs)
+            with profiling_scope(name, mode):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+@contextmanager
+def _timings_enabled() -> Iterator[Dict[str, float]]:
+    # Join timings already being collected by an outer scope
+    timings = _timings.get()
+    if timings is not None:
+        yield timings
+        return
+    with collect_timings() as timings:
+        yield timings
+
+
+def _env_mode() -> Optional[str]:
+    mode = os.environ.get("PROFILE_MODE", "off").lower()
+    return mode if mode in MODES else None
+
+
+def _serialize(mode: str, profiler: Any) -> Tuple[bytes, str]:
+    if mode == CPROFILE:
+        # Same format as Profile.dump_stats, readable with pstats.Stats
+        profiler.create_stats()
+        return marshal.dumps(profiler.stats), "pstats.gz"
+    return profiler.folded(), "folded.gz"
+
+
+def _write_profile(
+    name: str, mode: str, profiler: Any, elapsed: float, timings: Dict[str, float]
+) -> None:
+    # Profiling must never fail the invocation it observes
+    try:
+        data, extension = _serialize(mode, profiler)
+        now = datetime.now(timezone.utc)
+        key = (
+            f"profiles/{name}/{now:%Y-%m-%d}/"
+            f"{now:%H%M%S}-{uuid.uuid4().hex[:8]}.{extension}"
+        )
+        location = get_blob_store().put(key, gzip.compress(data, compresslevel=6))
+    except Exception:
+        logger.exception("Failed to write profile", extra={"profile": name})
+        return
+    logger.info(
+        "Profile written",
+        extra={
+            "profile": name,
+            "profile_mode": mode,
+            "profile_key": key,
+            "profile_location": location,
+            "duration_ms": round(elapsed * 1000, 3),
+            "timings_ms": {k: round(v * 1000, 3) for k, v in timings.items()},
+            "sample": False,
+        },
+    )
@@ -0,0 +1,114 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Mapping, Optional
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+# Message attribute carrying the signature of the message body
+SIGNATURE_ATTRIBUTE = "TaskSignature"
+
+
+def parse_keys(value: str) -> Dict[str, bytes]:
+    """
+    Parse signing keys from ``version:secret`` pairs separated by commas.
+
+    Args:
+        value: e.g. ``"v1:old-secret,v2:new-secret"``
+
+    Returns:
+        dict: Secret per key version, in the given order
+    """
+    keys = {}
+    for pair in filter(None, (item.strip() for item in value.split(","))):
+        version, sep, secret = pair.partition(":")
+        if not sep or not version or not secret:
+            raise ValueError("Signing keys must be 'version:secret' pairs")
+        keys[version] = secret.encode()
+    return keys
+
+
+def load_secret_keys(secret_id: str) -> Dict[str, bytes]:
+    """
+    Load signing keys from a Secrets Manager secret.
+
+    Args:
+        secret_id: ARN or name of a secret holding a JSON object of secret per
+            key version, e.g. ``{"v1": "old-secret", "v2": "new-secret"}``
+
+    Returns:
+        dict: Secret per key version, in the secret's order
+    """
+    response = boto3.client("secretsmanager").get_secret_value(SecretId=secret_id)
+    return {
+        version: str(secret).encode()
+        for version, secret in json.loads(response["SecretString"]).items()
+    }
+
+
+class MessageSigner:
+    """Signs and verifies queue message bodies with versioned HMAC-SHA256 keys"""
+
+    def __init__(self, keys: Mapping[str, bytes], active_version: Optional[str] = None):
+        """
+        Initialize the signer.
+
+        Every key verifies; only the active one signs, so a new key can be
+        rolled out to consumers before producers start signing with it.
+
+        Args:
+            keys: Secret per key version
+            active_version: Version used to sign; defaults to the last key
+        """
+        if not keys:
+            raise ValueError("At least one signing key is required")
+        self.keys = dict(keys)
+        self.active_version = active_version or list(self.keys)[-1]
+        if self.active_version not in self.keys:
+            raise ValueError(f"Unknown signing key version: {self.active_version}")
+
+    def sign(self, body: str) -> str:
+        """
+        Sign a message body.
+
+        Returns:
+            str: ``<key version>:<hex HMAC-SHA256 of the body>``
+        """
+        return f"{self.active_version}:{self._digest(self.active_version, body)}"
+
+    def verify(self, body: str, signature: Optional[str]) -> bool:
+        """Return True if ``signature`` is a valid signature of ``body``"""
+        if not signature:
+            return False
+        version, _, digest = signature.partition(":")
+        if version not in self.keys:
+            return False
+        return hmac.compare_digest(self._digest(version, body), digest)
+
+    def _digest(self, version: str, body: str) -> str:
+        return hmac.new(self.keys[version], body.encode(), hashlib.sha256).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_message_signer() -> Optional[MessageSigner]:
+    """
+    Return the process-wide signer, or None if signing is not configured.
+
+    Keys are read once per process from the secret named by
+    ``TASK_SIGNING_SECRET_ARN`` (see ``load_secret_keys``) or, without it,
+    from ``TASK_SIGNING_KEYS`` (see ``parse_keys``);
+    ``TASK_SIGNING_KEY_VERSION`` selects the signing key.
+    """
+    secret_arn = os.environ.get("TASK_SIGNING_SECRET_ARN")
+    if secret_arn:
+        keys = load_secret_keys(secret_arn)
+    else:
+        keys = parse_keys(os.environ.get("TASK_SIGNING_KEYS", ""))
+    if not keys:
+        return None
+    return MessageSigner(keys, active_version=os.environ.get("TASK_SIGNING_KEY_VERSION"))
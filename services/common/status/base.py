@@ -0,0 +1,108 @@
+from abc import ABC, abstractmethod
+from typing import Collection, Dict, Iterable, Literal, Optional
+
+from pydantic import BaseModel
+
+TaskStatus = Literal[
+    "queued", "processing", "succeeded", "failed", "dead_lettered", "cancelled"
+]
+
+
+class TaskStatusRecord(BaseModel):
+    task_id: str
+    status: TaskStatus
+    updated_at: float  # Unix epoch seconds
+    error: Optional[str] = None
+
+
+class TaskStatusStore(ABC):
+    """Base class for all task status stores"""
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[TaskStatusRecord]:
+        """
+        Look up the current status of a task.
+
+        Args:
+            task_id: Task identifier
+
+        Returns:
+            TaskStatusRecord or None if the task is unknown
+        """
+        pass
+
+    @abstractmethod
+    def get_many(self, task_ids: Iterable[str]) -> Dict[str, TaskStatusRecord]:
+        """
+        Look up the current status of several tasks in one round trip.
+
+        Args:
+            task_ids: Task identifiers
+
+        Returns:
+            dict: Records keyed by task ID; unknown tasks are omitted
+        """
+        pass
+
+    @abstractmethod
+    def set_status(
+        self, task_id: str, status: TaskStatus, error: Optional[str] = None
+    ) -> TaskStatusRecord:
+        """
+        Record a status transition.
+
+        ``queued`` never overwrites an existing record, so a late write from
+        the API cannot hide progress already reported by the processor.
+
+        Args:
+            task_id: Task identifier
+            status: New status
+            error: Short failure description for failed tasks
+
+        Returns:
+            TaskStatusRecord: The record as stored
+        """
+        pass
+
+    def set_status_many(self, task_ids: Iterable[str], status: TaskStatus) -> None:
+        """
+        Record the same status transition for several tasks.
+
+        The default writes them one by one; stores should override this with
+        a single round trip.
+
+        Args:
+            task_ids: Task identifiers
+            status: New status
+        """
+        for task_id in task_ids:
+            self.set_status(task_id, status)
+
+    @abstractmethod
+    def compare_and_set_status(
+        self,
+        task_id: str,
+        expected: Collection[TaskStatus],
+        status: TaskStatus,
+        updated_before: Optional[float] = None,
+    ) -> Optional[TaskStatusRecord]:
+        """
+        Atomically change a task's status, only if it is currently one of ``expected``.
+
+        Args:
+            task_id: Task identifier
+            expected: Statuses the task may be in
+            status: New status
+            updated_before: If set, also require the record to have been last
+                updated before this Unix time
+
+        Returns:
+            TaskStatusRecord: The new record, or None if the task is unknown or
+            in another status
+        """
+        pass
+
+    @abstractmethod
+    def get_store_name(self) -> str:
+        """Return the name of this status store"""
+        pass
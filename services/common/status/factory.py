@@ -0,0 +1,18 @@
+import os
+from functools import lru_cache
+
+from .base import TaskStatusStore
+from .sqlite_store import SQLiteTaskStatusStore
+
+
+@lru_cache(maxsize=None)
+def get_status_store() -> TaskStatusStore:
+    """
+    Return the process-wide status store selected by ``TASK_STATUS_STORE``.
+
+    The store is created once per process and reused across invocations.
+    """
+    store_type = os.environ.get("TASK_STATUS_STORE", "sqlite")
+    if store_type == "sqlite":
+        return SQLiteTaskStatusStore()
+    raise RuntimeError(f"Unsupported TASK_STATUS_STORE: {store_type}")
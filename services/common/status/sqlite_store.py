@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Collection, Dict, Iterable, List, Optional
+
+from .base import TaskStatus, TaskStatusRecord, TaskStatusStore
+
+DEFAULT_DB_PATH = "/tmp/task-status.sqlite3"
+
+# Stay well below SQLite's bound-parameter limit
+_MAX_PARAMS = 500
+
+
+class SQLiteTaskStatusStore(TaskStatusStore):
+    """Local SQLite task status store, a stand-in for a shared database"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Open (and create if needed) the status database.
+
+        Args:
+            db_path: Database file; defaults to ``TASK_STATUS_DB_PATH`` or /tmp
+        """
+        self.db_path = db_path or os.environ.get("TASK_STATUS_DB_PATH", DEFAULT_DB_PATH)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_status (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                error TEXT
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, task_id: str) -> Optional[TaskStatusRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT task_id, status, updated_at, error FROM task_status"
+                " WHERE task_id = ?",
+                (task_id,),
+            ).fetchone()
+        return self._to_record(row) if row else None
+
+    def get_many(self, task_ids: Iterable[str]) -> Dict[str, TaskStatusRecord]:
+        ids = list(dict.fromkeys(task_ids))
+        rows: List[tuple] = []
+        with self._lock:
+            for start in range(0, len(ids), _MAX_PARAMS):
+                chunk = ids[start : start + _MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(
+                    self._conn.execute(
+                        "SELECT task_id, status, updated_at, error FROM task_status"
+                        f" WHERE task_id IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                )
+        return {row[0]: self._to_record(row) for row in rows}
+
+    def set_status(
+        self, task_id: str, status: TaskStatus, error: Optional[str] = None
+    ) -> TaskStatusRecord:
+        record = TaskStatusRecord(
+            task_id=task_id, status=status, updated_at=time.time(), error=error
+        )
+        with self._lock:
+            cursor = self._conn.execute(
+                self._upsert_sql(status),
+                (record.task_id, record.status, record.updated_at, record.error),
+            )
+            self._conn.commit()
+
+        if cursor.rowcount == 0:
+            return self.get(task_id) or record
+        return record
+
+    def set_status_many(self, task_ids: Iterable[str], status: TaskStatus) -> None:
+        updated_at = time.time()
+        with self._lock:
+            self._conn.executemany(
+                self._upsert_sql(status),
+                ((task_id, status, updated_at, None) for task_id in task_ids),
+            )
+            self._conn.commit()
+
+    def compare_and_set_status(
+        self,
+        task_id: str,
+        expected: Collection[TaskStatus],
+        status: TaskStatus,
+        updated_before: Optional[float] = None,
+    ) -> Optional[TaskStatusRecord]:
+        expected = list(expected)
+        record = TaskStatusRecord(task_id=task_id, status=status, updated_at=time.time())
+        placeholders = ",".join("?" * len(expected))
+        sql = (
+            "UPDATE task_status SET status = ?, updated_at = ?, error = NULL"
+            f" WHERE task_id = ? AND status IN ({placeholders})"
+        )
+        params = [record.status, record.updated_at, task_id, *expected]
+        if updated_before is not None:
+            sql += " AND updated_at < ?"
+            params.append(updated_before)
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+        return record if cursor.rowcount else None
+
+    def get_store_name(self) -> str:
+        return "sqlite"
+
+    @staticmethod
+    def _upsert_sql(status: TaskStatus) -> str:
+        if status == "queued":
+            conflict = "DO NOTHING"
+        else:
+            conflict = (
+                "DO UPDATE SET status = excluded.status,"
+                " updated_at = excluded.updated_at, error = excluded.error"
+            )
+        return (
+            "INSERT INTO task_status (task_id, status, updated_at, error)"
+            f" VALUES (?, ?, ?, ?) ON CONFLICT (task_id) {conflict}"
+        )
+
+    @staticmethod
+    def _to_record(row: tuple) -> TaskStatusRecord:
+        task_id, status, updated_at, error = row
+        return TaskStatusRecord(
+            task_id=task_id, status=status, updated_at=updated_at, error=error
+        )
@@ -0,0 +1,270 @@
+import json
+import logging
+import os
+import random
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TextIO
+
+_invocation_context: ContextVar[Dict[str, Any]] = ContextVar(
+    "invocation_context", default={}
+)
+# Identifies the current invocation's buffer; None outside any invocation
+_invocation_key: ContextVar[Optional[object]] = ContextVar("invocation_key", default=None)
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__.keys()
+) | {"message", "asctime", "invocation", "sample"}
+
+
+class LazyField:
+    """Log field whose value is only computed if the record is emitted"""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+
+
+def lazy(func: Callable[[], Any]) -> LazyField:
+    """
+    Defer computing a log field until the record is actually written.
+
+    Args:
+        func: Zero-argument callable producing the field value
+
+    Returns:
+        LazyField: Value to pass in a logging ``extra`` mapping
+    """
+    return LazyField(func)
+
+
+def parse_sample_rates(spec: Optional[str]) -> Dict[int, float]:
+    """
+    Parse a sampling spec such as ``"DEBUG=0,INFO=0.1"``.
+
+    Args:
+        spec: Comma-separated ``LEVEL=rate`` pairs, rates between 0 and 1
+
+    Returns:
+        dict: Sampling rate keyed by numeric log level
+    """
+    rates: Dict[int, float] = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        level_name, _, rate = item.partition("=")
+        level = logging.getLevelName(level_name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level in sample rates: {level_name!r}")
+        rates[level] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as single-line JSON with invocation context and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "invocation", None) or {})
+
+        for key, value in record.__dict__.items():
+            if key in _RECORD_ATTRIBUTES:
+                continue
+            entry[key] = value.func() if isinstance(value, LazyField) else value
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+class BufferedJsonHandler(logging.Handler):
+    """
+    Buffer records per invocation and write each invocation's records in one go.
+
+    Records below WARNING are sampled per level at flush time, so formatting
+    and lazy fields are only paid for records that are kept. Warnings are
+    written as soon as they are logged. An error writes out the invocation's
+    buffer straight away and keeps every record of that invocation, so
+    failures come with their full context even if the invocation never
+    finishes (timeout, out of memory). Concurrent invocations have separate
+    buffers.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        sample_rates: Optional[Dict[int, float]] = None,
+        capacity: int = 1000,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Initialize the handler.
+
+        Args:
+            stream: Destination for JSON lines; defaults to stdout
+            sample_rates: Fraction of records kept per level; unlisted levels are kept
+            capacity: Buffered records of one invocation that force an early flush
+            rng: Source of randomness for sampling decisions
+        """
+        super().__init__()
+        self.stream = stream
+        self.sample_rates = sample_rates or {}
+        self.capacity = capacity
+        self.rng = rng
+        self.setFormatter(JsonFormatter())
+        self._buffers: Dict[Optional[object], List[logging.LogRecord]] = {}
+        self._errored: Set[Optional[object]] = set()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        record.invocation = _invocation_context.get()
+        key = _invocation_key.get()
+        if record.levelno >= logging.ERROR:
+            self._errored.add(key)
+        elif record.levelno >= logging.WARNING:
+            self._write([record])
+            return
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append(record)
+        if record.levelno >= logging.ERROR or len(buffer) >= self.capacity:
+            self._flush(key)
+
+    def flush(self) -> None:
+        """Write out the current invocation's buffered records"""
+        self._flush(_invocation_key.get())
+
+    def end_invocation(self) -> None:
+        """Write out the current invocation's records and forget its state"""
+        key = _invocation_key.get()
+        self._flush(key)
+        with self.lock:
+            self._buffers.pop(key, None)
+            self._errored.discard(key)
+
+    def close(self) -> None:
+        for key in list(self._buffers):
+            self._flush(key)
+        super().close()
+
+    def _flush(self, key: Optional[object]) -> None:
+        with self.lock:
+            records = self._buffers.get(key)
+            if not records:
+                return
+            self._buffers[key] = []
+            keep_all = key in self._errored
+            if key is None:
+                # Nothing ends the records logged outside an invocation
+                self._errored.discard(key)
+
+        self._write([record for record in records if keep_all or self._keep(record)])
+
+    def _write(self, records: List[logging.LogRecord]) -> None:
+        lines = [self.format(record) for record in records]
+        if lines:
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+
+    def _keep(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not getattr(record, "sample", True):
+            return True
+        rate = self.sample_rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or self.rng() < rate
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    sample_rates: Optional[str] = None,
+    stream: Optional[TextIO] = None,
+) -> BufferedJsonHandler:
+    """
+    Install the buffered JSON handler on the root logger.
+
+    Safe to call more than once; later calls reuse the installed handler.
+    The Lambda runtime's own root handler is removed so lines are not
+    written twice.
+
+    Args:
+        level: Root log level; defaults to ``LOG_LEVEL`` or INFO
+        sample_rates: Sampling spec; defaults to ``LOG_SAMPLE_RATES``
+        stream: Destination for JSON lines; defaults to stdout
+
+    Returns:
+        BufferedJsonHandler: The installed handler
+    """
+    root = logging.getLogger()
+    root.setLevel(level or os.environ.get("LOG_LEVEL", "INFO"))
+
+    for handler in root.handlers:
+        if isinstance(handler, BufferedJsonHandler):
+            return handler
+
+    for handler in list(root.handlers):
+        if type(handler).__name__ == "LambdaLoggerHandler":
+            root.removeHandler(handler)
+
+    handler = BufferedJsonHandler(
+        stream=stream,
+        sample_rates=parse_sample_rates(
+            sample_rates
+            if sample_rates is not None
+            else os.environ.get("LOG_SAMPLE_RATES")
+        ),
+    )
+    root.addHandler(handler)
+    return handler
+
+
+def flush_logs() -> None:
+    """Write out the current invocation's records buffered by the installed handler"""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, BufferedJsonHandler):
+            handler.flush()
+
+
+def bind_log_context(**fields: Any) -> None:
+    """
+    Attach fields to every record logged for the rest of the current invocation.
+
+    Args:
+        **fields: Context fields such as ``task_id``; ``None`` values are dropped
+    """
+    context = dict(_invocation_context.get())
+    context.update({key: value for key, value in fields.items() if value is not None})
+    _invocation_context.set(context)
+
+
+@contextmanager
+def log_invocation(**fields: Any) -> Iterator[None]:
+    """
+    Scope log context and a log buffer to one invocation, and flush it at the end.
+
+    Records logged outside any invocation (e.g. at cold start) are written
+    along with it.
+
+    Args:
+        **fields: Context fields such as ``request_id``; ``None`` values are dropped
+    """
+    token = _invocation_context.set(
+        {key: value for key, value in fields.items() if value is not None}
+    )
+    key_token = _invocation_key.set(object())
+    try:
+        yield
+    finally:
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, BufferedJsonHandler):
+                handler.end_invocation()
+        _invocation_key.reset(key_token)
+        _invocation_context.reset(token)
+        flush_logs()
@@ -0,0 +1,47 @@
+"""Local Blob Store Tests"""
+
+import pytest
+
+from services.common.blobstore import LocalBlobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalBlobStore(str(tmp_path / "blobs"))
+
+
+def test_put_and_get(store):
+    """Stored objects should be readable by key"""
+    store.put("a/b/object.bin", b"payload")
+
+    assert store.get("a/b/object.bin") == b"payload"
+
+
+def test_put_replaces_existing_object(store):
+    """Writing an existing key should replace its contents"""
+    store.put("key", b"old")
+    store.put("key", b"new")
+
+    assert store.get("key") == b"new"
+
+
+def test_missing_key_raises_key_error(store):
+    """Unknown keys should raise KeyError"""
+    with pytest.raises(KeyError):
+        store.get("missing")
+
+
+def test_list_filters_by_prefix_in_order(store):
+    """list should return matching keys sorted"""
+    for key in ("logs/2024-01-02/b", "logs/2024-01-01/a", "other/c"):
+        store.put(key, b"")
+
+    assert list(store.list("logs/")) == ["logs/2024-01-01/a", "logs/2024-01-02/b"]
+    assert list(store.list("logs/2024-01-02")) == ["logs/2024-01-02/b"]
+    assert list(store.list("missing/")) == []
+
+
+def test_keys_cannot_escape_root(store):
+    """Keys resolving outside the store root should be rejected"""
+    with pytest.raises(ValueError):
+        store.put("../outside", b"")
@@ -0,0 +1,38 @@
+"""TTL/LRU Cache Tests"""
+
+from services.common.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    """Entries should not be returned once their TTL has passed"""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl_seconds=2, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 1.9
+    assert cache.get("a") == 1
+
+    clock.now = 2.0
+    assert cache.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    """A full cache should evict the entry that was used least recently"""
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
@@ -0,0 +1,146 @@
+"""Profiling Hooks and Hot-Path Timer Tests"""
+
+import gzip
+import marshal
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from services.common import profiling
+from services.common.blobstore import get_blob_store
+from services.common.profiling import (
+    SamplingProfiler,
+    collect_timings,
+    parse_profile_header,
+    profiled,
+    profiling_scope,
+    request_profile,
+    select_mode,
+    timer,
+)
+
+
+@pytest.fixture
+def blob_root(tmp_path):
+    """Point the blob store at a per-test directory"""
+    get_blob_store.cache_clear()
+    with patch.dict(os.environ, {"BLOB_STORE_ROOT": str(tmp_path / "blobs")}):
+        yield tmp_path / "blobs"
+    get_blob_store.cache_clear()
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+# ==============================================================================
+# HOT-PATH TIMER TESTS
+# ==============================================================================
+
+
+def test_timer_is_shared_no_op_when_disabled():
+    """Disabled timers should not allocate or record anything"""
+    assert timer("a") is timer("b")
+    with timer("a"):
+        pass
+
+
+def test_timer_accumulates_when_collecting():
+    """Timers should add up per section while collection is enabled"""
+    with collect_timings() as timings:
+        for _ in range(2):
+            with timer("serialization"):
+                busy(0.001)
+
+    assert set(timings) == {"serialization"}
+    assert timings["serialization"] >= 0.002
+
+
+# ==============================================================================
+# SELECTION TESTS
+# ==============================================================================
+
+
+def test_profiling_is_off_by_default():
+    """Without PROFILE_MODE nothing should be profiled"""
+    with patch.dict(os.environ, {}, clear=True):
+        assert select_mode(rng=lambda: 0.0) is None
+
+
+def test_sample_rate_selects_fraction_of_invocations():
+    """PROFILE_SAMPLE_RATE should decide per invocation"""
+    env = {"PROFILE_MODE": "sampling", "PROFILE_SAMPLE_RATE": "0.1"}
+    with patch.dict(os.environ, env):
+        assert select_mode(rng=lambda: 0.05) == "sampling"
+        assert select_mode(rng=lambda: 0.5) is None
+
+
+def test_requested_mode_wins():
+    """An explicitly requested profile should override sampling"""
+    with patch.dict(os.environ, {"PROFILE_MODE": "off"}):
+        with request_profile("cprofile"):
+            assert select_mode() == "cprofile"
+
+
+def test_header_is_ignored_unless_allowed():
+    """X-Profile should only be honoured when PROFILE_ALLOW_HEADER is set"""
+    with patch.dict(os.environ, {}, clear=True):
+        assert parse_profile_header("1") is None
+    with patch.dict(os.environ, {"PROFILE_ALLOW_HEADER": "true"}):
+        assert parse_profile_header("1") == "cprofile"
+        assert parse_profile_header("sampling") == "sampling"
+        assert parse_profile_header("bogus") is None
+
+
+# ==============================================================================
+# ARTIFACT TESTS
+# ==============================================================================
+
+
+def test_cprofile_artifact_is_loadable(blob_root):
+    """cProfile artifacts should be gzip-compressed pstats dumps"""
+    with profiling_scope("test.entry", mode="cprofile"):
+        busy(0.001)
+
+    keys = list(get_blob_store().list("profiles/test.entry/"))
+    assert len(keys) == 1 and keys[0].endswith(".pstats.gz")
+    stats = marshal.loads(gzip.decompress(get_blob_store().get(keys[0])))
+    assert any(function == "busy" for _, _, function in stats)
+
+
+def test_sampling_profiler_records_folded_stacks():
+    """The sampling profiler should capture the profiled thread's stack"""
+    profiler = SamplingProfiler(interval_seconds=0.001)
+    profiler.start()
+    busy(0.05)
+    profiler.stop()
+
+    folded = profiler.folded().decode()
+    assert "busy (test_profiling.py" in folded
+    assert folded.splitlines()[0].rsplit(" ", 1)[1].isdigit()
+
+
+def test_profiled_function_runs_normally_when_not_selected(blob_root):
+    """Unselected invocations should not write artifacts"""
+
+    @profiled("test.entry")
+    def work(value):
+        return value * 2
+
+    with patch.dict(os.environ, {"PROFILE_MODE": "off"}):
+        assert work(21) == 42
+
+    assert list(get_blob_store().list("profiles/")) == []
+
+
+def test_failed_artifact_write_does_not_fail_invocation(blob_root):
+    """Profiling errors should never reach the profiled code"""
+    with patch.object(profiling, "get_blob_store", side_effect=OSError("disk full")):
+        with profiling_scope("test.entry", mode="cprofile"):
+            result = "done"
+
+    assert result == "done"
@@ -0,0 +1,79 @@
+"""Message Signing Tests"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from services.common.signing import MessageSigner, get_message_signer, parse_keys
+
+BODY = '{"task_id":"1","title":"Task","description":"Test","priority":"low"}'
+
+
+def test_signature_verifies_only_the_signed_body():
+    """A signature should verify its own body and nothing else"""
+    signer = MessageSigner({"v1": b"secret"})
+    signature = signer.sign(BODY)
+
+    assert signature.startswith("v1:")
+    assert signer.verify(BODY, signature)
+    assert not signer.verify(BODY.replace("low", "high"), signature)
+    assert not signer.verify(BODY, None)
+
+
+def test_signature_from_another_key_is_rejected():
+    """Signatures made with an unknown key or version should not verify"""
+    signature = MessageSigner({"v1": b"other-secret"}).sign(BODY)
+
+    assert not MessageSigner({"v1": b"secret"}).verify(BODY, signature)
+    assert not MessageSigner({"v2": b"other-secret"}).verify(BODY, signature)
+
+
+def test_key_rotation_keeps_old_signatures_valid():
+    """Messages signed with the previous key should verify during rotation"""
+    old = MessageSigner({"v1": b"old"})
+    rotated = MessageSigner({"v1": b"old", "v2": b"new"})
+
+    assert rotated.active_version == "v2"
+    assert rotated.verify(BODY, old.sign(BODY))
+    assert rotated.sign(BODY).startswith("v2:")
+
+
+def test_parse_keys_rejects_malformed_pairs():
+    """Keys should be 'version:secret' pairs"""
+    assert parse_keys("v1:a, v2:b:c") == {"v1": b"a", "v2": b"b:c"}
+    with pytest.raises(ValueError):
+        parse_keys("secret-without-version")
+
+
+def test_signer_is_configured_from_environment():
+    """Signing should be off without keys and use the selected key version"""
+    get_message_signer.cache_clear()
+    with patch.dict(os.environ, {"TASK_SIGNING_KEYS": ""}):
+        assert get_message_signer() is None
+
+    get_message_signer.cache_clear()
+    env = {"TASK_SIGNING_KEYS": "v1:a,v2:b", "TASK_SIGNING_KEY_VERSION": "v1"}
+    with patch.dict(os.environ, env):
+        assert get_message_signer().active_version == "v1"
+    get_message_signer.cache_clear()
+
+
+def test_signer_keys_are_fetched_once_from_secret():
+    """Keys in a secret should be read once per process and take precedence"""
+    get_message_signer.cache_clear()
+    env = {"TASK_SIGNING_SECRET_ARN": "arn:secret", "TASK_SIGNING_KEYS": "v9:ignored"}
+    with patch.dict(os.environ, env), patch(
+        "services.common.signing.boto3.client"
+    ) as client:
+        client.return_value.get_secret_value.return_value = {
+            "SecretString": '{"v1": "old", "v2": "new"}'
+        }
+        signer = get_message_signer()
+        assert get_message_signer() is signer
+
+    assert signer.keys == {"v1": b"old", "v2": b"new"}
+    assert signer.active_version == "v2"
+    client.assert_called_once_with("secretsmanager")
+    client.return_value.get_secret_value.assert_called_once_with(SecretId="arn:secret")
+    get_message_signer.cache_clear()
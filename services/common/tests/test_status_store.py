@@ -0,0 +1,72 @@
+"""SQLite Task Status Store Tests"""
+
+import pytest
+
+from services.common.status.sqlite_store import SQLiteTaskStatusStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteTaskStatusStore(str(tmp_path / "status.sqlite3"))
+
+
+def test_set_and_get_status(store):
+    """Stored status should be returned by get"""
+    store.set_status("task-1", "failed", error="RuntimeError")
+
+    record = store.get("task-1")
+
+    assert record.status == "failed"
+    assert record.error == "RuntimeError"
+    assert store.get("unknown") is None
+
+
+def test_queued_does_not_overwrite_progress(store):
+    """A late queued write must not hide status reported by the processor"""
+    store.set_status("task-1", "succeeded")
+
+    record = store.set_status("task-1", "queued")
+
+    assert record.status == "succeeded"
+    assert store.get("task-1").status == "succeeded"
+
+
+def test_get_many_omits_unknown_tasks(store):
+    """Batch lookup should return only known tasks"""
+    for i in range(600):
+        store.set_status(f"task-{i}", "queued")
+
+    records = store.get_many([f"task-{i}" for i in range(600)] + ["unknown"])
+
+    assert len(records) == 600
+    assert "unknown" not in records
+
+
+def test_compare_and_set_only_from_expected_status(store):
+    """A conditional transition should apply only from the expected statuses"""
+    store.set_status("task-1", "queued")
+    store.set_status("task-2", "processing")
+
+    cancelled = store.compare_and_set_status("task-1", ("queued",), "cancelled")
+
+    assert cancelled.status == "cancelled"
+    assert store.get("task-1").status == "cancelled"
+    assert store.compare_and_set_status("task-2", ("queued",), "cancelled") is None
+    assert store.get("task-2").status == "processing"
+    assert store.compare_and_set_status("unknown", ("queued",), "cancelled") is None
+
+
+def test_compare_and_set_can_require_an_old_record(store):
+    """With updated_before, only records last updated before it should change"""
+    store.set_status("task-1", "processing")
+    updated_at = store.get("task-1").updated_at
+
+    assert (
+        store.compare_and_set_status(
+            "task-1", ("processing",), "processing", updated_before=updated_at
+        )
+        is None
+    )
+    assert store.compare_and_set_status(
+        "task-1", ("processing",), "processing", updated_before=updated_at + 1
+    )
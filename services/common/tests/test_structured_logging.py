@@ -0,0 +1,187 @@
+"""Structured Logging Tests"""
+
+import contextvars
+import io
+import json
+import logging
+
+import pytest
+
+from services.common.structured_logging import (
+    BufferedJsonHandler,
+    bind_log_context,
+    lazy,
+    log_invocation,
+    parse_sample_rates,
+)
+
+
+@pytest.fixture
+def stream():
+    return io.StringIO()
+
+
+@pytest.fixture
+def make_logger(stream):
+    """Logger wired to a fresh BufferedJsonHandler writing to ``stream``"""
+    created = []
+
+    def factory(sample_rates=None, rng=lambda: 0.5, capacity=1000):
+        handler = BufferedJsonHandler(
+            stream=stream, sample_rates=sample_rates, capacity=capacity, rng=rng
+        )
+        logger = logging.getLogger(f"test-structured-logging-{len(created)}")
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        logger.addHandler(handler)
+        created.append((logger, handler))
+        return logger, handler
+
+    yield factory
+
+    for logger, handler in created:
+        logger.removeHandler(handler)
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_buffered_until_flush(make_logger, stream):
+    """Nothing should be written before the handler is flushed"""
+    logger, handler = make_logger()
+
+    logger.info("first")
+    logger.info("second")
+    assert stream.getvalue() == ""
+
+    handler.flush()
+    assert [entry["message"] for entry in lines(stream)] == ["first", "second"]
+
+
+def test_capacity_forces_flush(make_logger, stream):
+    """A full buffer should be written out without waiting for the invocation end"""
+    logger, _ = make_logger(capacity=2)
+
+    logger.info("first")
+    logger.info("second")
+
+    assert len(lines(stream)) == 2
+
+
+def test_output_includes_invocation_context_and_extra_fields(make_logger, stream):
+    """Records should carry the invocation context and their extra fields"""
+    logger, handler = make_logger()
+
+    with log_invocation(request_id="req-1"):
+        bind_log_context(task_id="task-1")
+        logger.info("Processing %s priority task", "high", extra={"priority": "high"})
+        handler.flush()
+
+    entry = lines(stream)[0]
+    assert entry["message"] == "Processing high priority task"
+    assert entry["request_id"] == "req-1"
+    assert entry["task_id"] == "task-1"
+    assert entry["priority"] == "high"
+    assert entry["level"] == "INFO"
+
+
+def test_sampled_out_records_never_evaluate_lazy_fields(make_logger, stream):
+    """Lazy fields should only be computed for records that are written"""
+    logger, handler = make_logger(sample_rates={logging.INFO: 0.1}, rng=lambda: 0.9)
+    calls = []
+
+    logger.info("sampled out", extra={"expensive": lazy(lambda: calls.append(1))})
+    handler.flush()
+
+    assert stream.getvalue() == ""
+    assert calls == []
+
+
+def test_lazy_fields_are_evaluated_when_kept(make_logger, stream):
+    """Kept records should contain the computed lazy value"""
+    logger, handler = make_logger()
+
+    logger.info("kept", extra={"expensive": lazy(lambda: {"total_ms": 1.5})})
+    handler.flush()
+
+    assert lines(stream)[0]["expensive"] == {"total_ms": 1.5}
+
+
+def test_error_keeps_whole_buffer(make_logger, stream):
+    """An error should keep every buffered record, including sampled ones"""
+    logger, handler = make_logger(sample_rates={logging.INFO: 0.0})
+
+    logger.info("context before failure")
+    logger.error("failure")
+    handler.flush()
+
+    assert [entry["message"] for entry in lines(stream)] == [
+        "context before failure",
+        "failure",
+    ]
+
+
+def test_warnings_and_errors_are_written_without_waiting_for_flush(make_logger, stream):
+    """Warnings and errors should survive an invocation that never finishes"""
+    logger, _ = make_logger(sample_rates={logging.INFO: 0.0})
+
+    logger.info("context before failure")
+    logger.warning("slow downstream")
+    assert [entry["message"] for entry in lines(stream)] == ["slow downstream"]
+
+    logger.error("failure")
+    assert [entry["message"] for entry in lines(stream)] == [
+        "slow downstream",
+        "context before failure",
+        "failure",
+    ]
+
+
+def test_invocations_have_separate_buffers(make_logger, stream):
+    """One invocation's flush or error should not write another's records"""
+    logger, handler = make_logger(sample_rates={logging.INFO: 0.0})
+    invocations = []
+    for request_id in ("req-a", "req-b"):
+        scope = log_invocation(request_id=request_id)
+        context = contextvars.copy_context()
+        context.run(scope.__enter__)
+        invocations.append((context, scope))
+    (first, _), (second, _) = invocations
+
+    first.run(logger.info, "sampled out")
+    second.run(logger.info, "kept for the failure")
+    second.run(logger.error, "failure")
+    first.run(handler.flush)
+
+    assert [(entry["request_id"], entry["message"]) for entry in lines(stream)] == [
+        ("req-b", "kept for the failure"),
+        ("req-b", "failure"),
+    ]
+    for context, scope in invocations:
+        context.run(scope.__exit__, None, None, None)
+
+
+def test_records_can_opt_out_of_sampling(make_logger, stream):
+    """Records flagged with sample=False should always be written"""
+    logger, handler = make_logger(sample_rates={logging.INFO: 0.0})
+
+    logger.info("metric", extra={"sample": False})
+    handler.flush()
+
+    entry = lines(stream)[0]
+    assert entry["message"] == "metric"
+    assert "sample" not in entry
+
+
+def test_parse_sample_rates():
+    """Sampling spec should map level names to clamped rates"""
+    assert parse_sample_rates("debug=0, INFO=0.25,WARNING=2") == {
+        logging.DEBUG: 0.0,
+        logging.INFO: 0.25,
+        logging.WARNING: 1.0,
+    }
+    assert parse_sample_rates(None) == {}
+
+    with pytest.raises(ValueError):
+        parse_sample_rates("LOUD=1")
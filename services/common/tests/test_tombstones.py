@@ -0,0 +1,61 @@
+"""Tombstone Store and Bloom Filter Tests"""
+
+import pytest
+
+from services.common.bloom import BloomFilter
+from services.common.tombstones.sqlite_store import SQLiteTombstoneStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteTombstoneStore(str(tmp_path / "tombstones.sqlite3"))
+
+
+# ===== TOMBSTONE STORE =====
+
+
+def test_add_is_idempotent(store):
+    """Adding a tombstone twice should store it once"""
+    store.add("task-1")
+    store.add("task-1")
+
+    assert store.contains("task-1")
+    assert not store.contains("task-2")
+    assert store.scan()[0] == ["task-1"]
+
+
+def test_scan_resumes_from_cursor(store):
+    """Scanning from a cursor should return only tombstones added after it"""
+    store.add_many(f"task-{i}" for i in range(5))
+
+    first, cursor = store.scan(limit=3)
+    rest, cursor = store.scan(after=cursor)
+    store.add("task-5")
+    new, _ = store.scan(after=cursor)
+
+    assert first == ["task-0", "task-1", "task-2"]
+    assert rest == ["task-3", "task-4"]
+    assert new == ["task-5"]
+
+
+# ===== BLOOM FILTER =====
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Every added item should be reported as present"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    bloom.update(f"task-{i}" for i in range(1000))
+
+    assert all(f"task-{i}" in bloom for i in range(1000))
+    assert len(bloom) == 1000
+
+
+def test_bloom_filter_false_positive_rate():
+    """At capacity, absent items should rarely be reported as present"""
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    bloom.update(f"task-{i}" for i in range(10_000))
+
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+
+    assert false_positives < 200
+    assert bloom.size_bytes < 10_000 * 10 // 8 + 1
@@ -0,0 +1,53 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Tuple
+
+
+class TombstoneStore(ABC):
+    """Base class for all stores of cancelled task IDs"""
+
+    @abstractmethod
+    def add(self, task_id: str) -> None:
+        """
+        Record that a task was cancelled. Adding an existing tombstone is a no-op.
+
+        Args:
+            task_id: Task identifier
+        """
+        pass
+
+    def add_many(self, task_ids: Iterable[str]) -> None:
+        """
+        Record several cancellations.
+
+        The default adds them one by one; stores should override this with
+        a single round trip.
+
+        Args:
+            task_ids: Task identifiers
+        """
+        for task_id in task_ids:
+            self.add(task_id)
+
+    @abstractmethod
+    def contains(self, task_id: str) -> bool:
+        """Return True if the task has a tombstone"""
+        pass
+
+    @abstractmethod
+    def scan(self, after: int = 0, limit: int = 10_000) -> Tuple[List[str], int]:
+        """
+        Read tombstones in the order they were added.
+
+        Args:
+            after: Cursor returned by the previous call; 0 starts from the beginning
+            limit: Maximum number of task IDs returned
+
+        Returns:
+            tuple: Task IDs added after the cursor, and the cursor to pass next
+        """
+        pass
+
+    @abstractmethod
+    def get_store_name(self) -> str:
+        """Return the name of this tombstone store"""
+        pass
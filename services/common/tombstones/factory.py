@@ -0,0 +1,18 @@
+import os
+from functools import lru_cache
+
+from .base import TombstoneStore
+from .sqlite_store import SQLiteTombstoneStore
+
+
+@lru_cache(maxsize=None)
+def get_tombstone_store() -> TombstoneStore:
+    """
+    Return the process-wide tombstone store selected by ``TOMBSTONE_STORE``.
+
+    The store is created once per process and reused across invocations.
+    """
+    store_type = os.environ.get("TOMBSTONE_STORE", "sqlite")
+    if store_type == "sqlite":
+        return SQLiteTombstoneStore()
+    raise RuntimeError(f"Unsupported TOMBSTONE_STORE: {store_type}")
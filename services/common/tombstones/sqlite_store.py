@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from .base import TombstoneStore
+
+DEFAULT_DB_PATH = "/tmp/tombstones.sqlite3"
+
+
+class SQLiteTombstoneStore(TombstoneStore):
+    """Local SQLite tombstone store, a stand-in for a shared database"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Open (and create if needed) the tombstone database.
+
+        Args:
+            db_path: Database file; defaults to ``TOMBSTONE_DB_PATH`` or /tmp
+        """
+        self.db_path = db_path or os.environ.get("TOMBSTONE_DB_PATH", DEFAULT_DB_PATH)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # seq orders tombstones for incremental scans
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tombstones (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT NOT NULL UNIQUE,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def add(self, task_id: str) -> None:
+        self.add_many([task_id])
+
+    def add_many(self, task_ids: Iterable[str]) -> None:
+        created_at = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tombstones (task_id, created_at) VALUES (?, ?)",
+                ((task_id, created_at) for task_id in task_ids),
+            )
+            self._conn.commit()
+
+    def contains(self, task_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM tombstones WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return row is not None
+
+    def scan(self, after: int = 0, limit: int = 10_000) -> Tuple[List[str], int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, task_id FROM tombstones WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after, limit),
+            ).fetchall()
+        if not rows:
+            return [], after
+        return [task_id for _, task_id in rows], rows[-1][0]
+
+    def get_store_name(self) -> str:
+        return "sqlite"
@@ -0,0 +1,190 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+MAGIC = b"TQA1"
+
+# Column kinds:
+# - "str": nullable UTF-8 strings; int32 byte lengths (-1 for null) + data
+# - "dict": nullable low-cardinality strings; uint16 codes into a value list
+#   kept in the header, 0 meaning null
+# - "f64": float64 values
+STR = "str"
+DICT = "dict"
+F64 = "f64"
+
+# Archived task row: the validated TaskPayload plus processing outcome
+SCHEMA: Tuple[Tuple[str, str], ...] = (
+    ("task_id", STR),
+    ("title", STR),
+    ("description", STR),
+    ("priority", DICT),
+    ("due_date", STR),
+    ("ordering_key", STR),  # Missing from chunks written before it was added
+    ("outcome", DICT),
+    ("error_class", DICT),
+    ("processed_at", F64),  # Unix epoch seconds
+    ("duration_ms", F64),  # Time spent in the pipeline
+    ("handler_ms", F64),  # Time spent in the handler
+)
+
+_HEADER_LENGTH = struct.Struct("<I")
+_MAX_DICT_VALUES = 0xFFFF
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _encode_str(values: Sequence[Optional[str]]) -> bytes:
+    lengths = array("i")
+    data = bytearray()
+    for value in values:
+        if value is None:
+            lengths.append(-1)
+        else:
+            encoded = value.encode()
+            lengths.append(len(encoded))
+            data += encoded
+    return _little_endian(lengths).tobytes() + bytes(data)
+
+
+def _decode_str(raw: bytes, rows: int) -> List[Optional[str]]:
+    lengths = array("i")
+    lengths.frombytes(raw[: rows * 4])
+    _little_endian(lengths)
+    data = memoryview(raw)[rows * 4 :]
+    values: List[Optional[str]] = []
+    offset = 0
+    for length in lengths:
+        if length < 0:
+            values.append(None)
+        else:
+            values.append(str(data[offset : offset + length], "utf-8"))
+            offset += length
+    return values
+
+
+def _encode_dict(values: Sequence[Optional[str]]) -> Tuple[bytes, List[str]]:
+    dictionary: Dict[str, int] = {}
+    codes = array("H")
+    for value in values:
+        if value is None:
+            codes.append(0)
+            continue
+        code = dictionary.get(value)
+        if code is None:
+            if len(dictionary) >= _MAX_DICT_VALUES:
+                raise ValueError("Too many distinct values for a dictionary column")
+            code = dictionary[value] = len(dictionary) + 1
+        codes.append(code)
+    return _little_endian(codes).tobytes(), list(dictionary)
+
+
+def _decode_dict(raw: bytes, dictionary: List[str]) -> List[Optional[str]]:
+    codes = array("H")
+    codes.frombytes(raw)
+    _little_endian(codes)
+    lookup: List[Optional[str]] = [None, *dictionary]
+    return [lookup[code] for code in codes]
+
+
+def _decode_f64(raw: bytes) -> List[float]:
+    values = array("d")
+    values.frombytes(raw)
+    return _little_endian(values).tolist()
+
+
+def encode(rows: Sequence[Dict[str, Any]], level: int = 6) -> bytes:
+    """
+    Encode task rows into one compressed columnar chunk.
+
+    Each column is stored contiguously and compressed on its own, so a scan
+    that needs a few columns only decompresses those.
+
+    Args:
+        rows: Rows with every ``SCHEMA`` field
+        level: zlib compression level
+
+    Returns:
+        bytes: Encoded chunk
+    """
+    columns = []
+    blobs = []
+    offset = 0
+    for name, kind in SCHEMA:
+        values = [row.get(name) for row in rows]
+        column: Dict[str, Any] = {"name": name, "kind": kind}
+        if kind == STR:
+            raw = _encode_str(values)
+        elif kind == DICT:
+            raw, column["values"] = _encode_dict(values)
+        else:
+            raw = _little_endian(array("d", values)).tobytes()
+        blob = zlib.compress(raw, level)
+        column.update(offset=offset, length=len(blob))
+        columns.append(column)
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = json.dumps({"rows": len(rows), "columns": columns}).encode()
+    return MAGIC + _HEADER_LENGTH.pack(len(header)) + header + b"".join(blobs)
+
+
+def decode(data: bytes, columns: Optional[Iterable[str]] = None) -> Dict[str, List[Any]]:
+    """
+    Decode a chunk into column lists.
+
+    Args:
+        data: Encoded chunk
+        columns: Columns to decode; all by default
+
+    Returns:
+        dict: Values per column name, all of equal length
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("Not a task archive chunk")
+    (header_length,) = _HEADER_LENGTH.unpack_from(data, 4)
+    body = 4 + _HEADER_LENGTH.size + header_length
+    header = json.loads(data[4 + _HEADER_LENGTH.size : body])
+    rows = header["rows"]
+    wanted = set(columns) if columns is not None else None
+
+    decoded: Dict[str, List[Any]] = {}
+    for column in header["columns"]:
+        name = column["name"]
+        if wanted is not None and name not in wanted:
+            continue
+        start = body + column["offset"]
+        raw = zlib.decompress(data[start : start + column["length"]])
+        if column["kind"] == STR:
+            decoded[name] = _decode_str(raw, rows)
+        elif column["kind"] == DICT:
+            decoded[name] = _decode_dict(raw, column["values"])
+        else:
+            decoded[name] = _decode_f64(raw)
+    return decoded
+
+
+def iter_rows(
+    data: bytes, columns: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Decode a chunk and yield it row by row.
+
+    Args:
+        data: Encoded chunk
+        columns: Columns to include; all by default
+
+    Yields:
+        dict: One row per archived task
+    """
+    decoded = decode(data, columns)
+    names = list(decoded)
+    for values in zip(*decoded.values()):
+        yield dict(zip(names, values))
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from services.common.blobstore import BlobStore
+
+from . import columnar
+from .writer import CHUNK_SUFFIX, DEFAULT_PREFIX, partition_prefix
+
+
+def scan(
+    store: BlobStore,
+    start: date,
+    end: date,
+    prefix: str = DEFAULT_PREFIX,
+    columns: Optional[Iterable[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream archived rows from the date partitions in ``[start, end]``.
+
+    Only one chunk is decoded at a time, and only the requested columns.
+
+    Args:
+        store: Blob store holding the archive
+        start: First partition date
+        end: Last partition date (inclusive)
+        prefix: Key prefix of the archive
+        columns: Columns to read; all by default
+
+    Yields:
+        dict: Archived rows, partition by partition in date order
+    """
+    columns = list(columns) if columns is not None else None
+    day = start
+    while day <= end:
+        for key in store.list(partition_prefix(prefix.rstrip("/"), day.isoformat())):
+            if key.endswith(CHUNK_SUFFIX):
+                yield from columnar.iter_rows(store.get(key), columns)
+        day += timedelta(days=1)
@@ -0,0 +1,142 @@
+"""
+Replay archived tasks into a queue.
+
+Streams rows from the task archive, optionally filtered by outcome and
+priority, and sends them in SendMessageBatch-sized batches to the queue the
+API sends to (``get_queue_provider()``, so sharding by ordering key
+applies). Tasks keep their ordering key. Original task IDs are kept by
+default, so tasks already recorded as succeeded are skipped by the
+processor; use ``--new-task-ids`` to process them again.
+
+Usage:
+    QUEUE_URL=https://sqs.../task-queue.fifo \\
+    python -m services.processor.archive.replay --from 2024-06-01 --to 2024-06-02 \\
+        --outcome failed
+"""
+
+import argparse
+import json
+import logging
+import uuid
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from services.api.services.queue.base import QueueProvider
+from services.api.services.queue.factory import get_queue_provider
+from services.common.blobstore import get_blob_store
+
+from .reader import scan
+from .writer import DEFAULT_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# Fields of the queue message, in the order the API writes them
+MESSAGE_FIELDS = ("title", "description", "priority", "due_date", "ordering_key")
+
+
+def to_message(row: Dict[str, Any], new_task_id: bool = False) -> Tuple[str, str]:
+    """
+    Rebuild the queue message for an archived task.
+
+    Args:
+        row: Archived row
+        new_task_id: Assign a fresh task ID instead of the original one
+
+    Returns:
+        tuple: ``(message_body, task_id)``
+    """
+    task_id = str(uuid.uuid4()) if new_task_id else row["task_id"]
+    # Rows archived before ordering keys were recorded have none
+    body = {"task_id": task_id, **{field: row.get(field) for field in MESSAGE_FIELDS}}
+    return json.dumps(body, separators=(",", ":")), task_id
+
+
+def replay(
+    rows: Iterable[Dict[str, Any]],
+    provider: QueueProvider,
+    batch_size: int = 10,
+    new_task_ids: bool = False,
+) -> Dict[str, int]:
+    """
+    Send archived tasks to a queue provider in batches, with their ordering keys.
+
+    Args:
+        rows: Archived rows, e.g. from ``scan``
+        provider: Destination queue
+        batch_size: Messages per send
+        new_task_ids: Assign fresh task IDs
+
+    Returns:
+        dict: ``sent`` and ``failed`` message counts
+    """
+    counts = {"sent": 0, "failed": 0}
+    batch: List[Tuple[str, str]] = []
+    ordering_keys: List[Optional[str]] = []
+
+    def send() -> None:
+        response = provider.send_message_batch(batch, ordering_keys=ordering_keys)
+        counts["sent"] += len(response["Successful"])
+        counts["failed"] += len(response["Failed"])
+        for entry in response["Failed"]:
+            logger.warning("Replay send failed", extra={"task_id": entry["Id"]})
+        batch.clear()
+        ordering_keys.clear()
+
+    for row in rows:
+        batch.append(to_message(row, new_task_ids))
+        ordering_keys.append(row.get("ordering_key"))
+        if len(batch) == batch_size:
+            send()
+    if batch:
+        send()
+    return counts
+
+
+def filter_rows(
+    rows: Iterable[Dict[str, Any]],
+    outcome: Optional[str] = None,
+    priority: Optional[str] = None,
+) -> Iterable[Dict[str, Any]]:
+    """Keep rows matching the given outcome and priority"""
+    for row in rows:
+        if outcome is not None and row["outcome"] != outcome:
+            continue
+        if priority is not None and row["priority"] != priority:
+            continue
+        yield row
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay archived tasks into a queue")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, required=True)
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, required=True)
+    parser.add_argument("--outcome", choices=["succeeded", "failed"])
+    parser.add_argument("--priority", choices=["low", "medium", "high"])
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--new-task-ids", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="Only count tasks")
+    args = parser.parse_args(argv)
+
+    rows = filter_rows(
+        scan(get_blob_store(), args.start, args.end, prefix=args.prefix),
+        outcome=args.outcome,
+        priority=args.priority,
+    )
+    if args.dry_run:
+        print(json.dumps({"tasks": sum(1 for _ in rows)}))
+        return
+
+    # Same provider as the API (QUEUE_PROVIDER, QUEUE_URL / QUEUE_URLS), so
+    # keyed tasks go back to their shard
+    provider = get_queue_provider()
+    counts = replay(
+        rows,
+        provider,
+        batch_size=provider.max_batch_size,
+        new_task_ids=args.new_task_ids,
+    )
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from services.common.blobstore import BlobStore, get_blob_store
+
+from . import columnar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFIX = "archive/tasks"
+CHUNK_SUFFIX = ".tqa"
+
+
+def archive_enabled() -> bool:
+    """Return True if processed tasks are archived (``TASK_ARCHIVE_ENABLED``)"""
+    return os.environ.get("TASK_ARCHIVE_ENABLED", "").lower() in ("1", "true")
+
+
+def partition_prefix(prefix: str, day: str) -> str:
+    """Return the key prefix of one date partition, e.g. ``.../date=2024-06-01/``"""
+    return f"{prefix}/date={day}/"
+
+
+class TaskArchiveWriter:
+    """
+    Buffers archived task rows and writes them as large columnar chunks.
+
+    Rows are kept in memory until ``max_rows`` are buffered or the oldest
+    row is ``max_age_seconds`` old, then written as one chunk per date
+    partition. Rows still buffered when the runtime is shut down are lost,
+    so the archive is meant for replay and analytics, not as a system of
+    record.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        prefix: str = DEFAULT_PREFIX,
+        max_rows: int = 10_000,
+        max_age_seconds: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            store: Blob store receiving the chunks
+            prefix: Key prefix of the archive
+            max_rows: Buffered rows that trigger a write
+            max_age_seconds: Age of the oldest buffered row that triggers a write
+            clock: Wall-clock time source, also used for ``processed_at``
+        """
+        self.store = store
+        self.prefix = prefix.rstrip("/")
+        self.max_rows = max_rows
+        self.max_age_seconds = max_age_seconds
+        self.clock = clock
+        self._rows: List[Dict[str, Any]] = []
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """
+        Buffer one row, writing the buffer out if it is full.
+
+        Args:
+            row: Task fields and outcome; ``processed_at`` defaults to now
+        """
+        now = self.clock()
+        row.setdefault("processed_at", now)
+        with self._lock:
+            self._rows.append(row)
+            if self._oldest is None:
+                self._oldest = now
+            full = len(self._rows) >= self.max_rows
+        if full:
+            self.flush()
+
+    def flush_if_due(self) -> None:
+        """Write the buffer out if its oldest row has reached ``max_age_seconds``"""
+        with self._lock:
+            due = (
+                self._oldest is not None
+                and self.clock() - self._oldest >= self.max_age_seconds
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> List[str]:
+        """
+        Write every buffered row, one chunk per date partition.
+
+        Returns:
+            list: Keys of the written chunks
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+            self._oldest = None
+        if not rows:
+            return []
+
+        partitions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            day = datetime.fromtimestamp(row["processed_at"], timezone.utc)
+            partitions[f"{day:%Y-%m-%d}"].append(row)
+
+        keys = []
+        for day, partition_rows in sorted(partitions.items()):
+            now = datetime.fromtimestamp(self.clock(), timezone.utc)
+            key = (
+                f"{partition_prefix(self.prefix, day)}"
+                f"{now:%H%M%S}-{uuid.uuid4().hex[:8]}{CHUNK_SUFFIX}"
+            )
+            self.store.put(key, columnar.encode(partition_rows))
+            keys.append(key)
+        logger.info(
+            "Task archive chunks written", extra={"keys": keys, "rows": len(rows)}
+        )
+        return keys
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+@lru_cache(maxsize=None)
+def get_archive_writer() -> TaskArchiveWriter:
+    """
+    Return the process-wide archive writer.
+
+    Configured by ``TASK_ARCHIVE_PREFIX``, ``TASK_ARCHIVE_MAX_ROWS`` and
+    ``TASK_ARCHIVE_MAX_AGE_SECONDS``; the buffer lives as long as the process.
+    """
+    return TaskArchiveWriter(
+        store=get_blob_store(),
+        prefix=os.environ.get("TASK_ARCHIVE_PREFIX", DEFAULT_PREFIX),
+        max_rows=int(os.environ.get("TASK_ARCHIVE_MAX_ROWS", "10000")),
+        max_age_seconds=float(os.environ.get("TASK_ARCHIVE_MAX_AGE_SECONDS", "300")),
+    )
@@ -0,0 +1,224 @@
+"""
+Long-running SQS consumer, for running the processor outside Lambda.
+
+Messages are pulled only while the adaptive concurrency limiter has free
+slots, and never more than it has free, so a slow or failing downstream
+slows down how fast messages leave the queue instead of piling them up in
+the worker. Message groups are processed concurrently, each in FIFO order.
+
+With several queues (the shards of a sharded task queue), one consumer per
+queue runs in its own thread, each with its own adaptive limit.
+
+Usage:
+    python -m services.processor.consumer --queue-url https://sqs.../task-queue.fifo
+    python -m services.processor.consumer --queue-url ...-0.fifo --queue-url ...-1.fifo
+"""
+
+import argparse
+import contextvars
+import logging
+import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+import boto3
+
+from services.common.signing import SIGNATURE_ATTRIBUTE
+from services.common.structured_logging import log_invocation
+from services.processor.handler import message_groups, process_record
+from services.processor.services.concurrency import (
+    AdaptiveConcurrencyLimiter,
+    get_concurrency_limiter,
+)
+from services.processor.services.pipeline.middleware import TRANSIENT, classify_error
+from services.processor.services.status_tracker import TaskStatusTracker
+
+logger = logging.getLogger(__name__)
+
+# ReceiveMessage limit
+SQS_MAX_MESSAGES = 10
+
+
+def to_record(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a ReceiveMessage message to the Lambda SQS record format"""
+    return {
+        "messageId": message["MessageId"],
+        "receiptHandle": message["ReceiptHandle"],
+        "body": message["Body"],
+        "attributes": message.get("Attributes", {}),
+        "messageAttributes": {
+            name: {"stringValue": value.get("StringValue"), "dataType": value["DataType"]}
+            for name, value in message.get("MessageAttributes", {}).items()
+        },
+    }
+
+
+class QueueConsumer:
+    """Pulls tasks from SQS as fast as the adaptive concurrency limit allows"""
+
+    def __init__(
+        self,
+        queue_url: Optional[str] = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        client: Any = None,
+        tracker: Optional[TaskStatusTracker] = None,
+        wait_time_seconds: int = 20,
+    ):
+        """
+        Initialize the consumer.
+
+        Args:
+            queue_url: Queue to consume; defaults to the QUEUE_URL environment variable
+            limiter: Concurrency limiter; defaults to the process-wide one
+                named after the queue
+            client: SQS client
+            tracker: Status tracker
+            wait_time_seconds: Long polling wait per receive
+        """
+        self.queue_url = queue_url or os.environ.get("QUEUE_URL")
+        if not self.queue_url:
+            raise RuntimeError("QUEUE_URL environment variable is not set")
+        self.limiter = limiter or get_concurrency_limiter(
+            self.queue_url.rsplit("/", 1)[-1]
+        )
+        self.client = client or boto3.client("sqs")
+        self.tracker = tracker or TaskStatusTracker()
+        self.wait_time_seconds = wait_time_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.limiter.max_limit)
+        self._stopped = threading.Event()
+
+    def poll_once(self) -> int:
+        """
+        Receive as many messages as there are free slots and start processing them.
+
+        Returns:
+            int: Number of messages received
+        """
+        reserved = 0
+        while reserved < SQS_MAX_MESSAGES and self.limiter.try_acquire():
+            reserved += 1
+        if not reserved:
+            return 0
+
+        try:
+            response = self.client.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=reserved,
+                WaitTimeSeconds=self.wait_time_seconds,
+                AttributeNames=["MessageGroupId", "ApproximateReceiveCount"],
+                MessageAttributeNames=[SIGNATURE_ATTRIBUTE],
+            )
+        except Exception:
+            for _ in range(reserved):
+                self.limiter.release()
+            raise
+
+        records = [to_record(message) for message in response.get("Messages", [])]
+        for _ in range(reserved - len(records)):
+            self.limiter.release()
+        for group in message_groups(records).values():
+            # Each group starts from a clean log context
+            self._executor.submit(
+                contextvars.copy_context().run, self._process_group, group
+            )
+        return len(records)
+
+    def run(self) -> None:
+        """Consume until ``stop`` is called, then wait for in-flight tasks"""
+        logger.info("Queue consumer started", extra={"queue_url": self.queue_url})
+        while not self._stopped.is_set():
+            self.limiter.publish_metrics()
+            if not self.limiter.wait_for_capacity(timeout=1.0):
+                continue
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Failed to receive messages")
+                self._stopped.wait(1.0)
+        self._executor.shutdown(wait=True)
+        logger.info("Queue consumer stopped")
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _process_group(self, records: List[Dict[str, Any]]) -> None:
+        for index, record in enumerate(records):
+            start = perf_counter()
+            try:
+                with log_invocation(request_id=record["messageId"]):
+                    ran = process_record(record, self.tracker)
+            except Exception as exc:
+                # Permanent failures say nothing about the downstream's load
+                if classify_error(exc) == TRANSIENT:
+                    self.limiter.release(perf_counter() - start, failed=True)
+                else:
+                    self.limiter.release()
+                # The rest of the group stays in flight and is redelivered after
+                # the failed message once the visibility timeout expires
+                for _ in records[index + 1 :]:
+                    self.limiter.release()
+                return
+            latency = perf_counter() - start if ran else None
+            self._delete(record)
+            self.limiter.release(latency)
+
+    def _delete(self, record: Dict[str, Any]) -> None:
+        # A message that cannot be deleted is redelivered and then skipped as
+        # a completed task
+        try:
+            self.client.delete_message(
+                QueueUrl=self.queue_url, ReceiptHandle=record["receiptHandle"]
+            )
+        except Exception:
+            logger.warning(
+                "Failed to delete message",
+                extra={"message_id": record["messageId"]},
+                exc_info=True,
+            )
+
+
+def run_consumers(consumers: List[QueueConsumer]) -> None:
+    """Run each consumer in its own thread until all of them have stopped"""
+    threads = [
+        threading.Thread(target=consumer.run, name=f"consumer-{index}")
+        for index, consumer in enumerate(consumers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Consume tasks from SQS queues")
+    parser.add_argument(
+        "--queue-url",
+        action="append",
+        dest="queue_urls",
+        help="Queue to consume, repeatable; defaults to QUEUE_URLS or QUEUE_URL",
+    )
+    args = parser.parse_args(argv)
+
+    queue_urls = args.queue_urls or [
+        url.strip() for url in os.environ.get("QUEUE_URLS", "").split(",") if url.strip()
+    ]
+    tracker = TaskStatusTracker()
+    consumers = [
+        QueueConsumer(queue_url=queue_url, tracker=tracker)
+        for queue_url in queue_urls or [None]
+    ]
+
+    def stop(*_: Any) -> None:
+        for consumer in consumers:
+            consumer.stop()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, stop)
+    run_consumers(consumers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,199 @@
+import contextvars
 import json
 import logging
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, List
 
+from services.common.profiling import invocation_timings, profiling_scope
+from services.common.signing import SIGNATURE_ATTRIBUTE, get_message_signer
+from services.common.structured_logging import (
+    bind_log_context,
+    configure_logging,
+    log_invocation,
+)
+from services.processor.archive.writer import archive_enabled, get_archive_writer
+from services.processor.schemas.task import VerifiedMessage
+from services.processor.services.cancellation import get_cancellation_index
+from services.processor.services.concurrency import (
+    AdaptiveConcurrencyLimiter,
+    get_concurrency_limiter,
+)
+from services.processor.services.pipeline.middleware import TRANSIENT, classify_error
+from services.processor.services.status_tracker import TaskStatusTracker
 from services.processor.services.task_processor import TaskProcessor
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+configure_logging()
 
 
 def handle(event: Dict[str, Any], context: Any) -> None:
     """
     Lambda entrypoint for SQS FIFO processing.
     """
-    # TODO: Add idempotency check (DB lookup)
-    # to prevent duplicate processing beyond SQS 5min window
-    for record in event.get("Records", []):
+    with (
+        log_invocation(request_id=getattr(context, "aws_request_id", None)),
+        profiling_scope("processor.handle"),
+        invocation_timings("processor.handle"),
+    ):
         try:
-            task = json.loads(record["body"])
-            TaskProcessor.process(task)
-        except Exception:
-            logger.exception("Task processing failed, triggering retry")
+            _handle_records(event.get("Records", []), TaskStatusTracker())
+        finally:
+            if archive_enabled():
+                _flush_archive()
+
+
+def _flush_archive() -> None:
+    # Archiving is best-effort and must not turn a processed batch into a retry
+    try:
+        get_archive_writer().flush_if_due()
+    except Exception:
+        logger.exception("Failed to write task archive")
+
+
+def _receive_count(record: Dict[str, Any]) -> int:
+    return int(record.get("attributes", {}).get("ApproximateReceiveCount", 1))
+
+
+def _handle_records(records: List[Dict[str, Any]], tracker: TaskStatusTracker) -> None:
+    # Cancelled tasks are skipped via their tombstones. Duplicate deliveries
+    # (beyond the SQS 5min dedup window, or copies sent to another queue by a
+    # hedged enqueue) lose the atomic claim in the status store
+    if TaskProcessor.get_pipeline().supports_batching:
+        task_ids: List[Any] = []
+        try:
+            tasks = [load_task(record) for record in records]
+            cancellations = get_cancellation_index()
+            tasks = [
+                task
+                for task in tasks
+                if not cancellations.is_cancelled(task.get("task_id"))
+            ]
+            claimed = tracker.claim(task.get("task_id") for task in tasks)
+            tasks = [
+                task
+                for task in tasks
+                if task.get("task_id") is None or task.get("task_id") in claimed
+            ]
+            task_ids = [task.get("task_id") for task in tasks]
+            bind_log_context(task_ids=task_ids)
+            TaskProcessor.process_batch(tasks)
+        except Exception as exc:
+            logger.exception("Batch processing failed, triggering retry")
+            tracker.failed(task_ids, exc, max(map(_receive_count, records), default=1))
             raise  # REQUIRED for SQS retry / DLQ
+        tracker.succeeded(task_ids)
+        return
+
+    groups = message_groups(records)
+    if len(groups) == 1:
+        for record in records:
+            process_record(record, tracker)
+        return
+
+    # FIFO order only holds within a message group: groups run concurrently,
+    # each in order, under the adaptive concurrency limit
+    limiter = get_concurrency_limiter()
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        futures = [
+            executor.submit(
+                contextvars.copy_context().run, _process_group, group, tracker, limiter
+            )
+            for group in groups.values()
+        ]
+    limiter.publish_metrics()
+    for future in futures:
+        future.result()  # REQUIRED for SQS retry / DLQ
+
+
+def message_groups(records: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Split SQS records by MessageGroupId, keeping their order within a group"""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        group_id = record.get("attributes", {}).get("MessageGroupId", "")
+        groups.setdefault(group_id, []).append(record)
+    return groups
+
+
+def _process_group(
+    records: List[Dict[str, Any]],
+    tracker: TaskStatusTracker,
+    limiter: AdaptiveConcurrencyLimiter,
+) -> None:
+    # Stops at the first failure; the rest of the group is retried with it.
+    # Only tasks that ran tell the limiter about the downstream
+    for record in records:
+        limiter.acquire()
+        start = perf_counter()
+        try:
+            ran = process_record(record, tracker)
+        except Exception as exc:
+            if classify_error(exc) == TRANSIENT:
+                limiter.release(perf_counter() - start, failed=True)
+            else:
+                limiter.release()
+            raise
+        limiter.release(perf_counter() - start if ran else None)
+
+
+def load_task(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decode the task in an SQS record.
+
+    If the record carries a valid signature from the API, the task is
+    returned as a VerifiedMessage, which the pipeline loads without
+    revalidating it. Unsigned or invalidly signed tasks are validated in full.
+
+    Args:
+        record: SQS record in the Lambda event format
+
+    Returns:
+        dict: Decoded task
+    """
+    body = record["body"]
+    task = json.loads(body)
+    signer = get_message_signer()
+    if signer is None:
+        return task
+    attribute = record.get("messageAttributes", {}).get(SIGNATURE_ATTRIBUTE)
+    if attribute is None:
+        return task
+    if not signer.verify(body, attribute.get("stringValue")):
+        logger.warning("Invalid task signature, validating in full")
+        return task
+    return VerifiedMessage(task)
+
+
+def process_record(record: Dict[str, Any], tracker: TaskStatusTracker) -> bool:
+    """
+    Process one SQS record, tracking its status.
+
+    Args:
+        record: SQS record in the Lambda event format
+        tracker: Status tracker
+
+    Returns:
+        bool: True if the task ran, False if it was skipped (cancelled,
+        already succeeded or in progress elsewhere)
+
+    Raises:
+        Exception: Processing failed; the message must be retried
+    """
+    task_id = None
+    try:
+        task = load_task(record)
+        task_id = task.get("task_id")
+        bind_log_context(task_id=task_id)
+        if get_cancellation_index().is_cancelled(task_id):
+            logger.info("Skipping cancelled task")
+            return False
+        if task_id and not tracker.claim([task_id]):
+            logger.info("Skipping task already succeeded, cancelled or in progress")
+            return False
+        TaskProcessor.process(task)
+    except Exception as exc:
+        logger.exception("Task processing failed, triggering retry")
+        tracker.failed([task_id], exc, _receive_count(record))
+        raise  # REQUIRED for SQS retry / DLQ
+    tracker.succeeded([task_id])
+    return True
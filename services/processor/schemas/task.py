@@ -1,4 +1,4 @@
-from typing import Literal, Optional
+from typing import Any, Dict, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -9,3 +9,52 @@ class TaskPayload(BaseModel):
     description: str = Field(min_length=1)
     priority: Literal["low", "medium", "high"]
     due_date: Optional[str] = None
+    ordering_key: Optional[str] = None
+
+
+class TaskRecord:
+    """Task loaded without validation from a message the API signed"""
+
+    __slots__ = (
+        "task_id",
+        "title",
+        "description",
+        "priority",
+        "due_date",
+        "ordering_key",
+    )
+
+    def __init__(
+        self,
+        task_id: str,
+        title: str,
+        description: str,
+        priority: str,
+        due_date: Optional[str] = None,
+        ordering_key: Optional[str] = None,
+    ):
+        self.task_id = task_id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.due_date = due_date
+        self.ordering_key = ordering_key
+
+    @classmethod
+    def from_message(cls, raw: Dict[str, Any]) -> "TaskRecord":
+        """Load the task fields, ignoring any the processor does not know"""
+        return cls(
+            raw["task_id"],
+            raw["title"],
+            raw["description"],
+            raw["priority"],
+            raw.get("due_date"),
+            raw.get("ordering_key"),
+        )
+
+
+class VerifiedMessage(dict):
+    """Decoded message body whose signature has been verified"""
+
+
+Task = Union[TaskPayload, TaskRecord]
@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Optional
+
+from services.common.bloom import BloomFilter
+from services.common.tombstones.base import TombstoneStore
+from services.common.tombstones.factory import get_tombstone_store
+
+logger = logging.getLogger(__name__)
+
+
+class CancellationIndex:
+    """
+    Answers "was this task cancelled?" without a store round trip per task.
+
+    A Bloom filter over every tombstone is kept in memory and refreshed from
+    the store at most once per ``refresh_seconds``, reading only the
+    tombstones added since the last refresh. A task the filter has never
+    seen was not cancelled (as of the last refresh); the rare hit, true or
+    false positive, is confirmed against the store.
+
+    A cancellation made less than ``refresh_seconds`` before the task is
+    picked up may be missed. Cancellation is best-effort: if the store
+    cannot be read, tasks run.
+    """
+
+    def __init__(
+        self,
+        store: TombstoneStore,
+        refresh_seconds: float = 5.0,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the index; the filter is loaded on first use.
+
+        Args:
+            store: Tombstone store
+            refresh_seconds: Minimum time between refreshes
+            capacity: Tombstones the filter is first sized for; it is rebuilt
+                at twice the size when full
+            error_rate: False positive rate of the filter at capacity
+            clock: Monotonic time source
+        """
+        self.store = store
+        self.refresh_seconds = refresh_seconds
+        self.error_rate = error_rate
+        self.clock = clock
+        self._filter = BloomFilter(capacity, error_rate)
+        self._cursor = 0
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of tombstones loaded"""
+        return len(self._filter)
+
+    def is_cancelled(self, task_id: Optional[str]) -> bool:
+        """
+        Return True if the task has a tombstone.
+
+        Args:
+            task_id: Task identifier
+        """
+        if task_id is None:
+            return False
+        self._refresh_if_due()
+        if task_id not in self._filter:
+            return False
+        try:
+            return self.store.contains(task_id)
+        except Exception:
+            logger.warning(
+                "Failed to read tombstone, processing task",
+                extra={"task_id": task_id},
+                exc_info=True,
+            )
+            return False
+
+    def refresh(self) -> None:
+        """Load the tombstones added since the last refresh"""
+        with self._lock:
+            self._refreshed_at = self.clock()
+            try:
+                self._load()
+            except Exception:
+                # Keep serving the filter as loaded so far
+                logger.warning("Failed to refresh tombstones", exc_info=True)
+
+    def _refresh_if_due(self) -> None:
+        refreshed_at = self._refreshed_at
+        if refreshed_at is None or self.clock() - refreshed_at >= self.refresh_seconds:
+            self.refresh()
+
+    def _load(self) -> None:
+        while True:
+            if len(self._filter) > self._filter.capacity:
+                self._rebuild(2 * len(self._filter))
+            task_ids, cursor = self.store.scan(after=self._cursor)
+            if not task_ids:
+                return
+            self._filter.update(task_ids)
+            self._cursor = cursor
+
+    def _rebuild(self, capacity: int) -> None:
+        # A Bloom filter cannot grow: load every tombstone into a larger one,
+        # and swap it in only once complete
+        bloom = BloomFilter(capacity, self.error_rate)
+        cursor = 0
+        while True:
+            task_ids, next_cursor = self.store.scan(after=cursor)
+            if not task_ids:
+                break
+            bloom.update(task_ids)
+            cursor = next_cursor
+        self._filter, self._cursor = bloom, cursor
+        logger.info(
+            "Rebuilt tombstone filter",
+            extra={"tombstones": len(bloom), "filter_bytes": bloom.size_bytes},
+        )
+
+
+@lru_cache(maxsize=None)
+def get_cancellation_index() -> CancellationIndex:
+    """
+    Return the process-wide cancellation index.
+
+    Configured by ``TOMBSTONE_REFRESH_SECONDS`` and ``TOMBSTONE_FILTER_CAPACITY``;
+    the filter lives as long as the process.
+    """
+    return CancellationIndex(
+        store=get_tombstone_store(),
+        refresh_seconds=float(os.environ.get("TOMBSTONE_REFRESH_SECONDS", "5")),
+        capacity=int(os.environ.get("TOMBSTONE_FILTER_CAPACITY", "1000000")),
+    )
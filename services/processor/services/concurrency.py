@@ -0,0 +1,246 @@
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Optional
+
+from services.common.metrics import put_metric
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits in-flight tasks, tuning the limit from observed latency and errors.
+
+    AIMD: every sample within ``latency_tolerance`` times the baseline
+    latency, taken while at least half the limit was in use, adds
+    ``1 / limit`` (about one slot per round trip). A slower sample or a
+    transient failure shrinks the limit at most once per round trip: by
+    ``backoff_ratio``, or in proportion to the latency overshoot if that is
+    larger, but never below ``min_backoff_ratio``.
+
+    The baseline is the lowest moving-average latency of successful tasks
+    over the last one to two ``baseline_window_seconds``. Averaging keeps a
+    single unusually fast task from dragging the target down, and the
+    window lets the baseline follow the downstream back up. If the
+    downstream gets slower for good, the limit backs off to ``min_limit``;
+    latency at the minimum concurrency is the new baseline, so the limiter
+    re-baselines there and grows the limit again.
+
+    Only tasks that actually ran should be recorded: skipped duplicates,
+    cancelled tasks and permanent failures finish in microseconds and say
+    nothing about the downstream.
+    """
+
+    def __init__(
+        self,
+        name: str = "processor",
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        min_backoff_ratio: float = 0.5,
+        smoothing: float = 0.2,
+        baseline_window_seconds: float = 60.0,
+        metrics_interval_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Limiter name used in logs and metric dimensions
+            initial_limit: Starting limit
+            min_limit: Lowest limit
+            max_limit: Highest limit
+            latency_tolerance: Latency, relative to the baseline, treated as overload
+            backoff_ratio: Factor applied to the limit on overload
+            min_backoff_ratio: Smallest factor applied on severe overload
+            smoothing: Weight of a new sample in the latency moving average
+            baseline_window_seconds: How long the lowest latency is remembered
+            metrics_interval_seconds: Minimum time between metric publications
+            clock: Monotonic time source
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.min_backoff_ratio = min_backoff_ratio
+        self.smoothing = smoothing
+        self.baseline_window_seconds = baseline_window_seconds
+        self.metrics_interval_seconds = metrics_interval_seconds
+        self.clock = clock
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._latency: Optional[float] = None
+        # Windowed minimum: lowest average latency this window and last
+        self._window_min: Optional[float] = None
+        self._previous_window_min: Optional[float] = None
+        self._window_started = clock()
+        self._last_backoff = float("-inf")
+        self._last_published = float("-inf")
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of tasks allowed in flight"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Moving average of task latency in seconds, None before any sample"""
+        return self._latency
+
+    @property
+    def baseline(self) -> Optional[float]:
+        """Lowest recent moving-average latency in seconds, None before any sample"""
+        mins = [m for m in (self._window_min, self._previous_window_min) if m is not None]
+        return min(mins) if mins else None
+
+    def available(self) -> int:
+        """Return how many more tasks may start now"""
+        with self._condition:
+            return max(self.limit - self._in_flight, 0)
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free; return False otherwise"""
+        with self._condition:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take a slot, waiting for one to become free.
+
+        Args:
+            timeout: Longest wait in seconds; None waits indefinitely
+
+        Returns:
+            bool: True if a slot was taken
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._in_flight < self.limit, timeout=timeout
+            ):
+                return False
+            self._in_flight += 1
+            return True
+
+    def wait_for_capacity(self, timeout: Optional[float] = None) -> bool:
+        """Wait until a slot is free without taking it"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._in_flight < self.limit, timeout=timeout
+            )
+
+    def release(self, latency: Optional[float] = None, failed: bool = False) -> None:
+        """
+        Give a slot back, recording the task's outcome.
+
+        Args:
+            latency: Processing time in seconds; None if the task never ran
+            failed: The task failed in a way that may indicate overload
+        """
+        with self._condition:
+            if latency is not None:
+                self._record(latency, failed)
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def publish_metrics(self, force: bool = False) -> None:
+        """
+        Emit the limit, in-flight count and latency as metrics.
+
+        Publishes at most once per ``metrics_interval_seconds`` unless forced.
+        """
+        now = self.clock()
+        if not force and now - self._last_published < self.metrics_interval_seconds:
+            return
+        self._last_published = now
+        dimensions = {"Limiter": self.name}
+        put_metric("ConcurrencyLimit", self.limit, dimensions=dimensions)
+        put_metric("ConcurrencyInFlight", self._in_flight, dimensions=dimensions)
+        if self._latency is not None:
+            put_metric(
+                "ProcessingLatency",
+                round(self._latency * 1000, 3),
+                unit="Milliseconds",
+                dimensions=dimensions,
+            )
+
+    def _record(self, latency: float, failed: bool) -> None:
+        if self._latency is None:
+            self._latency = latency
+        else:
+            self._latency += self.smoothing * (latency - self._latency)
+        if not failed:
+            self._update_baseline()
+        baseline = self.baseline
+        target = self.latency_tolerance * (baseline if baseline is not None else latency)
+        if latency > target:
+            self._back_off(
+                min(self.backoff_ratio, max(target / latency, self.min_backoff_ratio))
+            )
+        elif failed:
+            self._back_off(self.backoff_ratio)
+        elif self._in_flight * 2 >= self._limit:
+            self._limit = min(self._limit + 1 / self._limit, float(self.max_limit))
+
+    def _update_baseline(self) -> None:
+        now = self.clock()
+        if now - self._window_started >= self.baseline_window_seconds:
+            self._previous_window_min, self._window_min = self._window_min, None
+            self._window_started = now
+        if self._window_min is None or self._latency < self._window_min:
+            self._window_min = self._latency
+
+    def _back_off(self, ratio: float) -> None:
+        # Back off once per round trip: the other slow samples of the same
+        # round trip reflect the same overload
+        now = self.clock()
+        assert self._latency is not None
+        if now - self._last_backoff < self._latency:
+            return
+        self._last_backoff = now
+
+        if self.limit <= self.min_limit:
+            # Still slow at the lowest concurrency: the downstream itself got
+            # slower, so its current latency is the new baseline
+            self._window_min = self._previous_window_min = self._latency
+            logger.info(
+                "Concurrency limiter re-baselined",
+                extra={"limiter": self.name, "baseline_ms": self._latency * 1000},
+            )
+            return
+        self._limit = max(self._limit * ratio, float(self.min_limit))
+
+
+@lru_cache(maxsize=None)
+def get_concurrency_limiter(name: str = "processor") -> AdaptiveConcurrencyLimiter:
+    """
+    Return the process-wide limiter with the given name.
+
+    Configured by ``CONCURRENCY_INITIAL_LIMIT``, ``CONCURRENCY_MIN_LIMIT``,
+    ``CONCURRENCY_MAX_LIMIT`` and ``CONCURRENCY_LATENCY_TOLERANCE``; the
+    learned limit lives as long as the process.
+
+    Args:
+        name: Limiter name, e.g. one per consumed queue shard
+    """
+    return AdaptiveConcurrencyLimiter(
+        name=name,
+        initial_limit=int(os.environ.get("CONCURRENCY_INITIAL_LIMIT", "4")),
+        min_limit=int(os.environ.get("CONCURRENCY_MIN_LIMIT", "1")),
+        max_limit=int(os.environ.get("CONCURRENCY_MAX_LIMIT", "32")),
+        latency_tolerance=float(os.environ.get("CONCURRENCY_LATENCY_TOLERANCE", "2.0")),
+    )
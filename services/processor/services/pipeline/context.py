@@ -0,0 +1,47 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from services.common.profiling import record_timing
+from services.processor.schemas.task import Task
+
+
+class TaskContext:
+    """Per-task state carried through the processing pipeline"""
+
+    def __init__(self, raw: Dict[str, Any]):
+        """
+        Initialize the context for a single task.
+
+        Args:
+            raw: Task payload as decoded from the queue message
+        """
+        self.raw = raw
+        self.task: Optional[Task] = None
+        self.timings: Dict[str, float] = {}
+        self.error_class: Optional[str] = None
+        self.skipped = False
+        self.deferred = False
+        # Shared collector for batch-handler dispatch, set by TaskPipeline.run_batch
+        self.batch: Optional[List[Any]] = None
+        self._on_success: List[Callable[[], None]] = []
+
+    @property
+    def task_id(self) -> Optional[str]:
+        """Task ID, available even before the payload has been validated"""
+        if self.task is not None:
+            return self.task.task_id
+        return self.raw.get("task_id")
+
+    def record_timing(self, stage: str, seconds: float) -> None:
+        """Accumulate time spent in a pipeline stage"""
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        record_timing(stage, seconds)
+
+    def on_success(self, callback: Callable[[], None]) -> None:
+        """Register a callback to run once the handler has completed the task"""
+        self._on_success.append(callback)
+
+    def complete(self) -> None:
+        """Mark the task as handled and run the success callbacks"""
+        callbacks, self._on_success = self._on_success, []
+        for callback in callbacks:
+            callback()
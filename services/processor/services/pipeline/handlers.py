@@ -0,0 +1,102 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, get_args
+
+from services.processor.schemas.task import Task, TaskPayload
+
+from .context import TaskContext
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = get_args(TaskPayload.__annotations__["priority"])
+
+
+class TaskHandler(ABC):
+    """Base class for all task handlers"""
+
+    @abstractmethod
+    def handle(self, task: Task, context: TaskContext) -> None:
+        """
+        Perform the work for a single validated task.
+
+        Args:
+            task: Validated task; a TaskRecord if the message was signed
+            context: Pipeline context for the task
+        """
+        pass
+
+
+class BatchTaskHandler(TaskHandler):
+    """Handler that receives a whole batch at once to amortize downstream calls"""
+
+    @abstractmethod
+    def handle_batch(self, contexts: List[TaskContext]) -> None:
+        """
+        Perform the work for a batch of validated tasks.
+
+        Args:
+            contexts: Pipeline contexts, in arrival order, with ``task`` populated
+        """
+        pass
+
+    def handle(self, task: Task, context: TaskContext) -> None:
+        self.handle_batch([context])
+
+
+class LoggingTaskHandler(TaskHandler):
+    """Default handler: records that the task was processed"""
+
+    def handle(self, task: Task, context: TaskContext) -> None:
+        logger.info(
+            "Processing %s priority task",
+            task.priority,
+            extra={
+                "task_id": task.task_id,
+                "priority": task.priority,
+                "title": task.title,
+            },
+        )
+
+
+class HandlerRegistry:
+    """Registry mapping task priorities to handlers"""
+
+    def __init__(self, default: Optional[TaskHandler] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            default: Handler used for tasks without a dedicated handler
+        """
+        self.default = default or LoggingTaskHandler()
+        self._handlers: Dict[str, TaskHandler] = {}
+
+    def register(self, handler: TaskHandler, priority: Optional[str] = None) -> None:
+        """
+        Register a handler.
+
+        Args:
+            handler: Handler implementation
+            priority: Priority routed to this handler; ``None`` replaces the default
+        """
+        if priority is None:
+            self.default = handler
+        else:
+            self._handlers[priority] = handler
+
+    def build_lookup(self) -> Dict[str, TaskHandler]:
+        """
+        Build the dispatch table used on the hot path.
+
+        Returns:
+            dict: Handler for every priority, with the default filled in
+        """
+        return {
+            priority: self._handlers.get(priority, self.default)
+            for priority in PRIORITIES
+        }
+
+    def has_batch_handlers(self) -> bool:
+        """Return True if any registered handler accepts whole batches"""
+        handlers = [self.default, *self._handlers.values()]
+        return any(isinstance(handler, BatchTaskHandler) for handler in handlers)
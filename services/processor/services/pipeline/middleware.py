@@ -0,0 +1,198 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+from pydantic import ValidationError
+
+from services.common.structured_logging import lazy
+from services.processor.schemas.task import TaskPayload, TaskRecord, VerifiedMessage
+
+from .context import TaskContext
+
+logger = logging.getLogger(__name__)
+
+CallNext = Callable[[TaskContext], None]
+
+PERMANENT = "permanent"
+TRANSIENT = "transient"
+
+
+class PermanentTaskError(Exception):
+    """Raised by handlers for failures that retrying cannot fix"""
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    Classify a processing failure.
+
+    Args:
+        exc: Exception raised while processing a task
+
+    Returns:
+        str: ``"permanent"`` for poison messages, ``"transient"`` otherwise
+    """
+    if isinstance(exc, (PermanentTaskError, ValidationError, TypeError, KeyError)):
+        return PERMANENT
+    return TRANSIENT
+
+
+class Middleware(ABC):
+    """Base class for pipeline middleware"""
+
+    name = "middleware"
+
+    @abstractmethod
+    def __call__(self, context: TaskContext, call_next: CallNext) -> None:
+        """
+        Run this stage and hand the task on to the next one.
+
+        Args:
+            context: Pipeline context for the task
+            call_next: Remainder of the pipeline
+        """
+        pass
+
+
+class TimingMiddleware(Middleware):
+    """Log the per-stage timing breakdown of every handled task"""
+
+    name = "timing"
+
+    def __call__(self, context: TaskContext, call_next: CallNext) -> None:
+        call_next(context)
+        logger.debug(
+            "Task stage timings",
+            extra={
+                "task_id": context.task_id,
+                "timings_ms": lazy(
+                    lambda: {
+                        stage: round(seconds * 1000, 3)
+                        for stage, seconds in context.timings.items()
+                    }
+                ),
+            },
+        )
+
+
+class ErrorClassificationMiddleware(Middleware):
+    """Tag failures as permanent or transient before re-raising them"""
+
+    name = "error_classification"
+
+    def __call__(self, context: TaskContext, call_next: CallNext) -> None:
+        try:
+            call_next(context)
+        except Exception as exc:
+            context.error_class = classify_error(exc)
+            logger.warning(
+                "Task failed",
+                extra={"task_id": context.task_id, "error_class": context.error_class},
+            )
+            raise
+
+
+class ValidationMiddleware(Middleware):
+    """
+    Validate the raw message into a TaskPayload.
+
+    Messages whose signature the processor verified were validated by the
+    API already and are loaded into a TaskRecord instead.
+    """
+
+    name = "validation"
+
+    def __call__(self, context: TaskContext, call_next: CallNext) -> None:
+        raw = context.raw
+        if isinstance(raw, VerifiedMessage):
+            context.task = TaskRecord.from_message(raw)
+        else:
+            context.task = TaskPayload(**raw)
+        call_next(context)
+
+
+class IdempotencyMiddleware(Middleware):
+    """Skip tasks already handled by this worker"""
+
+    name = "idempotency"
+
+    def __init__(self, max_entries: int = 10_000):
+        """
+        Initialize the in-process record of completed tasks.
+
+        Args:
+            max_entries: Number of task IDs remembered before evicting the oldest
+        """
+        self.max_entries = max_entries
+        self._completed: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, context: TaskContext, call_next: CallNext) -> None:
+        task_id = context.task_id
+        if task_id in self._completed:
+            context.skipped = True
+            logger.info("Skipping already processed task", extra={"task_id": task_id})
+            return
+
+        context.on_success(lambda: self._remember(task_id))
+        call_next(context)
+
+    def _remember(self, task_id: str) -> None:
+        # Message groups may be processed concurrently
+        with self._lock:
+            self._completed[task_id] = None
+            if len(self._completed) > self.max_entries:
+                self._completed.popitem(last=False)
+
+
+class ArchiveMiddleware(Middleware):
+    """Append every validated task and its outcome to the task archive"""
+
+    name = "archive"
+
+    def __init__(self, writer: Any):
+        """
+        Initialize the middleware.
+
+        Args:
+            writer: TaskArchiveWriter receiving the rows
+        """
+        self.writer = writer
+
+    def __call__(self, context: TaskContext, call_next: CallNext) -> None:
+        try:
+            call_next(context)
+        except Exception:
+            if context.task is not None:
+                self._append(context, "failed")
+            raise
+        if context.deferred:
+            # Batch handlers complete the task later, after the whole batch ran
+            context.on_success(lambda: self._append(context, "succeeded"))
+        elif context.task is not None and not context.skipped:
+            self._append(context, "succeeded")
+
+    def _append(self, context: TaskContext, outcome: str) -> None:
+        # Archiving is best-effort; it must never change the task's outcome
+        try:
+            self.writer.append(self._row(context, outcome))
+        except Exception:
+            logger.exception("Failed to archive task", extra={"task_id": context.task_id})
+
+    @staticmethod
+    def _row(context: TaskContext, outcome: str) -> Dict[str, Any]:
+        task = context.task
+        assert task is not None
+        return {
+            "task_id": task.task_id,
+            "title": task.title,
+            "description": task.description,
+            "priority": task.priority,
+            "due_date": task.due_date,
+            "ordering_key": task.ordering_key,
+            "outcome": outcome,
+            "error_class": context.error_class,
+            "duration_ms": sum(context.timings.values()) * 1000,
+            "handler_ms": context.timings.get("handler", 0.0) * 1000,
+        }
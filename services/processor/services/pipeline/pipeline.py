@@ -0,0 +1,178 @@
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services.processor.archive.writer import archive_enabled, get_archive_writer
+
+from .context import TaskContext
+from .handlers import BatchTaskHandler, HandlerRegistry, TaskHandler
+from .middleware import (
+    ArchiveMiddleware,
+    CallNext,
+    ErrorClassificationMiddleware,
+    IdempotencyMiddleware,
+    Middleware,
+    TimingMiddleware,
+    ValidationMiddleware,
+    classify_error,
+)
+
+HANDLER_STAGE = "handler"
+
+
+class TaskPipeline:
+    """Middleware chain ending in a handler dispatched by task priority"""
+
+    def __init__(self, registry: HandlerRegistry, middleware: Sequence[Middleware]):
+        """
+        Build the pipeline.
+
+        The handler lookup table is built once here, so registering handlers
+        afterwards requires building a new pipeline.
+
+        Args:
+            registry: Handlers to dispatch to
+            middleware: Stages to run before dispatch, outermost first
+        """
+        self._lookup = registry.build_lookup()
+        self._default = registry.default
+        self.supports_batching = registry.has_batch_handlers()
+        self._chain = self._build_chain(middleware)
+
+    def run(self, task: Dict[str, Any]) -> TaskContext:
+        """
+        Process a single task.
+
+        Args:
+            task: Task payload as decoded from the queue message
+
+        Returns:
+            TaskContext: Outcome and per-stage timings for the task
+        """
+        context = TaskContext(task)
+        self._chain(context)
+        return context
+
+    def run_batch(self, tasks: Sequence[Dict[str, Any]]) -> List[TaskContext]:
+        """
+        Process a batch of tasks.
+
+        Tasks routed to a BatchTaskHandler are collected and handed over in a
+        single call per handler once every task has passed through the
+        middleware; other tasks are handled immediately, in order.
+
+        Args:
+            tasks: Task payloads as decoded from the queue messages
+
+        Returns:
+            list: One TaskContext per task, in input order
+        """
+        pending: List[Tuple[BatchTaskHandler, TaskContext]] = []
+        contexts = []
+        for task in tasks:
+            context = TaskContext(task)
+            context.batch = pending
+            contexts.append(context)
+            self._chain(context)
+
+        groups: Dict[int, Tuple[BatchTaskHandler, List[TaskContext]]] = {}
+        for handler, context in pending:
+            groups.setdefault(id(handler), (handler, []))[1].append(context)
+        for handler, group in groups.values():
+            self._flush(handler, group)
+
+        return contexts
+
+    def _build_chain(self, middleware: Sequence[Middleware]) -> CallNext:
+        call = self._timed(HANDLER_STAGE, self._dispatch)
+        for stage in reversed(middleware):
+            call = self._wrap(stage, call)
+        return call
+
+    @staticmethod
+    def _timed(name: str, call: CallNext) -> CallNext:
+        def stage(context: TaskContext) -> None:
+            start = perf_counter()
+            try:
+                call(context)
+            finally:
+                context.record_timing(name, perf_counter() - start)
+
+        return stage
+
+    @staticmethod
+    def _wrap(middleware: Middleware, call_next: CallNext) -> CallNext:
+        # Records time spent in the middleware itself, excluding inner stages
+        name = middleware.name
+
+        def stage(context: TaskContext) -> None:
+            inner = 0.0
+
+            def timed_next(ctx: TaskContext) -> None:
+                nonlocal inner
+                start_inner = perf_counter()
+                try:
+                    call_next(ctx)
+                finally:
+                    inner += perf_counter() - start_inner
+
+            start = perf_counter()
+            try:
+                middleware(context, timed_next)
+            finally:
+                context.record_timing(name, perf_counter() - start - inner)
+
+        return stage
+
+    def _dispatch(self, context: TaskContext) -> None:
+        task = context.task
+        assert task is not None, "ValidationMiddleware must run before dispatch"
+        handler: TaskHandler = self._lookup.get(task.priority, self._default)
+
+        if context.batch is not None and isinstance(handler, BatchTaskHandler):
+            context.deferred = True
+            context.batch.append((handler, context))
+            return
+
+        handler.handle(task, context)
+        context.complete()
+
+    @staticmethod
+    def _flush(handler: BatchTaskHandler, contexts: List[TaskContext]) -> None:
+        start = perf_counter()
+        try:
+            handler.handle_batch(contexts)
+        except Exception as exc:
+            error_class = classify_error(exc)
+            for context in contexts:
+                context.error_class = error_class
+            raise
+        finally:
+            # Amortize the batch call across its tasks
+            share = (perf_counter() - start) / len(contexts)
+            for context in contexts:
+                context.record_timing(HANDLER_STAGE, share)
+
+        for context in contexts:
+            context.complete()
+
+
+def build_default_pipeline(registry: Optional[HandlerRegistry] = None) -> TaskPipeline:
+    """
+    Build the standard processing pipeline.
+
+    Args:
+        registry: Handlers to dispatch to; defaults to the logging handler only
+
+    Returns:
+        TaskPipeline: Timing, error classification, validation and idempotency
+        stages, preceded by archiving if ``TASK_ARCHIVE_ENABLED`` is set
+    """
+    middleware: List[Middleware] = [
+        TimingMiddleware(),
+        ErrorClassificationMiddleware(),
+        ValidationMiddleware(),
+        IdempotencyMiddleware(),
+    ]
+    if archive_enabled():
+        middleware.insert(0, ArchiveMiddleware(get_archive_writer()))
+    return TaskPipeline(registry=registry or HandlerRegistry(), middleware=middleware)
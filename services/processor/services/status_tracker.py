@@ -0,0 +1,141 @@
+import logging
+import os
+import time
+from typing import Iterable, Optional, Set, Tuple
+
+from services.common.status.base import TaskStatus, TaskStatusStore
+from services.common.status.factory import get_status_store
+
+logger = logging.getLogger(__name__)
+
+# Statuses a delivery may claim a task from
+CLAIMABLE: Tuple[TaskStatus, ...] = ("queued", "failed", "dead_lettered")
+
+
+class TaskStatusTracker:
+    """Best-effort status reporting for tasks handled by the processor"""
+
+    def __init__(
+        self,
+        store: Optional[TaskStatusStore] = None,
+        max_receive_count: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            store: Status store; defaults to the process-wide store
+            max_receive_count: Deliveries after which SQS dead-letters a message;
+                defaults to ``MAX_RECEIVE_COUNT``
+            lease_seconds: Time after which a task still ``processing`` is
+                presumed abandoned and may be claimed again; defaults to
+                ``TASK_CLAIM_LEASE_SECONDS`` or 900 (the longest Lambda timeout)
+        """
+        self.store = store or get_status_store()
+        self.max_receive_count = max_receive_count or int(
+            os.environ.get("MAX_RECEIVE_COUNT", "5")
+        )
+        self.lease_seconds = (
+            lease_seconds
+            if lease_seconds is not None
+            else float(os.environ.get("TASK_CLAIM_LEASE_SECONDS", "900"))
+        )
+
+    def claim(self, task_ids: Iterable[Optional[str]]) -> Set[str]:
+        """
+        Atomically mark tasks ``processing``, returning the ones this delivery may run.
+
+        A task is claimed from ``queued``, ``failed`` or ``dead_lettered`` (a
+        retry or a DLQ redrive), or from ``processing`` older than
+        ``lease_seconds`` (an attempt that died without reporting back). Tasks
+        that succeeded, were cancelled or are being run by another delivery
+        (a redelivery after the SQS deduplication window, or a copy sent to
+        another queue by a hedged enqueue) are not claimed. Tasks unknown to
+        the store are recorded as queued first, so concurrent deliveries still
+        race on one record.
+
+        Only deliveries reading the same store are deduplicated. If the store
+        is unavailable, tasks are claimed: status is best-effort and never
+        drops a task.
+
+        Args:
+            task_ids: Tasks about to be processed
+
+        Returns:
+            set: IDs of the tasks claimed
+        """
+        claimed: Set[str] = set()
+        for task_id in task_ids:
+            if not task_id:
+                continue
+            try:
+                if self._claim(task_id):
+                    claimed.add(task_id)
+            except Exception:
+                logger.warning(
+                    "Failed to claim task, processing it",
+                    extra={"task_id": task_id},
+                    exc_info=True,
+                )
+                claimed.add(task_id)
+        return claimed
+
+    def succeeded(self, task_ids: Iterable[Optional[str]]) -> None:
+        """Record that the tasks were processed successfully"""
+        self._set(task_ids, "succeeded")
+
+    def failed(
+        self, task_ids: Iterable[Optional[str]], exc: BaseException, receive_count: int
+    ) -> None:
+        """
+        Record a processing failure.
+
+        Args:
+            task_ids: Tasks that failed
+            exc: Failure cause; only its type name is stored
+            receive_count: How many times SQS has delivered the message
+        """
+        status: TaskStatus = (
+            "dead_lettered" if receive_count >= self.max_receive_count else "failed"
+        )
+        self._set(task_ids, status, error=type(exc).__name__)
+
+    def _claim(self, task_id: str) -> bool:
+        store = self.store
+        if store.compare_and_set_status(task_id, CLAIMABLE, "processing"):
+            return True
+        # No-op unless the task is unknown (the API's queued write is best-effort)
+        status = store.set_status(task_id, "queued").status
+        if status == "queued":
+            return (
+                store.compare_and_set_status(task_id, CLAIMABLE, "processing") is not None
+            )
+        if status == "processing":
+            stale = store.compare_and_set_status(
+                task_id,
+                ("processing",),
+                "processing",
+                updated_before=time.time() - self.lease_seconds,
+            )
+            return stale is not None
+        return False
+
+    def _set(
+        self,
+        task_ids: Iterable[Optional[str]],
+        status: TaskStatus,
+        error: Optional[str] = None,
+    ) -> None:
+        for task_id in task_ids:
+            if not task_id:
+                continue
+            try:
+                self.store.set_status(task_id, status, error=error)
+            except Exception:
+                # Status is informational; never fail processing because of it
+                logger.warning(
+                    "Failed to record task status",
+                    extra={"task_id": task_id, "status": status},
+                    exc_info=True,
+                )
@@ -1,16 +1,36 @@
-import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence
 
-from services.processor.schemas.task import TaskPayload
-
-logger = logging.getLogger(__name__)
+from services.processor.services.pipeline.context import TaskContext
+from services.processor.services.pipeline.pipeline import (
+    TaskPipeline,
+    build_default_pipeline,
+)
 
 
 class TaskProcessor:
     """Service for processing tasks"""
 
+    _pipeline: Optional[TaskPipeline] = None
+
+    @classmethod
+    def configure(cls, pipeline: TaskPipeline) -> None:
+        """
+        Replace the pipeline used to process tasks.
+
+        Args:
+            pipeline: Pipeline with the handlers and middleware to use
+        """
+        cls._pipeline = pipeline
+
+    @classmethod
+    def get_pipeline(cls) -> TaskPipeline:
+        """Return the configured pipeline, building the default one on first use"""
+        if cls._pipeline is None:
+            cls._pipeline = build_default_pipeline()
+        return cls._pipeline
+
     @staticmethod
-    def process(task: Dict[str, Any]) -> None:
+    def process(task: Dict[str, Any]) -> TaskContext:
         """
         Process a single task.
 
@@ -18,14 +38,11 @@ class TaskProcessor:
         - No external side effects
         - Safe to retry
         """
-        # Validate task payload
-        validated_task = TaskPayload(**task)
-
-        logger.info(
-            f"Processing {validated_task.priority} priority task",
-            extra={
-                "task_id": validated_task.task_id,
-                "priority": validated_task.priority,
-                "title": validated_task.title,
-            },
-        )
+        return TaskProcessor.get_pipeline().run(task)
+
+    @staticmethod
+    def process_batch(tasks: Sequence[Dict[str, Any]]) -> List[TaskContext]:
+        """
+        Process a batch of tasks, handing batch-aware handlers the whole batch.
+        """
+        return TaskProcessor.get_pipeline().run_batch(tasks)
@@ -1,7 +1,47 @@
 import json
+import os
+from unittest.mock import patch
 
 import pytest
 
+from services.common.signing import get_message_signer
+from services.common.status.factory import get_status_store
+from services.common.tombstones.factory import get_tombstone_store
+from services.processor.services.cancellation import get_cancellation_index
+from services.processor.services.concurrency import get_concurrency_limiter
+
+
+@pytest.fixture(autouse=True)
+def status_store_path(tmp_path):
+    """Point the status store at a per-test database"""
+    db_path = str(tmp_path / "task-status.sqlite3")
+    get_status_store.cache_clear()
+    with patch.dict(os.environ, {"TASK_STATUS_DB_PATH": db_path}):
+        yield db_path
+    get_status_store.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def tombstone_store_path(tmp_path):
+    """Point the tombstone store at a per-test database and drop the loaded filter"""
+    db_path = str(tmp_path / "tombstones.sqlite3")
+    get_tombstone_store.cache_clear()
+    get_cancellation_index.cache_clear()
+    with patch.dict(os.environ, {"TOMBSTONE_DB_PATH": db_path}):
+        yield db_path
+    get_tombstone_store.cache_clear()
+    get_cancellation_index.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def process_state():
+    """Start every test with a fresh process-wide concurrency limiter and signer"""
+    get_concurrency_limiter.cache_clear()
+    get_message_signer.cache_clear()
+    yield
+    get_concurrency_limiter.cache_clear()
+    get_message_signer.cache_clear()
+
 
 @pytest.fixture
 def valid_task():
@@ -0,0 +1,334 @@
+"""Task Archive Tests - columnar chunks, writer, reader, middleware and replay"""
+
+from datetime import date, datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from services.common.blobstore import LocalBlobStore
+from services.processor.archive import columnar
+from services.processor.archive.reader import scan
+from services.processor.archive.replay import filter_rows, main, replay, to_message
+from services.processor.archive.writer import TaskArchiveWriter
+from services.processor.services.pipeline.handlers import HandlerRegistry, TaskHandler
+from services.processor.services.pipeline.middleware import (
+    ArchiveMiddleware,
+    ErrorClassificationMiddleware,
+    PermanentTaskError,
+    ValidationMiddleware,
+)
+from services.processor.services.pipeline.pipeline import TaskPipeline
+
+JUNE_1 = datetime(2024, 6, 1, 12, tzinfo=timezone.utc).timestamp()
+JUNE_2 = datetime(2024, 6, 2, 12, tzinfo=timezone.utc).timestamp()
+
+
+def make_row(task_id, **overrides):
+    row = {
+        "task_id": task_id,
+        "title": f"Task {task_id}",
+        "description": "Test",
+        "priority": "low",
+        "due_date": None,
+        "ordering_key": None,
+        "outcome": "succeeded",
+        "error_class": None,
+        "processed_at": JUNE_1,
+        "duration_ms": 1.5,
+        "handler_ms": 1.0,
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalBlobStore(root=str(tmp_path / "blobs"))
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+# ===== COLUMNAR ENCODING =====
+
+
+def test_columnar_roundtrip_keeps_nulls_and_unicode():
+    """Decoding a chunk should return exactly the encoded rows"""
+    rows = [
+        make_row("1"),
+        make_row("2", title="Tâche ✓", due_date="2030-01-01T00:00:00Z", priority="high"),
+        make_row("4", ordering_key="customer-42"),
+        make_row("3", outcome="failed", error_class="permanent", description=""),
+    ]
+
+    assert list(columnar.iter_rows(columnar.encode(rows))) == rows
+
+
+def test_columnar_projection_reads_only_requested_columns():
+    """Only the requested columns should be decoded"""
+    data = columnar.encode([make_row("1"), make_row("2", outcome="failed")])
+
+    assert columnar.decode(data, ["task_id", "outcome"]) == {
+        "task_id": ["1", "2"],
+        "outcome": ["succeeded", "failed"],
+    }
+
+
+def test_columnar_rejects_foreign_data():
+    """Data without the chunk magic should be rejected"""
+    with pytest.raises(ValueError):
+        columnar.decode(b'{"task_id": "1"}')
+
+
+# ===== WRITER AND READER =====
+
+
+def test_writer_flushes_when_full(store):
+    """Reaching max_rows should write the buffer as a chunk"""
+    writer = TaskArchiveWriter(store, max_rows=2, clock=Clock(JUNE_1))
+
+    writer.append(make_row("1"))
+    assert list(store.list()) == []
+
+    writer.append(make_row("2"))
+    assert len(writer) == 0
+    assert len(list(store.list("archive/tasks/date=2024-06-01/"))) == 1
+
+
+def test_writer_flushes_when_due(store):
+    """The buffer should be written once its oldest row reaches max_age_seconds"""
+    clock = Clock(JUNE_1)
+    writer = TaskArchiveWriter(store, max_age_seconds=60, clock=clock)
+    writer.append(make_row("1"))
+
+    clock.now += 59
+    writer.flush_if_due()
+    assert len(writer) == 1
+
+    clock.now += 1
+    writer.flush_if_due()
+    assert len(writer) == 0
+    assert len(list(store.list())) == 1
+
+
+def test_writer_partitions_by_date_and_reader_scans_range(store):
+    """Rows should land in their date partition and scans honour the range"""
+    writer = TaskArchiveWriter(store, clock=Clock(JUNE_2))
+    writer.append(make_row("1", processed_at=JUNE_1))
+    writer.append(make_row("2", processed_at=JUNE_2))
+    writer.append(make_row("3", processed_at=JUNE_2))
+
+    keys = writer.flush()
+
+    assert [key.split("/")[2] for key in keys] == ["date=2024-06-01", "date=2024-06-02"]
+    day_two = scan(store, date(2024, 6, 2), date(2024, 6, 2), columns=["task_id"])
+    assert list(day_two) == [{"task_id": "2"}, {"task_id": "3"}]
+    everything = scan(store, date(2024, 5, 31), date(2024, 6, 3))
+    assert [row["task_id"] for row in everything] == ["1", "2", "3"]
+
+
+# ===== ARCHIVE MIDDLEWARE =====
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.rows = []
+
+    def append(self, row):
+        self.rows.append(row)
+
+
+class FailingHandler(TaskHandler):
+    def handle(self, task, context):
+        raise PermanentTaskError("bad task")
+
+
+class NoopHandler(TaskHandler):
+    def handle(self, task, context):
+        pass
+
+
+def archive_pipeline(writer, handler):
+    return TaskPipeline(
+        registry=HandlerRegistry(default=handler),
+        middleware=[
+            ArchiveMiddleware(writer),
+            ErrorClassificationMiddleware(),
+            ValidationMiddleware(),
+        ],
+    )
+
+
+def test_archive_middleware_records_success():
+    """Processed tasks should be archived with their outcome and timings"""
+    writer = RecordingWriter()
+    task = make_row("1")
+
+    archive_pipeline(writer, NoopHandler()).run(
+        {field: task[field] for field in ("task_id", "title", "description", "priority")}
+    )
+
+    [row] = writer.rows
+    assert row["task_id"] == "1"
+    assert row["outcome"] == "succeeded"
+    assert row["error_class"] is None
+    assert row["duration_ms"] >= row["handler_ms"] >= 0
+
+
+def test_archive_middleware_records_ordering_key():
+    """The task's ordering key should be archived so replay can restore it"""
+    writer = RecordingWriter()
+
+    archive_pipeline(writer, NoopHandler()).run(
+        {
+            "task_id": "1",
+            "title": "Task",
+            "description": "Test",
+            "priority": "low",
+            "ordering_key": "customer-42",
+        }
+    )
+
+    assert writer.rows[0]["ordering_key"] == "customer-42"
+
+
+def test_archive_middleware_records_failure_and_reraises():
+    """Failed tasks should be archived with their error class and still fail"""
+    writer = RecordingWriter()
+
+    with pytest.raises(PermanentTaskError):
+        archive_pipeline(writer, FailingHandler()).run(
+            {"task_id": "1", "title": "Task", "description": "Test", "priority": "low"}
+        )
+
+    [row] = writer.rows
+    assert row["outcome"] == "failed"
+    assert row["error_class"] == "permanent"
+
+
+def test_archive_middleware_skips_invalid_tasks():
+    """Messages that never validated into a task should not be archived"""
+    writer = RecordingWriter()
+
+    with pytest.raises(Exception):
+        archive_pipeline(writer, NoopHandler()).run({"task_id": "1"})
+
+    assert writer.rows == []
+
+
+def test_archive_failures_do_not_fail_the_task():
+    """A broken archive should be logged, not change the task outcome"""
+
+    class BrokenWriter:
+        def append(self, row):
+            raise OSError("disk full")
+
+    archive_pipeline(BrokenWriter(), NoopHandler()).run(
+        {"task_id": "1", "title": "Task", "description": "Test", "priority": "low"}
+    )
+
+
+# ===== REPLAY =====
+
+
+class RecordingProvider:
+    max_batch_size = 10
+
+    def __init__(self):
+        self.batches = []
+        self.ordering_keys = []
+
+    def send_message_batch(self, entries, **kwargs):
+        self.batches.append(list(entries))
+        self.ordering_keys.append(list(kwargs["ordering_keys"]))
+        return {
+            "Successful": [
+                {"Id": task_id, "MessageId": task_id} for _, task_id in entries
+            ],
+            "Failed": [],
+        }
+
+
+def test_replay_sends_in_batches():
+    """Rows should be sent in batches of at most batch_size messages"""
+    provider = RecordingProvider()
+
+    counts = replay((make_row(str(i)) for i in range(23)), provider, batch_size=10)
+
+    assert counts == {"sent": 23, "failed": 0}
+    assert [len(batch) for batch in provider.batches] == [10, 10, 3]
+    assert provider.batches[0][0] == (
+        '{"task_id":"0","title":"Task 0","description":"Test",'
+        '"priority":"low","due_date":null,"ordering_key":null}',
+        "0",
+    )
+
+
+def test_replay_keeps_ordering_keys():
+    """Replayed tasks should keep their ordering key, in body and send"""
+    provider = RecordingProvider()
+    rows = [
+        make_row("1", ordering_key="a"),
+        make_row("2"),
+        make_row("3", ordering_key="a"),
+    ]
+
+    replay(rows, provider)
+
+    assert provider.ordering_keys == [["a", None, "a"]]
+    assert '"ordering_key":"a"' in provider.batches[0][0][0]
+
+
+def test_replay_of_rows_archived_without_ordering_key():
+    """Chunks written before the ordering_key column should replay without a key"""
+    row = make_row("1")
+    del row["ordering_key"]
+
+    body, _ = to_message(row)
+
+    assert body.endswith('"ordering_key":null}')
+
+
+def test_replay_sends_through_the_api_queue_provider(store):
+    """Replay should use the configured provider, so sharding applies"""
+    writer = TaskArchiveWriter(store, max_rows=100)
+    writer.append(make_row("1", ordering_key="a"))
+    writer.flush()
+    provider = RecordingProvider()
+
+    with (
+        patch("services.processor.archive.replay.get_blob_store", return_value=store),
+        patch(
+            "services.processor.archive.replay.get_queue_provider", return_value=provider
+        ),
+    ):
+        main(["--from", "2024-06-01", "--to", "2024-06-01"])
+
+    assert [task_id for _, task_id in provider.batches[0]] == ["1"]
+    assert provider.ordering_keys == [["a"]]
+
+
+def test_replay_can_assign_new_task_ids():
+    """New task IDs should replace the archived ones in body and deduplication ID"""
+    body, task_id = to_message(make_row("1"), new_task_id=True)
+
+    assert task_id != "1"
+    assert f'"task_id":"{task_id}"' in body
+
+
+def test_filter_rows_by_outcome_and_priority():
+    """Only rows matching both filters should be replayed"""
+    rows = [
+        make_row("1", outcome="failed", priority="high"),
+        make_row("2", outcome="failed"),
+        make_row("3", priority="high"),
+    ]
+
+    kept = filter_rows(rows, outcome="failed", priority="high")
+
+    assert [row["task_id"] for row in kept] == ["1"]
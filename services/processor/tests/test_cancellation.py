@@ -0,0 +1,130 @@
+"""Task Cancellation Tests - tombstone index and handler skip"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from services.common.status.factory import get_status_store
+from services.common.tombstones.factory import get_tombstone_store
+from services.common.tombstones.sqlite_store import SQLiteTombstoneStore
+from services.processor.handler import handle
+from services.processor.services.cancellation import CancellationIndex
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# ===== INDEX =====
+
+
+def test_index_refreshes_at_most_once_per_interval(tmp_path):
+    """New tombstones should be seen only after the refresh interval"""
+    store = SQLiteTombstoneStore(str(tmp_path / "tombstones.sqlite3"))
+    clock = Clock()
+    index = CancellationIndex(store, refresh_seconds=5, clock=clock)
+    store.add("task-1")
+
+    assert index.is_cancelled("task-1")
+
+    store.add("task-2")
+    clock.now = 4.9
+    assert not index.is_cancelled("task-2")
+
+    clock.now = 5.0
+    assert index.is_cancelled("task-2")
+    assert len(index) == 2
+
+
+def test_index_does_not_query_store_for_unknown_tasks(tmp_path):
+    """Tasks the filter has not seen should be answered from memory"""
+    store = SQLiteTombstoneStore(str(tmp_path / "tombstones.sqlite3"))
+    store.add_many(f"task-{i}" for i in range(100))
+    index = CancellationIndex(store, capacity=1000)
+    index.refresh()
+
+    with patch.object(store, "contains", wraps=store.contains) as contains:
+        cancelled = [index.is_cancelled(f"other-{i}") for i in range(100)]
+
+    assert not any(cancelled)
+    assert contains.call_count <= 2  # false positives only
+
+
+def test_index_grows_filter_when_full(tmp_path):
+    """More tombstones than the filter's capacity should trigger a larger rebuild"""
+    store = SQLiteTombstoneStore(str(tmp_path / "tombstones.sqlite3"))
+    store.add_many(f"task-{i}" for i in range(50))
+    index = CancellationIndex(store, refresh_seconds=0, capacity=10)
+
+    assert index.is_cancelled("task-49")
+
+    store.add_many(f"task-{i}" for i in range(50, 300))
+    assert index.is_cancelled("task-299")
+    assert len(index) == 300
+    assert all(index.is_cancelled(f"task-{i}") for i in range(300))
+
+
+def test_index_processes_tasks_when_store_is_unavailable():
+    """Cancellation is best-effort: store failures should not block processing"""
+    store = MagicMock()
+    store.scan.side_effect = Exception("store down")
+    index = CancellationIndex(store)
+
+    assert not index.is_cancelled("task-1")
+
+
+# ===== HANDLER =====
+
+
+def test_handler_skips_cancelled_task(sqs_event, valid_task):
+    """A task with a tombstone should not be processed or change status"""
+    get_status_store().set_status(valid_task["task_id"], "cancelled")
+    get_tombstone_store().add(valid_task["task_id"])
+
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process"
+    ) as process:
+        handle(sqs_event, None)
+
+    process.assert_not_called()
+    assert get_status_store().get(valid_task["task_id"]).status == "cancelled"
+
+
+def test_task_cancelled_before_its_tombstone_is_seen_does_not_run(sqs_event, valid_task):
+    """The status claim should catch a cancellation the filter has not picked up yet"""
+    get_status_store().set_status(valid_task["task_id"], "cancelled")
+
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process"
+    ) as process:
+        handle(sqs_event, None)
+
+    process.assert_not_called()
+    assert get_status_store().get(valid_task["task_id"]).status == "cancelled"
+
+
+def test_batching_handler_skips_cancelled_tasks():
+    """Batched pipelines should drop cancelled tasks from the batch"""
+    tasks = [
+        {"task_id": f"batch-cancel-{i}", "title": "Task", "description": "Test"}
+        for i in range(3)
+    ]
+    get_tombstone_store().add("batch-cancel-1")
+    pipeline = MagicMock(supports_batching=True)
+
+    with (
+        patch(
+            "services.processor.services.task_processor.TaskProcessor.get_pipeline",
+            return_value=pipeline,
+        ),
+        patch(
+            "services.processor.services.task_processor.TaskProcessor.process_batch"
+        ) as process_batch,
+    ):
+        handle({"Records": [{"body": json.dumps(task)} for task in tasks]}, None)
+
+    processed = [task["task_id"] for task in process_batch.call_args.args[0]]
+    assert processed == ["batch-cancel-0", "batch-cancel-2"]
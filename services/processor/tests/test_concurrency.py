@@ -0,0 +1,367 @@
+"""Adaptive Concurrency Tests - limiter, concurrent message groups and consumer"""
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.processor.consumer import QueueConsumer
+from services.processor.handler import handle
+from services.processor.services.concurrency import AdaptiveConcurrencyLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fill(limiter):
+    while limiter.try_acquire():
+        pass
+
+
+# ===== LIMITER =====
+
+
+def test_limiter_grants_slots_up_to_the_limit():
+    """Slots beyond the limit should be refused until one is released"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    assert limiter.available() == 0
+
+    limiter.release()
+    assert limiter.available() == 1
+
+
+def test_limiter_grows_while_latency_is_stable():
+    """Fast samples at full use should add about one slot per limit's worth"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, clock=Clock())
+
+    for _ in range(40):
+        fill(limiter)
+        limiter.release(0.010)
+
+    assert limiter.limit > 4
+
+
+def test_limiter_does_not_grow_when_underused():
+    """The limit should not grow while most of it sits idle"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, clock=Clock())
+
+    for _ in range(40):
+        limiter.try_acquire()
+        limiter.release(0.010)
+
+    assert limiter.limit == 8
+
+
+def test_limiter_backs_off_once_per_round_trip():
+    """Slow samples from the same round trip should only back off once"""
+    clock = Clock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, clock=clock)
+    fill(limiter)
+    limiter.release(0.010)
+
+    for _ in range(5):
+        limiter.release(0.025)
+    assert limiter.limit == 8
+
+    clock.now += 1.0
+    limiter.try_acquire()
+    limiter.release(0.025)
+    assert limiter.limit == 6
+
+
+def test_limiter_backs_off_harder_on_severe_overload():
+    """Latency far above the target should shrink the limit by up to half"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, clock=Clock())
+    fill(limiter)
+    limiter.release(0.010)
+
+    limiter.release(0.500)
+
+    assert limiter.limit == 5
+
+
+def test_limiter_backs_off_on_transient_failures():
+    """A failure that may indicate overload should reduce the limit"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, clock=Clock())
+    limiter.try_acquire()
+
+    limiter.release(0.010, failed=True)
+
+    assert limiter.limit == 9
+
+
+def test_limiter_rebaselines_when_slow_at_minimum():
+    """Latency that stays high at the minimum limit should become the baseline"""
+    clock = Clock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, clock=clock)
+    limiter.try_acquire()
+    limiter.release(0.010)
+
+    limits = []
+    for _ in range(20):
+        clock.now += 1.0
+        fill(limiter)
+        limiter.release(0.050)
+        limits.append(limiter.limit)
+        while limiter.in_flight:
+            limiter.release()
+
+    assert min(limits) == 1
+    assert limiter.limit > 1
+
+
+def test_one_very_fast_sample_does_not_collapse_the_limit():
+    """An outlier far below steady latency should not become the baseline"""
+    clock = Clock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=32, max_limit=32, clock=clock)
+    for _ in range(50):
+        clock.now += 0.05
+        fill(limiter)
+        limiter.release(0.050)
+        while limiter.in_flight:
+            limiter.release()
+
+    limiter.try_acquire()
+    limiter.release(0.00002)
+    for _ in range(20):
+        clock.now += 0.05
+        fill(limiter)
+        limiter.release(0.050)
+        while limiter.in_flight:
+            limiter.release()
+
+    assert limiter.limit == 32
+
+
+def test_baseline_follows_a_slower_downstream_after_its_window():
+    """The lowest latency should only be remembered for up to two windows"""
+    clock = Clock()
+    limiter = AdaptiveConcurrencyLimiter(baseline_window_seconds=10, clock=clock)
+    limiter.try_acquire()
+    limiter.release(0.010)
+
+    for _ in range(25):
+        clock.now += 1.0
+        limiter.try_acquire()
+        limiter.release(0.015)
+
+    assert limiter.baseline > 0.014
+
+
+def test_limiter_publishes_metrics_at_most_once_per_interval():
+    """Limit, in-flight count and latency should be emitted, rate-limited"""
+    clock = Clock()
+    limiter = AdaptiveConcurrencyLimiter(metrics_interval_seconds=60, clock=clock)
+    limiter.try_acquire()
+    limiter.release(0.012)
+
+    with patch("services.processor.services.concurrency.put_metric") as put_metric:
+        limiter.publish_metrics()
+        limiter.publish_metrics()
+
+    names = [call.args[0] for call in put_metric.call_args_list]
+    assert names == ["ConcurrencyLimit", "ConcurrencyInFlight", "ProcessingLatency"]
+    assert put_metric.call_args_list[2].args[1] == pytest.approx(12.0)
+
+
+# ===== CONVERGENCE =====
+
+
+class SyntheticDownstream:
+    """Downstream with fixed capacity: latency grows once it is exceeded"""
+
+    def __init__(self, capacity, latency):
+        self.capacity = capacity
+        self.latency = latency
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def call(self):
+        with self._lock:
+            self._active += 1
+            delay = self.latency * max(1.0, self._active / self.capacity)
+        time.sleep(delay)
+        with self._lock:
+            self._active -= 1
+
+
+def drive(limiter, downstream, stop, workers=24):
+    def worker():
+        while not stop.is_set():
+            if not limiter.acquire(timeout=0.1):
+                continue
+            start = time.perf_counter()
+            downstream.call()
+            limiter.release(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_limiter_converges_when_downstream_changes():
+    """The limit should settle near the downstream's capacity within seconds"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=20, max_limit=24)
+    downstream = SyntheticDownstream(capacity=4, latency=0.005)
+    stop = threading.Event()
+    threads = drive(limiter, downstream, stop)
+    try:
+        time.sleep(1.0)
+        assert 2 <= limiter.limit <= 10
+
+        # Slower downstream: back off, re-baseline, and recover
+        downstream.latency = 0.020
+        time.sleep(1.5)
+        assert 2 <= limiter.limit <= 10
+
+        # Capacity grows: the limit follows it up
+        downstream.capacity = 12
+        time.sleep(1.5)
+        assert limiter.limit >= 12
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+# ===== HANDLER AND CONSUMER =====
+
+
+def make_record(task_id, group_id):
+    task = {"task_id": task_id, "title": "Task", "description": "Test", "priority": "low"}
+    return {
+        "body": json.dumps(task),
+        "messageId": f"message-{task_id}",
+        "receiptHandle": f"receipt-{task_id}",
+        "attributes": {"MessageGroupId": group_id},
+    }
+
+
+def test_handler_processes_groups_concurrently_in_order():
+    """Message groups should run concurrently, each in FIFO order"""
+    records = [make_record(f"{group}-{i}", group) for i in range(3) for group in "ab"]
+    processed = []
+    both_started = threading.Barrier(2, timeout=2)
+
+    def process(task):
+        if task["task_id"].endswith("-0"):
+            both_started.wait()  # deadlocks unless the groups run concurrently
+        processed.append(task["task_id"])
+
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process",
+        side_effect=process,
+    ):
+        handle({"Records": records}, None)
+
+    assert [t for t in processed if t.startswith("a")] == ["a-0", "a-1", "a-2"]
+    assert [t for t in processed if t.startswith("b")] == ["b-0", "b-1", "b-2"]
+
+
+def test_handler_failed_group_stops_but_others_finish():
+    """A failure should stop its own group, finish the others, then raise"""
+    records = [make_record(f"{group}-{i}", group) for group in "ab" for i in range(2)]
+    processed = []
+
+    def process(task):
+        if task["task_id"] == "a-0":
+            raise RuntimeError("downstream failed")
+        processed.append(task["task_id"])
+
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process",
+        side_effect=process,
+    ):
+        with pytest.raises(RuntimeError):
+            handle({"Records": records}, None)
+
+    assert sorted(processed) == ["b-0", "b-1"]
+
+
+def test_skipped_tasks_are_not_latency_samples():
+    """Duplicates and cancelled tasks finish instantly and must not feed the limiter"""
+    from services.common.status.factory import get_status_store
+    from services.processor.services.concurrency import get_concurrency_limiter
+
+    records = [make_record(f"{group}-0", group) for group in "ab"]
+    for record in records:
+        get_status_store().set_status(json.loads(record["body"])["task_id"], "succeeded")
+
+    handle({"Records": records}, None)
+
+    assert get_concurrency_limiter().latency is None
+
+
+def to_message(record):
+    return {
+        "MessageId": record["messageId"],
+        "ReceiptHandle": record["receiptHandle"],
+        "Body": record["body"],
+        "Attributes": record["attributes"],
+    }
+
+
+def test_consumer_pulls_only_free_slots():
+    """ReceiveMessage should ask for no more messages than there are free slots"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=3)
+    limiter.try_acquire()
+    client = MagicMock()
+    client.receive_message.return_value = {"Messages": []}
+    consumer = QueueConsumer(queue_url="http://queue", limiter=limiter, client=client)
+
+    assert consumer.poll_once() == 0
+    assert client.receive_message.call_args.kwargs["MaxNumberOfMessages"] == 2
+    assert limiter.in_flight == 1
+
+    fill(limiter)
+    client.receive_message.reset_mock()
+    assert consumer.poll_once() == 0
+    client.receive_message.assert_not_called()
+
+
+def test_consumer_deletes_processed_messages_and_leaves_failed_group():
+    """Processed messages should be deleted; a failure leaves the rest of its group"""
+    records = [make_record("a-0", "a"), make_record("a-1", "a"), make_record("b-0", "b")]
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10)
+    client = MagicMock()
+    client.receive_message.return_value = {"Messages": [to_message(r) for r in records]}
+    consumer = QueueConsumer(queue_url="http://queue", limiter=limiter, client=client)
+
+    def process(task):
+        if task["task_id"] == "a-0":
+            raise RuntimeError("downstream failed")
+
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process",
+        side_effect=process,
+    ):
+        assert consumer.poll_once() == 3
+        consumer.stop()
+        consumer.run()  # waits for in-flight groups
+
+    deleted = [c.kwargs["ReceiptHandle"] for c in client.delete_message.call_args_list]
+    assert deleted == ["receipt-b-0"]
+    assert limiter.in_flight == 0
+
+
+def test_consumers_of_different_shards_have_their_own_limiters():
+    """Each queue shard should adapt its own limit, one shared within a shard"""
+    shard_0 = QueueConsumer(queue_url="http://sqs/q-0.fifo", client=MagicMock())
+    shard_1 = QueueConsumer(queue_url="http://sqs/q-1.fifo", client=MagicMock())
+    again = QueueConsumer(queue_url="http://sqs/q-0.fifo", client=MagicMock())
+
+    assert shard_0.limiter is not shard_1.limiter
+    assert shard_0.limiter is again.limiter
+    assert shard_1.limiter.name == "q-1.fifo"
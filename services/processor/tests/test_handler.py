@@ -1,10 +1,22 @@
 """Processor Lambda Handler Tests"""
 
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import pytest
+from pydantic import ValidationError
 
-from services.processor.handler import handle
+from services.common.signing import MessageSigner, parse_keys
+from services.common.status.factory import get_status_store
+from services.processor.handler import handle, load_task
+from services.processor.schemas.task import TaskRecord, VerifiedMessage
+from services.processor.services.pipeline.handlers import HandlerRegistry, TaskHandler
+from services.processor.services.pipeline.pipeline import build_default_pipeline
+from services.processor.services.status_tracker import TaskStatusTracker
 
 
 def test_handler_success(sqs_event):
@@ -49,3 +61,190 @@ def test_multiple_records_processed_in_order(multiple_records_event):
         handle(multiple_records_event, None)
 
     assert calls == ["1", "2"]
+
+
+def test_handler_records_succeeded_status(sqs_event, valid_task):
+    """Successfully processed tasks should be reported as succeeded"""
+    handle(sqs_event, None)
+
+    assert get_status_store().get(valid_task["task_id"]).status == "succeeded"
+
+
+def test_handler_records_failed_status(sqs_event, valid_task):
+    """Failed tasks should be reported as failed with the error type"""
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process",
+        side_effect=RuntimeError("Processing failed"),
+    ):
+        with pytest.raises(RuntimeError):
+            handle(sqs_event, None)
+
+    record = get_status_store().get(valid_task["task_id"])
+    assert record.status == "failed"
+    assert record.error == "RuntimeError"
+
+
+def test_handler_records_dead_lettered_status(sqs_event, valid_task):
+    """A failure on the last allowed delivery should be reported as dead-lettered"""
+    sqs_event["Records"][0]["attributes"] = {"ApproximateReceiveCount": "5"}
+
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process",
+        side_effect=RuntimeError("Processing failed"),
+    ):
+        with pytest.raises(RuntimeError):
+            handle(sqs_event, None)
+
+    assert get_status_store().get(valid_task["task_id"]).status == "dead_lettered"
+
+
+def test_handler_skips_already_completed_task(sqs_event, valid_task):
+    """Duplicate deliveries of a succeeded task should not be processed again"""
+    get_status_store().set_status(valid_task["task_id"], "succeeded")
+
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process"
+    ) as process:
+        handle(sqs_event, None)
+
+    process.assert_not_called()
+
+
+def test_handler_skips_task_in_progress_elsewhere(sqs_event, valid_task):
+    """A copy of a task another delivery is processing should not run again"""
+    get_status_store().set_status(valid_task["task_id"], "processing")
+
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process"
+    ) as process:
+        handle(sqs_event, None)
+
+    process.assert_not_called()
+
+
+def test_handler_retries_failed_task(sqs_event, valid_task):
+    """A redelivery after a failed attempt should run the task again"""
+    get_status_store().set_status(valid_task["task_id"], "failed")
+
+    handle(sqs_event, None)
+
+    assert get_status_store().get(valid_task["task_id"]).status == "succeeded"
+
+
+def test_only_one_concurrent_delivery_claims_a_task():
+    """Deliveries racing for the same task should claim it exactly once"""
+    store = get_status_store()
+    store.set_status("task-1", "queued")
+    barrier = threading.Barrier(8)
+
+    def claim(_):
+        barrier.wait()
+        return TaskStatusTracker(store=store).claim(["task-1"])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        claims = list(executor.map(claim, range(8)))
+
+    assert sum(len(claimed) for claimed in claims) == 1
+    assert store.get("task-1").status == "processing"
+
+
+def test_abandoned_claim_expires_after_lease():
+    """A task left processing by a dead attempt should be claimable after the lease"""
+    store = get_status_store()
+    store.set_status("task-1", "processing")
+    time.sleep(0.01)
+
+    assert TaskStatusTracker(store=store, lease_seconds=60).claim(["task-1"]) == set()
+    assert TaskStatusTracker(store=store, lease_seconds=0).claim(["task-1"]) == {"task-1"}
+
+
+def test_unknown_task_is_claimed_once():
+    """A task the store has never seen should be claimable, but only once"""
+    tracker = TaskStatusTracker(store=get_status_store())
+
+    assert tracker.claim(["task-1", None]) == {"task-1"}
+    assert tracker.claim(["task-1"]) == set()
+
+
+def test_handler_writes_profile_when_sampled(valid_task, tmp_path, caplog):
+    """A sampled invocation should write a profile with per-stage timings"""
+    from services.common.blobstore import get_blob_store
+
+    # A fresh task ID, so the pipeline's idempotency stage does not skip it
+    task = {**valid_task, "task_id": "9f0c2a4e-7b1d-4c3e-8a5f-6d2b1e0c9a7f"}
+    sqs_event = {"Records": [{"body": json.dumps(task), "messageId": "m-1"}]}
+
+    env = {
+        "PROFILE_MODE": "cprofile",
+        "PROFILE_SAMPLE_RATE": "1",
+        "BLOB_STORE_ROOT": str(tmp_path / "blobs"),
+    }
+    get_blob_store.cache_clear()
+    with patch.dict(os.environ, env), caplog.at_level("INFO"):
+        handle(sqs_event, None)
+        keys = list(get_blob_store().list("profiles/processor.handle/"))
+    get_blob_store.cache_clear()
+
+    assert len(keys) == 1
+    written = [r for r in caplog.records if r.getMessage() == "Profile written"]
+    assert {"validation", "handler"} <= set(written[0].timings_ms)
+
+
+def signed_record(task, keys="v1:secret", body=None):
+    signer = MessageSigner(parse_keys(keys))
+    signature = signer.sign(json.dumps(task))
+    return {
+        "body": body or json.dumps(task),
+        "messageId": "m-1",
+        "messageAttributes": {
+            "TaskSignature": {"stringValue": signature, "dataType": "String"}
+        },
+    }
+
+
+class RecordingHandler(TaskHandler):
+    def __init__(self):
+        self.tasks = []
+
+    def handle(self, task, context):
+        self.tasks.append(task)
+
+
+def test_signed_task_skips_full_validation(valid_task):
+    """A task signed by the API should be loaded into a TaskRecord"""
+    handler = RecordingHandler()
+    pipeline = build_default_pipeline(HandlerRegistry(default=handler))
+
+    with patch.dict(os.environ, {"TASK_SIGNING_KEYS": "v1:secret"}):
+        pipeline.run(load_task(signed_record(valid_task)))
+
+    [task] = handler.tasks
+    assert isinstance(task, TaskRecord)
+    assert (task.task_id, task.priority) == (valid_task["task_id"], "high")
+
+
+def test_invalid_signature_falls_back_to_full_validation(valid_task):
+    """A tampered or unsigned task should be validated as before"""
+    tampered = json.dumps({**valid_task, "priority": "urgent"})
+    pipeline = build_default_pipeline(HandlerRegistry(default=RecordingHandler()))
+
+    with patch.dict(os.environ, {"TASK_SIGNING_KEYS": "v1:secret"}):
+        task = load_task(signed_record(valid_task, body=tampered))
+        unsigned = load_task({"body": json.dumps(valid_task)})
+        wrong_key = load_task(signed_record(valid_task, keys="v1:other"))
+
+    assert not isinstance(task, VerifiedMessage)
+    assert not isinstance(unsigned, VerifiedMessage)
+    assert not isinstance(wrong_key, VerifiedMessage)
+    with pytest.raises(ValidationError):
+        pipeline.run(task)
+
+
+def test_signed_tasks_are_processed_end_to_end(valid_task):
+    """The handler should process signed records through the fast path"""
+    task = {**valid_task, "task_id": "5d9e3f1a-2c4b-4e6d-9f8a-7b1c0d2e3f4a"}
+    with patch.dict(os.environ, {"TASK_SIGNING_KEYS": "v1:secret"}):
+        handle({"Records": [signed_record(task)]}, None)
+
+    record = get_status_store().get(task["task_id"])
+    assert record.status == "succeeded"
@@ -0,0 +1,145 @@
+"""Processor Pipeline Tests - handler registry and middleware"""
+
+import pytest
+
+from services.processor.services.pipeline.context import TaskContext
+from services.processor.services.pipeline.handlers import (
+    BatchTaskHandler,
+    HandlerRegistry,
+    TaskHandler,
+)
+from services.processor.services.pipeline.middleware import (
+    ErrorClassificationMiddleware,
+    PermanentTaskError,
+    classify_error,
+)
+from services.processor.services.pipeline.pipeline import build_default_pipeline
+
+
+class RecordingHandler(TaskHandler):
+    def __init__(self):
+        self.task_ids = []
+
+    def handle(self, task, context):
+        self.task_ids.append(task.task_id)
+
+
+class RecordingBatchHandler(BatchTaskHandler):
+    def __init__(self):
+        self.batches = []
+
+    def handle_batch(self, contexts):
+        self.batches.append([context.task.task_id for context in contexts])
+
+
+class FailingHandler(TaskHandler):
+    def __init__(self, exc):
+        self.exc = exc
+
+    def handle(self, task, context):
+        raise self.exc
+
+
+def make_task(task_id, priority="low"):
+    return {
+        "task_id": task_id,
+        "title": f"Task {task_id}",
+        "description": "Test",
+        "priority": priority,
+    }
+
+
+def test_dispatch_by_priority():
+    """Tasks should be routed to the handler registered for their priority"""
+    high, default = RecordingHandler(), RecordingHandler()
+    registry = HandlerRegistry(default=default)
+    registry.register(high, priority="high")
+    pipeline = build_default_pipeline(registry)
+
+    pipeline.run(make_task("1", "high"))
+    pipeline.run(make_task("2", "low"))
+
+    assert high.task_ids == ["1"]
+    assert default.task_ids == ["2"]
+
+
+def test_each_stage_records_timing():
+    """Every middleware stage and the handler should report their own timing"""
+    pipeline = build_default_pipeline(HandlerRegistry(default=RecordingHandler()))
+
+    context = pipeline.run(make_task("1"))
+
+    assert set(context.timings) == {
+        "timing",
+        "error_classification",
+        "validation",
+        "idempotency",
+        "handler",
+    }
+    assert all(seconds >= 0 for seconds in context.timings.values())
+
+
+def test_idempotency_skips_completed_task():
+    """A task already handled by this pipeline should not be handled again"""
+    handler = RecordingHandler()
+    pipeline = build_default_pipeline(HandlerRegistry(default=handler))
+
+    pipeline.run(make_task("1"))
+    context = pipeline.run(make_task("1"))
+
+    assert context.skipped
+    assert handler.task_ids == ["1"]
+
+
+def test_failed_task_is_not_remembered_as_completed():
+    """A failed task must be retried, not skipped, on redelivery"""
+    registry = HandlerRegistry(default=FailingHandler(RuntimeError("downstream")))
+    pipeline = build_default_pipeline(registry)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            pipeline.run(make_task("1"))
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (RuntimeError("downstream timeout"), "transient"),
+        (PermanentTaskError("unsupported task"), "permanent"),
+    ],
+)
+def test_error_classification(exc, expected):
+    """Handler failures should be classified and re-raised"""
+    context = TaskContext(make_task("1"))
+
+    def fail(ctx):
+        raise exc
+
+    with pytest.raises(type(exc)):
+        ErrorClassificationMiddleware()(context, fail)
+
+    assert context.error_class == expected
+
+
+def test_validation_error_is_permanent():
+    """Invalid payloads should be classified as permanent failures"""
+    pipeline = build_default_pipeline(HandlerRegistry(default=RecordingHandler()))
+
+    with pytest.raises(Exception) as exc_info:
+        pipeline.run({"task_id": "1", "priority": "low"})
+
+    assert "field required" in str(exc_info.value)
+    assert classify_error(exc_info.value) == "permanent"
+
+
+def test_batch_handler_receives_whole_batch():
+    """Batch-aware handlers should get every task of a batch in a single call"""
+    batch_handler = RecordingBatchHandler()
+    registry = HandlerRegistry(default=batch_handler)
+    pipeline = build_default_pipeline(registry)
+
+    contexts = pipeline.run_batch([make_task(str(i)) for i in range(3)])
+
+    assert pipeline.supports_batching
+    assert batch_handler.batches == [["0", "1", "2"]]
+    assert all(context.deferred and "handler" in context.timings for context in contexts)
@@ -24,6 +24,54 @@ def aws_credentials():
             os.environ.pop(key, None)
 
 
+@pytest.fixture(autouse=True)
+def status_store(tmp_path):
+    """Per-test task status database shared by the API and the processor."""
+    from services.common.status.factory import get_status_store
+
+    os.environ["TASK_STATUS_DB_PATH"] = str(tmp_path / "task-status.sqlite3")
+    get_status_store.cache_clear()
+
+    yield get_status_store()
+
+    get_status_store.cache_clear()
+    os.environ.pop("TASK_STATUS_DB_PATH", None)
+
+
+@pytest.fixture(autouse=True)
+def idempotency_store(tmp_path):
+    """Per-test idempotency key database."""
+    from services.api.services.idempotency.factory import get_idempotency_store
+    from services.api.services.idempotency.idempotency_service import idempotency_cache
+
+    os.environ["IDEMPOTENCY_DB_PATH"] = str(tmp_path / "idempotency.sqlite3")
+    get_idempotency_store.cache_clear()
+    idempotency_cache.clear()
+
+    yield get_idempotency_store()
+
+    get_idempotency_store.cache_clear()
+    idempotency_cache.clear()
+    os.environ.pop("IDEMPOTENCY_DB_PATH", None)
+
+
+@pytest.fixture(autouse=True)
+def tombstone_store(tmp_path):
+    """Per-test tombstone database shared by the API and the processor."""
+    from services.common.tombstones.factory import get_tombstone_store
+    from services.processor.services.cancellation import get_cancellation_index
+
+    os.environ["TOMBSTONE_DB_PATH"] = str(tmp_path / "tombstones.sqlite3")
+    get_tombstone_store.cache_clear()
+    get_cancellation_index.cache_clear()
+
+    yield get_tombstone_store()
+
+    get_tombstone_store.cache_clear()
+    get_cancellation_index.cache_clear()
+    os.environ.pop("TOMBSTONE_DB_PATH", None)
+
+
 @pytest.fixture
 def sqs_fifo_queue(aws_credentials):
     """Create a FIFO SQS queue using moto."""
@@ -52,6 +100,10 @@ def sqs_fifo_queue(aws_credentials):
 def api_client(sqs_fifo_queue):
     """FastAPI test client with real SQS queue."""
     from services.api.app import app
+    from services.api.services.queue.factory import get_queue_provider
+
+    # The provider is cached per process; rebuild it inside this test's moto mock
+    get_queue_provider.cache_clear()
     from fastapi.testclient import TestClient
 
     return TestClient(app)
@@ -5,7 +5,10 @@ Uses moto to mock AWS SQS with real FIFO queue semantics.
 """
 
 import json
+import os
+import time
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from uuid import UUID
 
 
@@ -302,3 +305,238 @@ def test_batch_processing_multiple_records(api_client, processor_handler, sqs_fi
 
     # Process entire batch
     processor_handler(lambda_event, None)  # Should process all records
+
+
+def test_task_status_follows_processing(api_client, processor_handler, sqs_fifo_queue):
+    """
+    E2E test: GET /tasks/{task_id} reflects the task's progress.
+
+    Verifies:
+    - A created task is reported as queued
+    - After the processor handles it, the task is reported as succeeded
+    """
+    from services.api.services.status.status_service import status_cache
+
+    sqs, queue_url = sqs_fifo_queue
+
+    response = api_client.post(
+        "/tasks",
+        json={
+            "title": "Tracked Task",
+            "description": "Status tracking",
+            "priority": "low",
+        },
+    )
+    task_id = response.json()["task_id"]
+
+    assert api_client.get(f"/tasks/{task_id}").json()["status"] == "queued"
+
+    messages = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=1)
+    processor_handler({"Records": [{"body": messages["Messages"][0]["Body"]}]}, None)
+
+    # The API caches statuses briefly; expire the entry instead of waiting
+    status_cache.clear()
+    assert api_client.get(f"/tasks/{task_id}").json()["status"] == "succeeded"
+
+
+def test_idempotency_key_enqueues_once(api_client, sqs_fifo_queue):
+    """
+    E2E test: retrying POST /tasks with the same Idempotency-Key.
+
+    Verifies:
+    - Both requests return the same task_id
+    - The retry is marked as replayed
+    - Only ONE message reaches the queue
+    """
+    sqs, queue_url = sqs_fifo_queue
+    payload = {"title": "Idempotent Task", "description": "Retried", "priority": "low"}
+    headers = {"Idempotency-Key": "client-request-42"}
+
+    first = api_client.post("/tasks", json=payload, headers=headers)
+    retry = api_client.post("/tasks", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json()["task_id"] == first.json()["task_id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    messages = sqs.receive_message(
+        QueueUrl=queue_url, MaxNumberOfMessages=10, WaitTimeSeconds=1
+    )
+    assert len(messages["Messages"]) == 1
+
+
+def test_stream_ingest_enqueues_every_line(api_client, sqs_fifo_queue):
+    """
+    E2E test: POST /tasks/stream with an NDJSON body.
+
+    Verifies:
+    - Valid lines are enqueued through SendMessageBatch
+    - The invalid line is reported and not enqueued
+    """
+    sqs, queue_url = sqs_fifo_queue
+    lines = [
+        json.dumps({"title": f"Bulk {i}", "description": "Backfill", "priority": "low"})
+        for i in range(12)
+    ]
+    body = "\n".join(lines[:6] + ['{"title": ""}'] + lines[6:]) + "\n"
+
+    response = api_client.post("/tasks/stream", content=body)
+
+    summary = json.loads(response.text.splitlines()[-1])["summary"]
+    assert summary == {"lines": 13, "accepted": 12, "rejected": 1, "failed": 0}
+
+    received = []
+    while True:
+        messages = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)
+        if "Messages" not in messages:
+            break
+        received.extend(messages["Messages"])
+        for message in messages["Messages"]:
+            sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=message["ReceiptHandle"])
+    assert len(received) == 12
+
+
+def test_signed_task_takes_trusted_fast_path(
+    api_client, sqs_fifo_queue, sample_task_payload, status_store
+):
+    """
+    E2E test: POST /tasks → signed SQS message → QueueConsumer → fast path.
+
+    Verifies:
+    - The API signs the message body in a message attribute
+    - The consumer receives the attribute and the processor verifies it
+    - The task is loaded without full validation and processed
+    """
+    from services.common.signing import get_message_signer
+    from services.processor.consumer import QueueConsumer
+    from services.processor.schemas.task import TaskRecord
+
+    sqs, queue_url = sqs_fifo_queue
+    get_message_signer.cache_clear()
+    try:
+        with patch.dict(os.environ, {"TASK_SIGNING_KEYS": "v1:e2e-secret"}):
+            task_id = api_client.post("/tasks", json=sample_task_payload).json()[
+                "task_id"
+            ]
+
+            consumer = QueueConsumer(queue_url=queue_url, client=sqs, wait_time_seconds=0)
+            with patch.object(
+                TaskRecord, "from_message", wraps=TaskRecord.from_message
+            ) as from_message:
+                assert consumer.poll_once() == 1
+                consumer.stop()
+                consumer.run()  # waits for the task to finish
+    finally:
+        get_message_signer.cache_clear()
+
+    from_message.assert_called_once()
+    assert status_store.get(task_id).status == "succeeded"
+    assert "Messages" not in sqs.receive_message(QueueUrl=queue_url)
+
+
+def test_cancelled_task_is_not_processed(api_client, processor_handler, sqs_fifo_queue):
+    """
+    E2E test: DELETE /tasks/{task_id} before the processor picks the task up.
+
+    Verifies:
+    - The task is reported as cancelled
+    - The processor consumes the message without running the task
+    - A task already processed can no longer be cancelled
+    """
+    from services.api.services.status.status_service import status_cache
+
+    sqs, queue_url = sqs_fifo_queue
+
+    task_ids = [
+        api_client.post(
+            "/tasks",
+            json={"title": f"Task {i}", "description": "Cancellation", "priority": "low"},
+        ).json()["task_id"]
+        for i in range(2)
+    ]
+
+    response = api_client.delete(f"/tasks/{task_ids[0]}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+
+    messages = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process"
+    ) as process:
+        processor_handler(
+            {"Records": [{"body": msg["Body"]} for msg in messages["Messages"]]}, None
+        )
+
+    assert [call.args[0]["task_id"] for call in process.call_args_list] == task_ids[1:]
+    status_cache.clear()
+    assert api_client.get(f"/tasks/{task_ids[0]}").json()["status"] == "cancelled"
+    assert api_client.get(f"/tasks/{task_ids[1]}").json()["status"] == "succeeded"
+    assert api_client.delete(f"/tasks/{task_ids[1]}").status_code == 409
+
+
+def test_sharded_queues_keep_order_per_ordering_key(api_client, sqs_fifo_queue):
+    """
+    E2E test: POST /tasks over sharded FIFO queues → one consumer per shard.
+
+    Verifies:
+    - Tasks are spread over every shard
+    - All tasks of an ordering key land on one shard and run in creation order
+    """
+    from services.api.services.queue.factory import get_queue_provider
+    from services.processor.consumer import QueueConsumer
+
+    sqs, _ = sqs_fifo_queue
+    queue_urls = [
+        sqs.create_queue(
+            QueueName=f"task-queue-{shard}.fifo",
+            Attributes={"FifoQueue": "true", "ContentBasedDeduplication": "false"},
+        )["QueueUrl"]
+        for shard in range(3)
+    ]
+
+    env = {"QUEUE_PROVIDER": "sharded", "QUEUE_URLS": ",".join(queue_urls)}
+    with patch.dict(os.environ, env):
+        get_queue_provider.cache_clear()
+        try:
+            created = [
+                api_client.post(
+                    "/tasks",
+                    json={
+                        "title": f"Step {step}",
+                        "description": "Sharded",
+                        "priority": "low",
+                        "ordering_key": f"customer-{customer}",
+                    },
+                ).json()["task_id"]
+                for step in range(3)
+                for customer in range(6)
+            ]
+        finally:
+            get_queue_provider.cache_clear()
+
+    processed = []
+    received = {queue_url: 0 for queue_url in queue_urls}
+    consumers = [
+        QueueConsumer(queue_url=queue_url, client=sqs, wait_time_seconds=0)
+        for queue_url in queue_urls
+    ]
+    with patch(
+        "services.processor.services.task_processor.TaskProcessor.process",
+        side_effect=lambda task: processed.append((task["title"], task["task_id"])),
+    ):
+        # A FIFO group's next message is only delivered once the previous
+        # one is deleted, so keep polling until everything was processed
+        deadline = time.monotonic() + 10
+        while len(processed) < len(created) and time.monotonic() < deadline:
+            for consumer in consumers:
+                received[consumer.queue_url] += consumer.poll_once()
+        for consumer in consumers:
+            consumer.stop()
+            consumer.run()  # waits for in-flight tasks
+
+    shards_used = sum(count > 0 for count in received.values())
+    assert shards_used > 1
+    assert sorted(task_id for _, task_id in processed) == sorted(created)
+    for customer in range(6):
+        steps = [title for title, task_id in processed if task_id in created[customer::6]]
+        assert steps == ["Step 0", "Step 1", "Step 2"]